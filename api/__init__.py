@@ -5,75 +5,497 @@ __author__ = "ipetrash"
 
 
 import os
+import ssl
 import subprocess
 import sys
+import threading
+import time
 
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime, date
-from multiprocessing.pool import Pool
+from multiprocessing.pool import AsyncResult, Pool
 from pathlib import Path
+from urllib.parse import urlparse
 
 import requests
-from PyQt6.QtCore import QThread, pyqtSignal
 
-from config import PATH_CERT, JIRA_HOST, PATH_README
+from api import cancellation, connections, metrics, requirements
+from api.tracing import span
+from config import (
+    PATH_CERT,
+    JIRA_HOST,
+    PATH_README,
+    HTTP_TRANSPORT,
+    TLS_SESSION_REUSE,
+    TEAM_MAX_WORKERS,
+    WORKLOG_MAX_WORKERS,
+)
 from third_party.ago import ago, L10nRu
 
 
-class RunFuncThread(QThread):
-    run_finished = pyqtSignal(object)
-    about_error = pyqtSignal(Exception)
+REQUIRED_MODULE_NAME: str = "httpx"
+IS_INSTALLED_HTTPX: bool = requirements.is_installed(
+    REQUIRED_MODULE_NAME
+) and requirements.is_installed("h2")
 
-    def __init__(self, func) -> None:
-        super().__init__()
+# NOTE: Без httpx и h2 используется транспорт requests (HTTP/1.1)
+if IS_INSTALLED_HTTPX:
+    import httpx
 
-        self.func = func
 
-    def run(self) -> None:
-        try:
-            self.run_finished.emit(self.func())
-        except Exception as e:
-            self.about_error.emit(e)
+POOL: Pool | None = None
 
+# Количество процессов пула, созданного create_pool
+POOL_PROCESSES: int = 0
 
-POOL: Pool | None = None
+# Запрос через пул занимает его процесс, поэтому процессов не меньше, чем одновременных
+# запросов (команда, ворклоги), иначе лишние запросы ждут в очереди пула
+POOL_DEFAULT_PROCESSES: int = max(5, TEAM_MAX_WORKERS, WORKLOG_MAX_WORKERS)
+
+# Соединений к хосту в пуле не меньше, чем одновременных запросов
+HTTP_POOL_MAXSIZE: int = max(
+    requests.adapters.DEFAULT_POOLSIZE,
+    TEAM_MAX_WORKERS,
+    WORKLOG_MAX_WORKERS,
+)
+
+# Путь к Unix-сокету общего шлюза запросов (см. api/gateway.py). Задается при запуске
+GATEWAY_SOCKET: str | None = None
+
+# Если шлюз недоступен, то столько секунд запросы выполняются напрямую без подключения к нему
+GATEWAY_RETRY_SECONDS: int = 60
+
+_gateway_lock = threading.Lock()
+_gateway_unavailable_until: float | None = None
+
+
+def _is_gateway_available() -> bool:
+    with _gateway_lock:
+        return (
+            _gateway_unavailable_until is None
+            or time.monotonic() >= _gateway_unavailable_until
+        )
+
+
+def _set_gateway_available(is_available: bool, error: Exception | None = None) -> None:
+    global _gateway_unavailable_until
+
+    # Сообщение выводится только при смене состояния, а не на каждый запрос
+    with _gateway_lock:
+        was_available: bool = _gateway_unavailable_until is None
+        if is_available:
+            _gateway_unavailable_until = None
+        else:
+            _gateway_unavailable_until = time.monotonic() + GATEWAY_RETRY_SECONDS
+
+    if is_available and not was_available:
+        print(f"[#] Шлюз {GATEWAY_SOCKET} снова доступен")
+    elif not is_available and was_available:
+        print(
+            f"[#] Шлюз {GATEWAY_SOCKET} недоступен ({error}), запросы напрямую. "
+            f"Повторное подключение через {GATEWAY_RETRY_SECONDS} секунд"
+        )
 
 
 class CustomAdapter(requests.adapters.HTTPAdapter):
     timeout: int = 60
     max_attempts: int = 3
 
+    # Запрос может быть выполнен в процессе пула POOL
+    is_supported_pool: bool = True
+
+    is_reuse_tls_sessions: bool = TLS_SESSION_REUSE
+
+    def __init__(self, pool_maxsize: int = HTTP_POOL_MAXSIZE, **kwargs) -> None:
+        self._ssl_context_lock = threading.Lock()
+        self._ssl_context_by_key: dict[tuple, connections.SessionSSLContext] = dict()
+
+        # Адреса хостов, к которым были запросы, для прогрева соединений
+        self.hosts: set[str] = set()
+
+        super().__init__(pool_maxsize=pool_maxsize, **kwargs)
+
+    def _get_ssl_context(
+        self,
+        verify: bool | str,
+        cert: str | tuple[str, str] | None,
+    ) -> connections.SessionSSLContext:
+        key: tuple = (verify, cert)
+        with self._ssl_context_lock:
+            context = self._ssl_context_by_key.get(key)
+            if not context:
+                context = connections.create_ssl_context(
+                    verify, cert, is_reuse_sessions=self.is_reuse_tls_sessions
+                )
+                self._ssl_context_by_key[key] = context
+
+        return context
+
+    def build_connection_pool_key_attributes(
+        self,
+        request: requests.PreparedRequest,
+        verify: bool | str,
+        cert: str | tuple[str, str] | None = None,
+    ) -> tuple[dict, dict]:
+        host_params, pool_kwargs = super().build_connection_pool_key_attributes(
+            request, verify, cert
+        )
+        # Без возобновления сессий TLS соединения создаются как в requests
+        if host_params["scheme"] == "https" and self.is_reuse_tls_sessions:
+            # Сертификаты загружены в контекст один раз, а не при каждом соединении
+            for name in ("ca_certs", "ca_cert_dir", "cert_file", "key_file"):
+                pool_kwargs.pop(name, None)
+
+            try:
+                pool_kwargs["ssl_context"] = self._get_ssl_context(verify, cert)
+            except ssl.SSLError as e:
+                # Как и при загрузке сертификата в requests, например, невалидного
+                raise requests.exceptions.SSLError(e, request=request)
+
+        return host_params, pool_kwargs
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+
+        # Соединения прерываются при отмене операции, в которой выполняется запрос
+        self.poolmanager.pool_classes_by_scheme = (
+            connections.CANCELLABLE_POOL_CLASSES_BY_SCHEME
+        )
+
     def send(self, *args, **kwargs) -> requests.Response:
+        request: requests.PreparedRequest = args[0]
+        endpoint: str = metrics.get_endpoint(request.url)
+
+        url = urlparse(request.url)
+        self.hosts.add(f"{url.scheme}://{url.netloc}")
+
+        token: cancellation.CancelToken | None = cancellation.get_token()
+
+        with span(
+            "CustomAdapter.send",
+            cat="http",
+            method=request.method,
+            url=request.url,
+        ) as span_args:
+            try:
+                # Запросы отмененной операции не отправляются
+                if token:
+                    token.raise_if_cancelled()
+
+                with metrics.HTTP_DURATION.time(endpoint=endpoint):
+                    rs = self._send(*args, **kwargs)
+            except Exception as e:
+                # Ошибка соединения, которое было прервано при отмене
+                if token and token.is_cancelled:
+                    metrics.HTTP_CANCELLED.inc(endpoint=endpoint, method=request.method)
+                    span_args["cancelled"] = True
+                    if isinstance(e, cancellation.Cancelled):
+                        raise
+                    raise cancellation.Cancelled(f"Запрос {request.url} отменен") from e
+
+                metrics.HTTP_ERRORS.inc(endpoint=endpoint, method=request.method)
+                raise
+            finally:
+                connections.record_handshakes(connections.pop_handshakes())
+
+            metrics.HTTP_REQUESTS.inc(
+                endpoint=endpoint,
+                method=request.method,
+                status=str(rs.status_code),
+            )
+            span_args["status_code"] = rs.status_code
+
+            if not kwargs.get("stream"):
+                size: int = len(rs.content)
+                metrics.HTTP_RESPONSE_BYTES.inc(size, endpoint=endpoint)
+                span_args["bytes"] = size
+
+            return rs
+
+    def _send(self, *args, **kwargs) -> requests.Response:
         # Установка таймаута, если оно не было задано
         if not kwargs.get("timeout"):
             kwargs["timeout"] = self.timeout
 
+        request: requests.PreparedRequest = args[0]
+        if (
+            GATEWAY_SOCKET
+            and request.url.startswith(JIRA_HOST)
+            and _is_gateway_available()
+        ):
+            from api.gateway import send_via_gateway
+
+            timeout = kwargs["timeout"]
+            try:
+                rs = send_via_gateway(
+                    GATEWAY_SOCKET,
+                    request,
+                    cert=kwargs.get("cert") or str(PATH_CERT),
+                    timeout=max(timeout) if isinstance(timeout, tuple) else timeout,
+                )
+            except (FileNotFoundError, ConnectionRefusedError) as e:
+                # Если шлюз не запущен, то запросы выполняются напрямую
+                _set_gateway_available(False, e)
+            else:
+                _set_gateway_available(True)
+                return rs
+
         # В дочернем процессе будет None
-        if POOL:
+        if POOL and self.is_supported_pool:
+            token: cancellation.CancelToken | None = cancellation.get_token()
+
             last_error: Exception | None = None
             for _ in range(self.max_attempts):
                 try:
-                    apply = POOL.apply_async(super().send, args=args, kwds=kwargs)
-                    return apply.get(timeout=self.timeout)
+                    apply = POOL.apply_async(
+                        _send_in_pool,
+                        args=(token.id if token else None, *args),
+                        kwds=kwargs,
+                    )
+                    rs, handshakes = self._get_pool_result(apply, token)
+                    connections.record_handshakes(handshakes)
+                    return rs
+
+                except cancellation.Cancelled:
+                    raise
 
                 except Exception as e:
                     last_error = e
 
             raise last_error
 
+        return self._send_direct(*args, **kwargs)
+
+    def _get_pool_result(
+        self,
+        apply: AsyncResult,
+        token: cancellation.CancelToken | None,
+    ) -> tuple[requests.Response, list[connections.Handshake]]:
+        if not token:
+            return apply.get(timeout=self.timeout)
+
+        # Ожидание частями, чтобы при отмене не ждать ответ. Сам запрос
+        # в процессе пула прервется по общему списку отмененных токенов
+        deadline: float = time.monotonic() + self.timeout
+        while not apply.ready():
+            token.raise_if_cancelled()
+
+            timeout: float = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            apply.wait(min(timeout, 0.1))
+
+        token.raise_if_cancelled()
+        return apply.get(timeout=0)
+
+    def _send_direct(self, *args, **kwargs) -> requests.Response:
         return super().send(*args, **kwargs)
 
 
+# Адаптер процесса пула. Создается в процессе при первом запросе, чтобы соединения
+# и сессии TLS сохранялись между запросами, а не открывались для каждого заново
+_POOL_ADAPTER: CustomAdapter | None = None
+
+
+def _init_pool_process(cancelled_ids: cancellation.CancelledIds) -> None:
+    cancellation.CANCELLED_IDS = cancelled_ids
+
+
+def create_pool(processes: int = POOL_DEFAULT_PROCESSES) -> Pool:
+    """Пул процессов для запросов (api.POOL), в котором можно прервать запросы отмененных операций"""
+
+    global POOL_PROCESSES
+
+    cancellation.CANCELLED_IDS = cancellation.CancelledIds()
+    POOL_PROCESSES = processes
+    return Pool(
+        processes=processes,
+        initializer=_init_pool_process,
+        initargs=(cancellation.CANCELLED_IDS,),
+    )
+
+
+def _send_in_pool(
+    token_id: int | None, *args, **kwargs
+) -> tuple[requests.Response, list[connections.Handshake]]:
+    global _POOL_ADAPTER
+
+    if _POOL_ADAPTER is None:
+        _POOL_ADAPTER = CustomAdapter()
+
+    token: cancellation.CancelToken | None = None
+    if token_id is not None:
+        token = cancellation.CancelToken(token_id=token_id)
+
+    try:
+        with cancellation.watch_shared(token) if token else nullcontext():
+            # Запрос мог ждать в очереди пула, пока операцию отменили
+            if token:
+                token.raise_if_cancelled()
+
+            with cancellation.use_token(token):
+                rs = _POOL_ADAPTER._send_direct(*args, **kwargs)
+
+        return rs, connections.pop_handshakes()
+    except Exception:
+        # Рукопожатия при ошибке учитываются только в процессе пула
+        connections.pop_handshakes()
+        raise
+
+
+class Http2Adapter(CustomAdapter):
+    """Транспорт через httpx с HTTP/2: одновременные запросы к хосту выполняются
+    в одном TLS-соединении, а не в отдельном на каждый запрос.
+
+    Сертификат, проверка сервера и таймауты берутся из параметров запроса requests,
+    при ошибках соединения запрос повторяется до max_attempts раз.
+    """
+
+    # NOTE: Соединение общее для потоков текущего процесса, в процессах пула его нет
+    is_supported_pool: bool = False
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+
+        self._lock = threading.Lock()
+        self._client_by_key: dict[tuple, "httpx.Client"] = dict()
+
+    def _get_client(
+        self,
+        verify: bool | str,
+        cert: str | tuple[str, str] | None,
+    ) -> "httpx.Client":
+        key: tuple = (verify, cert)
+        with self._lock:
+            client = self._client_by_key.get(key)
+            if client:
+                return client
+
+            # Перенаправления и куки обрабатывает сессия requests
+            client = httpx.Client(
+                http2=True,
+                verify=self._get_ssl_context(verify, cert),
+                follow_redirects=False,
+                limits=httpx.Limits(
+                    max_connections=self._pool_maxsize,
+                    max_keepalive_connections=self._pool_maxsize,
+                ),
+            )
+            self._client_by_key[key] = client
+            return client
+
+    def _send_direct(
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: float | tuple[float, float] | None = None,
+        verify: bool | str = True,
+        cert: str | tuple[str, str] | None = None,
+        proxies: dict[str, str] | None = None,
+    ) -> requests.Response:
+        # Как и в requests, сертификаты используются только для https
+        if not request.url.lower().startswith("https"):
+            verify, cert = False, None
+
+        client = self._get_client(verify, cert)
+
+        if isinstance(timeout, tuple):
+            connect_timeout, read_timeout = timeout
+        else:
+            connect_timeout = read_timeout = timeout
+
+        # NOTE: Запрос httpx не прерывается при отмене, т.к. соединение общее
+        #       для всех запросов, но повторы отмененного запроса не выполняются
+        last_error: Exception | None = None
+        for _ in range(self.max_attempts):
+            cancellation.check()
+            try:
+                rs = client.request(
+                    request.method,
+                    request.url,
+                    headers=dict(request.headers),
+                    content=request.body,
+                    timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                )
+                break
+
+            except httpx.TransportError as e:
+                last_error = e
+        else:
+            if isinstance(last_error, httpx.TimeoutException):
+                raise requests.exceptions.Timeout(last_error, request=request)
+            raise requests.exceptions.ConnectionError(last_error, request=request)
+
+        response = requests.Response()
+        response.status_code = rs.status_code
+        response.reason = rs.reason_phrase
+        response.headers = requests.structures.CaseInsensitiveDict(rs.headers)
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.url = str(rs.url)
+        response.request = request
+        response.elapsed = rs.elapsed
+        response._content = rs.content
+        response._content_consumed = True
+        return response
+
+    def close(self) -> None:
+        super().close()
+
+        with self._lock:
+            for client in self._client_by_key.values():
+                client.close()
+            self._client_by_key.clear()
+
+
+def get_adapter(transport: str = HTTP_TRANSPORT) -> CustomAdapter:
+    if transport == "http2":
+        if IS_INSTALLED_HTTPX:
+            return Http2Adapter()
+
+        print(
+            '[#] Для транспорта "http2" нужны модули httpx и h2 '
+            '(pip install "httpx[http2]"), используется HTTP/1.1'
+        )
+
+    return CustomAdapter()
+
+
 USER_AGENT = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:94.0) Gecko/20100101 Firefox/94.0"
 )
 
 session = requests.session()
 session.cert = str(PATH_CERT)
-session.mount("https://", CustomAdapter())
-session.mount("http://", CustomAdapter())
+adapter: CustomAdapter = get_adapter()
+session.mount("https://", adapter)
+session.mount("http://", adapter)
 session.headers["User-Agent"] = USER_AGENT
 
 
+def prewarm(timeout: float = 10) -> int:
+    """Открытие соединений к хостам, к которым уже были запросы, например, перед
+    запланированным обновлением. Возвращает количество успешных запросов"""
+
+    # NOTE: Запрос из пула выполняется в любом из его процессов, поэтому
+    #       запросов к каждому хосту столько, сколько процессов в пуле
+    number: int = max(POOL_PROCESSES, 1) if POOL and adapter.is_supported_pool else 1
+    urls: list[str] = [host for host in sorted(adapter.hosts) for _ in range(number)]
+    if not urls:
+        return 0
+
+    def _head(url: str) -> bool:
+        try:
+            session.head(url, timeout=timeout, allow_redirects=False)
+            return True
+        except Exception:
+            # Ошибка будет и при обновлении, там она и покажется
+            return False
+
+    with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+        return sum(executor.map(_head, urls))
+
+
 # Проверка сертификата
 # TODO: Добавить бы проверку в CustomAdapter.send - по-крайней мере, при запущенном приложении,
 #       сертификат может устареть и будут 400 ошибки
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "ipetrash"
+
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Sequence
+
+from api import requirements
+from api.jira_rss import Activity, ActivityActionEnum
+
+
+REQUIRED_MODULE_NAME: str = "numpy"
+IS_INSTALLED_NUMPY: bool = requirements.is_installed(REQUIRED_MODULE_NAME)
+
+# NOTE: Без numpy группировка выполняется на чистом Python
+if IS_INSTALLED_NUMPY:
+    import numpy as np
+
+
+# Порядковый номер 01.01.1970 (date.toordinal), нужен для перевода в datetime64
+ORDINAL_EPOCH: int = date(1970, 1, 1).toordinal()
+
+ACTION_BY_CODE: list[ActivityActionEnum] = list(ActivityActionEnum)
+CODE_BY_ACTION: dict[ActivityActionEnum, int] = {
+    action: code for code, action in enumerate(ACTION_BY_CODE)
+}
+
+
+@dataclass
+class LoggedByDay:
+    date: date
+    logged_seconds: int
+    activities: int
+
+
+@dataclass
+class LoggedByWeek:
+    year: int
+    week: int
+    logged_seconds: int
+    activities: int
+
+
+@dataclass
+class LoggedByMonth:
+    year: int
+    month: int
+    logged_seconds: int
+    activities: int
+
+
+@dataclass
+class LoggedByJira:
+    jira_id: str
+    jira_title: str
+    logged_seconds: int
+    activities: int
+
+
+@dataclass
+class ActivityColumns:
+    """Активности в виде столбцов: i-ая активность - i-ый элемент каждого столбца.
+
+    При наличии numpy столбцы - это массивы numpy, иначе - списки.
+    Задачи хранятся кодами, а их ключи и названия - в jira_ids и jira_titles.
+    """
+
+    entry_ts: Sequence[int] = field(default_factory=list)
+    date_ordinal: Sequence[int] = field(default_factory=list)
+    jira_code: Sequence[int] = field(default_factory=list)
+    logged_seconds: Sequence[int] = field(default_factory=list)
+    action_code: Sequence[int] = field(default_factory=list)
+
+    jira_ids: list[str] = field(default_factory=list)
+    jira_titles: list[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.entry_ts)
+
+    @classmethod
+    def from_date_by_activities(
+        cls,
+        date_by_activities: dict[date, list[Activity]],
+        use_numpy: bool = IS_INSTALLED_NUMPY,
+    ) -> "ActivityColumns":
+        entry_ts: list[int] = []
+        date_ordinal: list[int] = []
+        jira_code: list[int] = []
+        logged_seconds: list[int] = []
+        action_code: list[int] = []
+
+        code_by_jira_id: dict[str, int] = dict()
+        jira_titles: list[str] = []
+
+        for entry_date, activities in date_by_activities.items():
+            ordinal: int = entry_date.toordinal()
+            for activity in activities:
+                code: int | None = code_by_jira_id.get(activity.jira_id)
+                if code is None:
+                    code = code_by_jira_id[activity.jira_id] = len(code_by_jira_id)
+                    jira_titles.append(activity.jira_title)
+
+                entry_ts.append(activity.entry_ts)
+                date_ordinal.append(ordinal)
+                jira_code.append(code)
+                logged_seconds.append(
+                    activity.logged.seconds if activity.logged else 0
+                )
+                action_code.append(CODE_BY_ACTION[activity.action])
+
+        columns = cls(
+            entry_ts=entry_ts,
+            date_ordinal=date_ordinal,
+            jira_code=jira_code,
+            logged_seconds=logged_seconds,
+            action_code=action_code,
+            jira_ids=list(code_by_jira_id),
+            jira_titles=jira_titles,
+        )
+        if use_numpy:
+            columns.entry_ts = np.array(entry_ts, dtype=np.int64)
+            columns.date_ordinal = np.array(date_ordinal, dtype=np.int64)
+            columns.jira_code = np.array(jira_code, dtype=np.int64)
+            columns.logged_seconds = np.array(logged_seconds, dtype=np.int64)
+            columns.action_code = np.array(action_code, dtype=np.int8)
+
+        return columns
+
+    def is_numpy(self) -> bool:
+        return IS_INSTALLED_NUMPY and isinstance(self.entry_ts, np.ndarray)
+
+    def get_week_keys(self) -> Sequence[int]:
+        """Ключи недель ISO вида year * 100 + week"""
+
+        if not self.is_numpy():
+            keys_by_ordinal: dict[int, int] = dict()
+            for ordinal in set(self.date_ordinal):
+                year, week, _ = date.fromordinal(ordinal).isocalendar()
+                keys_by_ordinal[ordinal] = year * 100 + week
+
+            return [keys_by_ordinal[ordinal] for ordinal in self.date_ordinal]
+
+        # Неделя ISO принадлежит году, в котором находится ее четверг
+        weekday = (self.date_ordinal - 1) % 7  # Понедельник - 0
+        thursday = (self.date_ordinal - weekday + 3 - ORDINAL_EPOCH).astype(
+            "datetime64[D]"
+        )
+        thursday_year = thursday.astype("datetime64[Y]")
+        day_of_year = (thursday - thursday_year).astype(np.int64)
+
+        year = thursday_year.astype(np.int64) + 1970
+        week = day_of_year // 7 + 1
+        return year * 100 + week
+
+    def get_month_keys(self) -> Sequence[int]:
+        """Ключи месяцев вида year * 100 + month"""
+
+        if not self.is_numpy():
+            keys_by_ordinal: dict[int, int] = dict()
+            for ordinal in set(self.date_ordinal):
+                d = date.fromordinal(ordinal)
+                keys_by_ordinal[ordinal] = d.year * 100 + d.month
+
+            return [keys_by_ordinal[ordinal] for ordinal in self.date_ordinal]
+
+        months = (
+            (self.date_ordinal - ORDINAL_EPOCH)
+            .astype("datetime64[D]")
+            .astype("datetime64[M]")
+            .astype(np.int64)
+        )
+        return (months // 12 + 1970) * 100 + months % 12 + 1
+
+
+def group_sum(
+    keys: Sequence[int],
+    values: Sequence[int],
+) -> list[tuple[int, int, int]]:
+    """Группировка: список (ключ, сумма значений, количество) по возрастанию ключа"""
+
+    if IS_INSTALLED_NUMPY and isinstance(keys, np.ndarray):
+        if not len(keys):
+            return []
+
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        sums = np.bincount(inverse, weights=values, minlength=len(unique_keys))
+        counts = np.bincount(inverse, minlength=len(unique_keys))
+        return list(
+            zip(
+                unique_keys.tolist(),
+                sums.astype(np.int64).tolist(),
+                counts.tolist(),
+            )
+        )
+
+    sum_by_key: dict[int, int] = defaultdict(int)
+    count_by_key: dict[int, int] = defaultdict(int)
+    for key, value in zip(keys, values):
+        sum_by_key[key] += value
+        count_by_key[key] += 1
+
+    return [(key, sum_by_key[key], count_by_key[key]) for key in sorted(sum_by_key)]
+
+
+def get_columns(
+    data: dict[date, list[Activity]] | ActivityColumns,
+) -> ActivityColumns:
+    if isinstance(data, ActivityColumns):
+        return data
+    return ActivityColumns.from_date_by_activities(data)
+
+
+def get_logged_by_day(
+    data: dict[date, list[Activity]] | ActivityColumns,
+) -> list[LoggedByDay]:
+    columns: ActivityColumns = get_columns(data)
+    return [
+        LoggedByDay(
+            date=date.fromordinal(ordinal),
+            logged_seconds=logged_seconds,
+            activities=activities,
+        )
+        for ordinal, logged_seconds, activities in reversed(
+            group_sum(columns.date_ordinal, columns.logged_seconds)
+        )
+    ]
+
+
+def get_logged_by_week(
+    data: dict[date, list[Activity]] | ActivityColumns,
+) -> list[LoggedByWeek]:
+    columns: ActivityColumns = get_columns(data)
+    return [
+        LoggedByWeek(
+            year=key // 100,
+            week=key % 100,
+            logged_seconds=logged_seconds,
+            activities=activities,
+        )
+        for key, logged_seconds, activities in reversed(
+            group_sum(columns.get_week_keys(), columns.logged_seconds)
+        )
+    ]
+
+
+def get_logged_by_month(
+    data: dict[date, list[Activity]] | ActivityColumns,
+) -> list[LoggedByMonth]:
+    columns: ActivityColumns = get_columns(data)
+    return [
+        LoggedByMonth(
+            year=key // 100,
+            month=key % 100,
+            logged_seconds=logged_seconds,
+            activities=activities,
+        )
+        for key, logged_seconds, activities in reversed(
+            group_sum(columns.get_month_keys(), columns.logged_seconds)
+        )
+    ]
+
+
+def get_logged_by_jira(
+    data: dict[date, list[Activity]] | ActivityColumns,
+) -> list[LoggedByJira]:
+    columns: ActivityColumns = get_columns(data)
+
+    # NOTE: Коды задач идут в порядке первого появления, поэтому при равном
+    #       времени порядок задач сохранится
+    items = [
+        LoggedByJira(
+            jira_id=columns.jira_ids[code],
+            jira_title=columns.jira_titles[code],
+            logged_seconds=logged_seconds,
+            activities=activities,
+        )
+        for code, logged_seconds, activities in group_sum(
+            columns.jira_code, columns.logged_seconds
+        )
+    ]
+    items.sort(key=lambda x: x.logged_seconds, reverse=True)
+
+    return items
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from pathlib import Path
+
+    from api.jira_rss import parse_date_by_activities, get_logged_total_seconds
+
+    if len(sys.argv) < 2:
+        print(f"Использование: {sys.argv[0]} <путь к XML с RSS> [<повторов>]")
+        sys.exit(1)
+
+    date_by_activities = parse_date_by_activities(Path(sys.argv[1]).read_bytes())
+    number: int = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    def _get_logged_by_day_old() -> list[tuple[date, int, int]]:
+        return [
+            (entry_date, get_logged_total_seconds(activities), len(activities))
+            for entry_date, activities in sorted(
+                date_by_activities.items(), key=lambda x: x[0], reverse=True
+            )
+        ]
+
+    def _measure(title: str, func) -> Any:
+        func()  # Прогрев
+
+        t = time.perf_counter()
+        for _ in range(number):
+            result = func()
+        print(f"{title}: {(time.perf_counter() - t) / number * 1000:.3f} мс")
+        return result
+
+    print(
+        f"Активностей: {sum(map(len, date_by_activities.values()))}, "
+        f"numpy: {IS_INSTALLED_NUMPY}"
+    )
+
+    old = _measure("Старый вариант (по дням)", _get_logged_by_day_old)
+    for use_numpy in sorted({False, IS_INSTALLED_NUMPY}):
+        columns = _measure(
+            f"Столбцы (numpy={use_numpy})",
+            lambda: ActivityColumns.from_date_by_activities(
+                date_by_activities, use_numpy=use_numpy
+            ),
+        )
+        for func in [
+            get_logged_by_day,
+            get_logged_by_week,
+            get_logged_by_month,
+            get_logged_by_jira,
+        ]:
+            _measure(f"    {func.__name__}", lambda: func(columns))
+
+        new = [
+            (obj.date, obj.logged_seconds, obj.activities)
+            for obj in get_logged_by_day(columns)
+        ]
+        assert old == new
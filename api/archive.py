@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "ipetrash"
+
+
+import gzip
+import hashlib
+import sqlite3
+import threading
+import time
+
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime, date
+from pathlib import Path
+
+from api import requirements
+from config import (
+    PATH_ARCHIVE,
+    ARCHIVE_MAX_MB,
+    ARCHIVE_MAX_RESPONSES,
+    ARCHIVE_COMPRESSION,
+)
+
+
+REQUIRED_MODULE_NAME: str = "zstandard"
+IS_INSTALLED_ZSTANDARD: bool = requirements.is_installed(REQUIRED_MODULE_NAME)
+
+# NOTE: Без zstandard ответы сжимаются gzip
+if IS_INSTALLED_ZSTANDARD:
+    import zstandard
+
+
+SQL_CREATE: str = """
+CREATE TABLE IF NOT EXISTS objects (
+    hash TEXT PRIMARY KEY,
+    compression TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    raw_size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS responses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    endpoint TEXT NOT NULL,
+    url TEXT NOT NULL,
+    dt_from TEXT,
+    dt_to TEXT,
+    fetched REAL NOT NULL,
+    hash TEXT NOT NULL REFERENCES objects(hash)
+);
+CREATE INDEX IF NOT EXISTS responses_endpoint_range ON responses(endpoint, dt_from, dt_to);
+CREATE INDEX IF NOT EXISTS objects_last_access ON objects(last_access);
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class ArchiveResponse:
+    id: int
+    endpoint: str
+    url: str
+    dt_from: datetime | None
+    dt_to: datetime | None
+    fetched: datetime
+    hash: str
+
+
+def compress(data: bytes, compression: str) -> bytes:
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def decompress(data: bytes, compression: str) -> bytes:
+    if compression == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def _to_str(dt: datetime | date | None) -> str | None:
+    return dt.isoformat() if dt else None
+
+
+def _from_str(text: str | None) -> datetime | None:
+    return datetime.fromisoformat(text) if text else None
+
+
+class RawArchive:
+    """Архив сырых ответов.
+
+    Ответ хранится один раз по хешу содержимого (сжатый zstd или gzip), а индекс
+    в SQLite связывает его с адресом, диапазоном дат и временем получения.
+    Если архив больше max_bytes, то удаляются давно не читавшиеся ответы.
+    Записей в индексе не больше max_responses: удаляются самые старые, кроме
+    последней по каждому адресу и диапазону дат.
+    """
+
+    def __init__(
+        self,
+        path: Path = PATH_ARCHIVE,
+        max_bytes: int = ARCHIVE_MAX_MB * 1024 * 1024,
+        max_responses: int = ARCHIVE_MAX_RESPONSES,
+        compression: str = ARCHIVE_COMPRESSION,
+    ) -> None:
+        self.path: Path = path
+        self.path_objects: Path = path / "objects"
+        self.path_index: Path = path / "index.sqlite"
+        self.max_bytes: int = max_bytes
+        self.max_responses: int = max_responses
+
+        if compression == "zstd" and not IS_INSTALLED_ZSTANDARD:
+            compression = "gzip"
+        self.compression: str = compression
+
+        self._lock = threading.Lock()
+        self._is_created: bool = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._is_created:
+            self.path_objects.mkdir(parents=True, exist_ok=True)
+
+        conn = sqlite3.connect(self.path_index, timeout=30)
+        if not self._is_created:
+            conn.executescript(SQL_CREATE)
+            self._is_created = True
+
+        return conn
+
+    def _get_object_path(self, hash: str, compression: str) -> Path:
+        suffix: str = "zst" if compression == "zstd" else "gz"
+        return self.path_objects / hash[:2] / f"{hash}.{suffix}"
+
+    def put(
+        self,
+        content: bytes,
+        endpoint: str,
+        url: str,
+        dt_from: datetime | date | None = None,
+        dt_to: datetime | date | None = None,
+    ) -> str:
+        hash: str = hashlib.sha256(content).hexdigest()
+        now: float = time.time()
+
+        with self._lock, closing(self._connect()) as conn, conn:
+            is_exists: bool = conn.execute(
+                "SELECT 1 FROM objects WHERE hash = ?", (hash,)
+            ).fetchone() is not None
+
+            if is_exists:
+                conn.execute(
+                    "UPDATE objects SET last_access = ? WHERE hash = ?", (now, hash)
+                )
+            else:
+                data: bytes = compress(content, self.compression)
+
+                path: Path = self._get_object_path(hash, self.compression)
+                path.parent.mkdir(parents=True, exist_ok=True)
+
+                # Запись через временный файл, чтобы не было недописанных файлов
+                path_tmp: Path = path.with_name(f"{path.name}.tmp")
+                path_tmp.write_bytes(data)
+                path_tmp.replace(path)
+
+                conn.execute(
+                    "INSERT INTO objects VALUES (?, ?, ?, ?, ?)",
+                    (hash, self.compression, len(data), len(content), now),
+                )
+
+            conn.execute(
+                "INSERT INTO responses (endpoint, url, dt_from, dt_to, fetched, hash)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (endpoint, url, _to_str(dt_from), _to_str(dt_to), now, hash),
+            )
+
+            self._prune_responses(conn)
+            self._evict(conn, keep_hash=hash)
+
+        return hash
+
+    def get(self, hash: str) -> bytes:
+        with self._lock, closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT compression FROM objects WHERE hash = ?", (hash,)
+            ).fetchone()
+            if not row:
+                raise KeyError(hash)
+
+            conn.execute(
+                "UPDATE objects SET last_access = ? WHERE hash = ?", (time.time(), hash)
+            )
+
+        (compression,) = row
+        return decompress(self._get_object_path(hash, compression).read_bytes(), compression)
+
+    def find(
+        self,
+        endpoint: str,
+        dt_from: datetime | date | None = None,
+        dt_to: datetime | date | None = None,
+    ) -> list[ArchiveResponse]:
+        """Последние ответы по каждому диапазону дат, которые пересекаются с [dt_from, dt_to]"""
+
+        sql: str = (
+            "SELECT id, endpoint, url, dt_from, dt_to, MAX(fetched), hash FROM responses"
+            " WHERE endpoint = ?"
+        )
+        params: list = [endpoint]
+        if dt_from:
+            sql += " AND (dt_to IS NULL OR dt_to >= ?)"
+            params.append(_to_str(dt_from))
+        if dt_to:
+            sql += " AND (dt_from IS NULL OR dt_from <= ?)"
+            params.append(_to_str(dt_to))
+        sql += " GROUP BY dt_from, dt_to ORDER BY dt_from DESC"
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(sql, params).fetchall()
+
+        return [
+            ArchiveResponse(
+                id=id,
+                endpoint=endpoint,
+                url=url,
+                dt_from=_from_str(dt_from),
+                dt_to=_from_str(dt_to),
+                fetched=datetime.fromtimestamp(fetched),
+                hash=hash,
+            )
+            for id, endpoint, url, dt_from, dt_to, fetched, hash in rows
+        ]
+
+    def get_endpoints(self) -> list[str]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT DISTINCT endpoint FROM responses ORDER BY endpoint"
+            ).fetchall()
+
+        return [endpoint for (endpoint,) in rows]
+
+    def get_size(self) -> tuple[int, int, int]:
+        """Количество ответов, количество уникальных ответов и их размер в байтах"""
+
+        with closing(self._connect()) as conn:
+            (responses,) = conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+            objects, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM objects"
+            ).fetchone()
+
+        return responses, objects, size
+
+    def _prune_responses(self, conn: sqlite3.Connection) -> None:
+        (total,) = conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if total <= self.max_responses:
+            return
+
+        conn.execute(
+            "DELETE FROM responses WHERE id IN ("
+            " SELECT id FROM responses WHERE id NOT IN ("
+            "  SELECT MAX(id) FROM responses GROUP BY endpoint, dt_from, dt_to"
+            " ) ORDER BY fetched LIMIT ?"
+            ")",
+            (total - self.max_responses,),
+        )
+
+        # Ответы, на которые больше нет записей, не нужны
+        for hash, compression in conn.execute(
+            "SELECT hash, compression FROM objects"
+            " WHERE hash NOT IN (SELECT hash FROM responses)"
+        ).fetchall():
+            conn.execute("DELETE FROM objects WHERE hash = ?", (hash,))
+            self._get_object_path(hash, compression).unlink(missing_ok=True)
+
+    def _evict(self, conn: sqlite3.Connection, keep_hash: str | None = None) -> None:
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()
+        if total <= self.max_bytes:
+            return
+
+        for hash, compression, size in conn.execute(
+            "SELECT hash, compression, size FROM objects ORDER BY last_access"
+        ).fetchall():
+            # Только что добавленный ответ не удаляется, даже если он больше ограничения
+            if hash == keep_hash:
+                continue
+
+            if total <= self.max_bytes:
+                break
+
+            conn.execute("DELETE FROM responses WHERE hash = ?", (hash,))
+            conn.execute("DELETE FROM objects WHERE hash = ?", (hash,))
+            self._get_object_path(hash, compression).unlink(missing_ok=True)
+
+            total -= size
+
+
+ARCHIVE = RawArchive()
+
+
+if __name__ == "__main__":
+    from third_party.human_byte_size import sizeof_fmt
+
+    responses, objects, size = ARCHIVE.get_size()
+    print(f"Path: {ARCHIVE.path}")
+    print(f"Responses: {responses}, unique: {objects}, size: {sizeof_fmt(size)}")
+    for endpoint in ARCHIVE.get_endpoints():
+        print(endpoint)
+        for response in ARCHIVE.find(endpoint):
+            print(
+                f"    {response.dt_from} - {response.dt_to}: "
+                f"{response.fetched} {response.hash[:12]}"
+            )
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "ipetrash"
+
+
+import contextvars
+import functools
+import itertools
+import multiprocessing as mp
+import threading
+import time
+
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+
+# NOTE: Модуль не должен импортировать api, т.к. используется в api/__init__.py
+
+
+class Cancelled(Exception):
+    """Операция отменена, например, более новым обновлением"""
+
+
+class CancelledIds:
+    """Идентификаторы последних отмененных токенов в общей памяти, чтобы
+    процессы пула api.POOL могли прервать запросы отмененных операций"""
+
+    def __init__(self, size: int = 256) -> None:
+        self.size: int = size
+
+        # Первый элемент - количество добавленных идентификаторов, дальше кольцевой буфер
+        self._array = mp.Array("q", size + 1)
+
+    def add(self, token_id: int) -> None:
+        with self._array.get_lock():
+            number: int = self._array[0]
+            self._array[1 + number % self.size] = token_id
+            self._array[0] = number + 1
+
+    def __contains__(self, token_id: int) -> bool:
+        return token_id in self._array[1:]
+
+
+# Задается при создании пула процессов (см. api.create_pool), в процессах пула - из родителя
+CANCELLED_IDS: CancelledIds | None = None
+
+_ids = itertools.count(1)
+
+
+class CancelToken:
+    def __init__(self, generation: int = 0, token_id: int | None = None) -> None:
+        self.id: int = token_id if token_id is not None else next(_ids)
+        self.generation: int = generation
+
+        self._lock = threading.Lock()
+        self._event = threading.Event()
+        self._callbacks: list[Callable[[], None]] = []
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, is_shared: bool = True) -> None:
+        with self._lock:
+            if self._event.is_set():
+                return
+
+            self._event.set()
+            callbacks: list[Callable[[], None]] = self._callbacks.copy()
+            self._callbacks.clear()
+
+        if is_shared and CANCELLED_IDS is not None:
+            CANCELLED_IDS.add(self.id)
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+    def raise_if_cancelled(self) -> None:
+        if self.is_cancelled:
+            raise Cancelled(f"Операция отменена (поколение {self.generation})")
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._event.wait(timeout)
+
+    def add_callback(self, callback: Callable[[], None]) -> None:
+        """Функция будет вызвана при отмене, например, для закрытия соединения"""
+
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+
+        callback()
+
+    def remove_callback(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            try:
+                self._callbacks.remove(callback)
+            except ValueError:
+                pass
+
+
+_current_token: contextvars.ContextVar[CancelToken | None] = contextvars.ContextVar(
+    "cancel_token", default=None
+)
+
+
+def get_token() -> CancelToken | None:
+    return _current_token.get()
+
+
+def check() -> None:
+    token: CancelToken | None = get_token()
+    if token:
+        token.raise_if_cancelled()
+
+
+@contextmanager
+def use_token(token: CancelToken | None) -> Iterator[CancelToken | None]:
+    """Токен отмены для кода в блоке, в том числе для запросов через api.session"""
+
+    reset_token = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(reset_token)
+
+
+@contextmanager
+def on_cancel(callback: Callable[[], None]) -> Iterator[None]:
+    """Пока выполняется блок, отмена текущего токена вызывает callback"""
+
+    token: CancelToken | None = get_token()
+    if not token:
+        yield
+        return
+
+    token.raise_if_cancelled()
+    token.add_callback(callback)
+    try:
+        yield
+    finally:
+        token.remove_callback(callback)
+
+
+def bind(func: Callable) -> Callable:
+    """Функция с токеном текущего потока для выполнения в другом потоке, например, в ThreadPoolExecutor"""
+
+    token: CancelToken | None = get_token()
+    if not token:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with use_token(token):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+_watched_lock = threading.Lock()
+_watched_tokens: set[CancelToken] = set()
+_watcher: threading.Thread | None = None
+
+
+def _watch_cancelled_ids(interval: float) -> None:
+    while True:
+        with _watched_lock:
+            tokens: list[CancelToken] = list(_watched_tokens)
+
+        for token in tokens:
+            if token.id in CANCELLED_IDS:
+                token.cancel(is_shared=False)
+
+        time.sleep(interval)
+
+
+@contextmanager
+def watch_shared(token: CancelToken, interval: float = 0.1) -> Iterator[CancelToken]:
+    """В процессе пула: токен отменяется, когда его отменили в родительском процессе"""
+
+    global _watcher
+
+    if CANCELLED_IDS is None:
+        yield token
+        return
+
+    if token.id in CANCELLED_IDS:
+        token.cancel(is_shared=False)
+
+    with _watched_lock:
+        _watched_tokens.add(token)
+        if _watcher is None:
+            _watcher = threading.Thread(
+                target=_watch_cancelled_ids,
+                args=(interval,),
+                name="CancelledIdsWatcher",
+                daemon=True,
+            )
+            _watcher.start()
+
+    try:
+        yield token
+    finally:
+        with _watched_lock:
+            _watched_tokens.discard(token)
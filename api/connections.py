@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "ipetrash"
+
+
+import os
+import socket
+import ssl
+import threading
+import time
+
+from dataclasses import dataclass
+
+import requests
+import urllib3
+
+from api import cancellation, metrics
+
+
+@dataclass(frozen=True, slots=True)
+class Handshake:
+    host: str
+    duration: float
+    resumed: bool
+
+
+@dataclass(frozen=True, slots=True)
+class HandshakeStats:
+    number: int = 0
+    resumed: int = 0
+    duration: float = 0.0
+
+    def __sub__(self, other: "HandshakeStats") -> "HandshakeStats":
+        return HandshakeStats(
+            number=self.number - other.number,
+            resumed=self.resumed - other.resumed,
+            duration=self.duration - other.duration,
+        )
+
+    def __str__(self) -> str:
+        return (
+            f"{self.number} (возобновлено {self.resumed}), "
+            f"{self.duration * 1000:.0f} мс"
+        )
+
+
+_lock = threading.Lock()
+
+# Рукопожатия, которые еще не учтены в метриках. В процессе пула они
+# возвращаются вместе с ответом и учитываются в основном процессе
+_pending_handshakes: list[Handshake] = []
+_stats = HandshakeStats()
+
+
+def pop_handshakes() -> list[Handshake]:
+    with _lock:
+        items: list[Handshake] = _pending_handshakes.copy()
+        _pending_handshakes.clear()
+
+    return items
+
+
+def record_handshakes(items: list[Handshake]) -> None:
+    global _stats
+
+    for item in items:
+        resumed: str = "yes" if item.resumed else "no"
+        metrics.TLS_HANDSHAKES.inc(host=item.host, resumed=resumed)
+        metrics.TLS_HANDSHAKE_DURATION.observe(item.duration, resumed=resumed)
+
+        with _lock:
+            _stats = HandshakeStats(
+                number=_stats.number + 1,
+                resumed=_stats.resumed + item.resumed,
+                duration=_stats.duration + item.duration,
+            )
+
+
+def get_stats() -> HandshakeStats:
+    with _lock:
+        return _stats
+
+
+class SessionSSLContext(ssl.SSLContext):
+    """Контекст TLS, который запоминает сессии по хостам и возобновляет их в новых
+    соединениях. Возобновленное рукопожатие не передает сертификаты и не проверяет
+    подпись клиента, поэтому первое соединение после таймаута keep-alive быстрее.
+    """
+
+    # NOTE: protocol нужен для SSLContext.__new__
+    def __init__(self, protocol: int, is_reuse_sessions: bool = True) -> None:
+        super().__init__()
+
+        self.is_reuse_sessions: bool = is_reuse_sessions
+        self._session_lock = threading.Lock()
+        self._session_by_host: dict[str, ssl.SSLSession] = dict()
+
+    def save_session(self, sock: ssl.SSLSocket) -> None:
+        if not self.is_reuse_sessions or not sock.server_hostname:
+            return
+
+        try:
+            session: ssl.SSLSession | None = sock.session
+        except (ValueError, OSError):
+            return
+
+        # Сессия TLS 1.3 без билета не может быть возобновлена
+        if not session or (not session.has_ticket and sock.version() == "TLSv1.3"):
+            return
+
+        with self._session_lock:
+            self._session_by_host[sock.server_hostname] = session
+
+    def wrap_socket(
+        self,
+        sock,
+        server_side: bool = False,
+        do_handshake_on_connect: bool = True,
+        suppress_ragged_eofs: bool = True,
+        server_hostname: str | None = None,
+        session: ssl.SSLSession | None = None,
+    ) -> ssl.SSLSocket:
+        if session is None and self.is_reuse_sessions and server_hostname:
+            with self._session_lock:
+                session = self._session_by_host.get(server_hostname)
+
+        started: float = time.perf_counter()
+        ssl_sock: ssl.SSLSocket = super().wrap_socket(
+            sock,
+            server_side=server_side,
+            do_handshake_on_connect=do_handshake_on_connect,
+            suppress_ragged_eofs=suppress_ragged_eofs,
+            server_hostname=server_hostname,
+            session=session,
+        )
+
+        if do_handshake_on_connect and not server_side:
+            with _lock:
+                _pending_handshakes.append(
+                    Handshake(
+                        host=server_hostname or "",
+                        duration=time.perf_counter() - started,
+                        resumed=ssl_sock.session_reused,
+                    )
+                )
+            self.save_session(ssl_sock)
+
+        return ssl_sock
+
+
+def create_ssl_context(
+    verify: bool | str,
+    cert: str | tuple[str, str] | None,
+    is_reuse_sessions: bool = True,
+) -> SessionSSLContext:
+    context = SessionSSLContext(ssl.PROTOCOL_TLS_CLIENT, is_reuse_sessions=is_reuse_sessions)
+    if verify is False:
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    elif isinstance(verify, str):
+        if os.path.isdir(verify):
+            context.load_verify_locations(capath=verify)
+        else:
+            context.load_verify_locations(cafile=verify)
+    else:
+        # Как в requests: сертификаты certifi, а не системное хранилище
+        context.load_verify_locations(cafile=requests.utils.DEFAULT_CA_BUNDLE_PATH)
+
+    if cert:
+        if isinstance(cert, str):
+            context.load_cert_chain(cert)
+        else:
+            context.load_cert_chain(*cert)
+
+    return context
+
+
+class CancellableConnectionMixin:
+    """Соединение, которое прерывается при отмене токена текущего потока (см. api.cancellation),
+    пока запрос отправляется и ожидается ответ"""
+
+    sock: socket.socket | None
+    _cancel_token: cancellation.CancelToken | None = None
+
+    def abort(self) -> None:
+        sock: socket.socket | None = self.sock
+        if sock is None:
+            return
+
+        try:
+            # NOTE: socket.socket.shutdown, т.к. SSLSocket.shutdown меняет объект,
+            #       который используется в потоке запроса
+            socket.socket.shutdown(sock, socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def _unregister_cancel(self) -> None:
+        if self._cancel_token:
+            self._cancel_token.remove_callback(self.abort)
+            self._cancel_token = None
+
+    def request(self, *args, **kwargs):
+        self._unregister_cancel()
+
+        token: cancellation.CancelToken | None = cancellation.get_token()
+        if token:
+            token.raise_if_cancelled()
+            token.add_callback(self.abort)
+            self._cancel_token = token
+
+        try:
+            return super().request(*args, **kwargs)
+        except BaseException:
+            self._unregister_cancel()
+            raise
+
+    def getresponse(self, *args, **kwargs):
+        try:
+            response = super().getresponse(*args, **kwargs)
+        finally:
+            self._unregister_cancel()
+
+        # NOTE: В TLS 1.3 билет сессии приходит после рукопожатия, поэтому
+        #       сессия сохраняется еще и после получения ответа
+        sock = self.sock
+        if isinstance(sock, ssl.SSLSocket) and isinstance(sock.context, SessionSSLContext):
+            sock.context.save_session(sock)
+
+        return response
+
+
+class CancellableHTTPConnection(CancellableConnectionMixin, urllib3.connection.HTTPConnection):
+    pass
+
+
+class CancellableHTTPSConnection(CancellableConnectionMixin, urllib3.connection.HTTPSConnection):
+    pass
+
+
+class CancellableHTTPConnectionPool(urllib3.HTTPConnectionPool):
+    ConnectionCls = CancellableHTTPConnection
+
+
+class CancellableHTTPSConnectionPool(urllib3.HTTPSConnectionPool):
+    ConnectionCls = CancellableHTTPSConnection
+
+
+CANCELLABLE_POOL_CLASSES_BY_SCHEME: dict[str, type[urllib3.HTTPConnectionPool]] = {
+    "http": CancellableHTTPConnectionPool,
+    "https": CancellableHTTPSConnectionPool,
+}
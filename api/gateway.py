@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "ipetrash"
+
+
+import hashlib
+import http.client
+import os
+import shutil
+import socket
+import socketserver
+import stat
+import struct
+import tempfile
+import threading
+import time
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+
+from api import cancellation
+from api.jira_rss_team import RateLimiter
+from config import (
+    JIRA_HOST,
+    GATEWAY_CACHE_SECONDS,
+    GATEWAY_CACHE_MAX_MB,
+    GATEWAY_REQUESTS_PER_SECOND,
+)
+
+
+DEFAULT_SOCKET_PATH: Path = Path("/tmp/parse_jira_logged_time.sock")
+
+# Заголовки запроса к шлюзу: адрес и сертификат пользователя
+HEADER_URL: str = "X-Gateway-Url"
+HEADER_CERT: str = "X-Gateway-Cert"
+
+# Заголовок ответа шлюза: ответ из кэша (HIT), общий с одновременным запросом (SHARED) или новый (MISS)
+HEADER_CACHE: str = "X-Gateway-Cache"
+
+# Заголовки, которые относятся к соединению, а не к содержимому
+HOP_BY_HOP_HEADERS: set[str] = {
+    "connection",
+    "keep-alive",
+    "transfer-encoding",
+    "content-encoding",
+    "content-length",
+    "host",
+    "proxy-connection",
+    "upgrade",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class GatewayResponse:
+    status: int
+    reason: str
+    headers: list[tuple[str, str]]
+    content: bytes
+    created: float
+
+
+class InFlight:
+    """Запрос к хосту, ответ на который ждут одинаковые запросы"""
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.response: GatewayResponse | None = None
+        self.error: Exception | None = None
+
+
+def get_peer_uid(sock: socket.socket) -> int | None:
+    """Идентификатор пользователя процесса на другой стороне сокета (только Linux)"""
+
+    if not hasattr(socket, "SO_PEERCRED"):
+        return
+
+    fmt: str = "3i"  # pid, uid, gid
+    _, uid, _ = struct.unpack(
+        fmt, sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize(fmt))
+    )
+    return uid
+
+
+def read_cert(path: str, uid: int) -> bytes:
+    """Содержимое сертификата пользователя uid.
+
+    Файл открывается один раз без перехода по символической ссылке, а владелец
+    проверяется по открытому файлу, поэтому подменить файл после проверки нельзя.
+    """
+
+    fd: int = os.open(path, os.O_RDONLY | os.O_NOFOLLOW)
+    with os.fdopen(fd, "rb") as f:
+        st: os.stat_result = os.fstat(f.fileno())
+        if not stat.S_ISREG(st.st_mode):
+            raise PermissionError("Сертификат должен быть файлом")
+
+        if uid != 0 and st.st_uid != uid:
+            raise PermissionError("Сертификат принадлежит другому пользователю")
+
+        return f.read()
+
+
+class Gateway:
+    """Общий для экземпляров приложения на одном хосте шлюз запросов к джире.
+
+    Одинаковые GET-запросы, которые выполняются одновременно, объединяются в один,
+    успешные ответы кэшируются на cache_seconds. Ключ кэша включает пользователя
+    процесса и отпечаток сертификата, поэтому ответы одного пользователя не видны другому.
+    Запросы выполняются с копией сертификата, прочитанного при проверке владельца.
+    Частота запросов к хосту ограничена для всех пользователей вместе.
+    """
+
+    def __init__(
+        self,
+        host: str = JIRA_HOST,
+        cache_seconds: float = GATEWAY_CACHE_SECONDS,
+        cache_max_bytes: int = GATEWAY_CACHE_MAX_MB * 1024 * 1024,
+        requests_per_second: float = GATEWAY_REQUESTS_PER_SECOND,
+    ) -> None:
+        self.host: str = host
+        self.cache_seconds: float = cache_seconds
+        self.cache_max_bytes: int = cache_max_bytes
+        self.rate_limiter = RateLimiter(requests_per_second)
+
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[str, GatewayResponse] = OrderedDict()
+        self._cache_bytes: int = 0
+        self._in_flight: dict[str, InFlight] = dict()
+        self._session_by_fingerprint: dict[str, requests.Session] = dict()
+
+        # Копии сертификатов пользователей, доступные только процессу шлюза
+        self._dir_certs = Path(tempfile.mkdtemp(prefix="gateway_certs_"))
+
+        self.stats: dict[str, int] = {"HIT": 0, "SHARED": 0, "MISS": 0, "UPSTREAM": 0}
+
+    def _get_session(self, fingerprint: str, cert_data: bytes) -> requests.Session:
+        with self._lock:
+            session = self._session_by_fingerprint.get(fingerprint)
+            if not session:
+                path: Path = self._dir_certs / f"{fingerprint}.pem"
+                fd: int = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                with os.fdopen(fd, "wb") as f:
+                    f.write(cert_data)
+
+                session = requests.session()
+                session.cert = str(path)
+                self._session_by_fingerprint[fingerprint] = session
+
+        return session
+
+    def close(self) -> None:
+        with self._lock:
+            for session in self._session_by_fingerprint.values():
+                session.close()
+            self._session_by_fingerprint.clear()
+
+        shutil.rmtree(self._dir_certs, ignore_errors=True)
+
+    def _request(
+        self,
+        session: requests.Session,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        body: bytes | None,
+        timeout: float,
+    ) -> GatewayResponse:
+        self.rate_limiter.wait(urlparse(url).netloc)
+
+        with self._lock:
+            self.stats["UPSTREAM"] += 1
+
+        rs = session.request(
+            method, url, headers=headers, data=body, timeout=timeout, allow_redirects=False
+        )
+        return GatewayResponse(
+            status=rs.status_code,
+            reason=rs.reason,
+            headers=[
+                (name, value)
+                for name, value in rs.headers.items()
+                if name.lower() not in HOP_BY_HOP_HEADERS
+            ],
+            content=rs.content,
+            created=time.monotonic(),
+        )
+
+    def _get_cached(self, key: str) -> GatewayResponse | None:
+        response: GatewayResponse | None = self._cache.get(key)
+        if not response:
+            return
+
+        if time.monotonic() - response.created > self.cache_seconds:
+            self._cache_bytes -= len(self._cache.pop(key).content)
+            return
+
+        self._cache.move_to_end(key)
+        return response
+
+    def _set_cached(self, key: str, response: GatewayResponse) -> None:
+        if key in self._cache:
+            self._cache_bytes -= len(self._cache.pop(key).content)
+
+        self._cache[key] = response
+        self._cache_bytes += len(response.content)
+
+        # Удаляются давно не использованные ответы
+        while self._cache_bytes > self.cache_max_bytes and self._cache:
+            _, old = self._cache.popitem(last=False)
+            self._cache_bytes -= len(old.content)
+
+    def send(
+        self,
+        uid: int,
+        cert_data: bytes,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        body: bytes | None,
+        timeout: float,
+    ) -> tuple[GatewayResponse, str]:
+        fingerprint: str = hashlib.sha256(cert_data).hexdigest()
+        session: requests.Session = self._get_session(fingerprint, cert_data)
+
+        # Запросы, которые могут что-то менять, не кэшируются и не объединяются
+        if method != "GET":
+            with self._lock:
+                self.stats["MISS"] += 1
+            return self._request(session, method, url, headers, body, timeout), "MISS"
+
+        key: str = hashlib.sha256(
+            "\n".join(
+                [
+                    str(uid),
+                    fingerprint,
+                    url,
+                    # Условные запросы и разные форматы ответа кэшируются отдельно
+                    headers.get("If-None-Match", ""),
+                    headers.get("Accept", ""),
+                ]
+            ).encode("utf-8")
+        ).hexdigest()
+
+        with self._lock:
+            response: GatewayResponse | None = self._get_cached(key)
+            if response:
+                self.stats["HIT"] += 1
+                return response, "HIT"
+
+            in_flight: InFlight | None = self._in_flight.get(key)
+            is_leader: bool = in_flight is None
+            if is_leader:
+                in_flight = InFlight()
+                self._in_flight[key] = in_flight
+                self.stats["MISS"] += 1
+            else:
+                self.stats["SHARED"] += 1
+
+        if not is_leader:
+            if not in_flight.event.wait(timeout):
+                raise TimeoutError(f"Не дождались ответа на одинаковый запрос к {url}")
+            if in_flight.error:
+                raise in_flight.error
+            return in_flight.response, "SHARED"
+
+        try:
+            response = self._request(session, method, url, headers, body, timeout)
+            in_flight.response = response
+        except Exception as e:
+            in_flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+                if in_flight.response and in_flight.response.status == 200:
+                    self._set_cached(key, in_flight.response)
+            in_flight.event.set()
+
+        return response, "MISS"
+
+
+class GatewayRequestHandler(BaseHTTPRequestHandler):
+    server: "GatewayServer"
+
+    # NOTE: Текст ошибок передается в explain (тело ответа), т.к. строка статуса только в latin-1
+    def _handle(self) -> None:
+        url: str | None = self.headers.get(HEADER_URL)
+        cert: str | None = self.headers.get(HEADER_CERT)
+        if not url or not cert:
+            self.send_error(400, explain=f"Нужны заголовки {HEADER_URL} и {HEADER_CERT}")
+            return
+
+        gateway: Gateway = self.server.gateway
+
+        # Шлюз не должен быть открытым прокси
+        if not url.startswith(f"{gateway.host}/") and url != gateway.host:
+            self.send_error(403, explain=f"Разрешены только запросы к {gateway.host}")
+            return
+
+        # Без пользователя процесса нельзя проверить, чей сертификат
+        uid: int | None = get_peer_uid(self.request)
+        if uid is None:
+            self.send_error(403, explain="Не удалось определить пользователя процесса")
+            return
+
+        # Пользователь может использовать только свой сертификат
+        try:
+            cert_data: bytes = read_cert(cert, uid)
+        except PermissionError as e:
+            self.send_error(403, explain=str(e))
+            return
+        except OSError:
+            self.send_error(403, explain="Сертификат не найден или является ссылкой")
+            return
+
+        length: int = int(self.headers.get("Content-Length") or 0)
+        body: bytes | None = self.rfile.read(length) if length else None
+
+        headers: dict[str, str] = {
+            name: value
+            for name, value in self.headers.items()
+            if name.lower() not in HOP_BY_HOP_HEADERS
+            and name not in (HEADER_URL, HEADER_CERT)
+        }
+
+        try:
+            response, cache = gateway.send(
+                uid=uid,
+                cert_data=cert_data,
+                method=self.command,
+                url=url,
+                headers=headers,
+                body=body,
+                timeout=self.server.timeout_upstream,
+            )
+        except Exception as e:
+            self.send_error(502, explain=f"{type(e).__name__}: {e}")
+            return
+
+        self.send_response(response.status, response.reason)
+        for name, value in response.headers:
+            self.send_header(name, value)
+        self.send_header(HEADER_CACHE, cache)
+        self.send_header("Content-Length", str(len(response.content)))
+        self.end_headers()
+
+        if self.command != "HEAD":
+            self.wfile.write(response.content)
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = _handle
+
+    def log_request(self, code: int | str = "-", size: int | str = "-") -> None:
+        self.log_message("%s %s %s", self.command, self.headers.get(HEADER_URL), code)
+
+    def log_message(self, format: str, *args) -> None:
+        # NOTE: У Unix-сокета нет адреса клиента
+        print(f"[{self.log_date_time_string()}] {format % args}")
+
+
+class GatewayServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    # NOTE: Если очередь подключений заполнена, то connect Unix-сокета с таймаутом
+    #       сразу завершается ошибкой EAGAIN, а не ждет
+    request_queue_size = 128
+
+    def __init__(
+        self,
+        path: Path = DEFAULT_SOCKET_PATH,
+        gateway: Gateway | None = None,
+        timeout_upstream: float = 60,
+    ) -> None:
+        self.path: Path = path
+        self.gateway: Gateway = gateway or Gateway()
+        self.timeout_upstream: float = timeout_upstream
+
+        # Сокет от прошлого запуска
+        path.unlink(missing_ok=True)
+
+        super().__init__(str(path), GatewayRequestHandler)
+
+        # Подключаться могут все пользователи хоста, изоляция - по пользователю процесса.
+        # NOTE: Если ОС не сообщает пользователя процесса (SO_PEERCRED), то запросы отклоняются
+        os.chmod(path, 0o666)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.path.unlink(missing_ok=True)
+        self.gateway.close()
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self.path_socket: str = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path_socket)
+
+    def abort(self) -> None:
+        if self.sock:
+            try:
+                self.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+def send_via_gateway(
+    path: str | Path,
+    request: requests.PreparedRequest,
+    cert: str,
+    timeout: float,
+) -> requests.Response:
+    """Выполнение запроса через шлюз. Если шлюз не запущен, то будет FileNotFoundError или ConnectionRefusedError"""
+
+    headers: dict[str, str] = dict(request.headers)
+    headers[HEADER_URL] = request.url
+    headers[HEADER_CERT] = str(Path(cert).resolve())
+
+    body = request.body
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+
+    conn = UnixHTTPConnection(str(path), timeout=timeout)
+    try:
+        # При отмене операции соединение со шлюзом прерывается
+        with cancellation.on_cancel(conn.abort):
+            conn.request(request.method, "/", body=body, headers=headers)
+            rs = conn.getresponse()
+            content: bytes = rs.read()
+    finally:
+        conn.close()
+
+    response = requests.Response()
+    response.status_code = rs.status
+    response.reason = rs.reason
+    response.headers = requests.structures.CaseInsensitiveDict(rs.getheaders())
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    response.url = request.url
+    response.request = request
+    response._content = content
+    response._content_consumed = True
+    return response
+
+
+def run(path: Path = DEFAULT_SOCKET_PATH) -> None:
+    server = GatewayServer(path)
+    print(f"Шлюз запущен: {path}, хост: {server.gateway.host}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        print(f"Статистика: {server.gateway.stats}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "ipetrash"
+
+
+import dataclasses
+import json
+import sqlite3
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime, date, timedelta
+from enum import Enum
+from pathlib import Path
+from typing import Any
+
+from config import (
+    PATH_HISTORY,
+    HISTORY_RAW_DAYS,
+    HISTORY_HOURLY_DAYS,
+    HISTORY_RETENTION_DAYS,
+)
+
+
+SQL_CREATE: str = """
+CREATE TABLE IF NOT EXISTS points (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    ts REAL NOT NULL,
+    resolution TEXT NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS points_name_ts ON points(name, ts);
+"""
+
+# Прореживание не чаще, чем раз в час
+COMPACT_INTERVAL_SECONDS: int = 60 * 60
+
+
+class Resolution(Enum):
+    RAW = "raw"
+    HOUR = "hour"
+    DAY = "day"
+
+
+# Формат strftime в SQLite для группировки точек по часам и дням
+BUCKET_BY_RESOLUTION: dict[Resolution, str] = {
+    Resolution.HOUR: "%Y-%m-%d %H",
+    Resolution.DAY: "%Y-%m-%d",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class HistoryPoint:
+    dt: datetime
+    resolution: Resolution
+    value: Any
+
+
+def to_json_value(obj: Any) -> Any:
+    """Перевод результата (dataclass, даты, исключения и т.п.) в значение для JSON"""
+
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+
+    if isinstance(obj, Enum):
+        return obj.name
+
+    if isinstance(obj, Exception):
+        return {"error": f"{type(obj).__name__}: {obj}"}
+
+    if dataclasses.is_dataclass(obj):
+        return {
+            f.name: to_json_value(getattr(obj, f.name)) for f in dataclasses.fields(obj)
+        }
+
+    if isinstance(obj, tuple) and hasattr(obj, "_asdict"):
+        return to_json_value(obj._asdict())
+
+    if isinstance(obj, dict):
+        return {
+            key if isinstance(key, str) else str(to_json_value(key)): to_json_value(value)
+            for key, value in obj.items()
+        }
+
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return [to_json_value(value) for value in obj]
+
+    return str(obj)
+
+
+class HistoryStore:
+    """История результатов (временные ряды) в SQLite.
+
+    Точки старше raw_days прореживаются до последней точки в каждом часе,
+    старше hourly_days - до последней точки в каждом дне, а точки старше
+    retention_days удаляются.
+
+    append_async сериализует значение сразу, а запись в SQLite выполняется в фоне,
+    чтобы не блокировать GUI.
+    """
+
+    def __init__(
+        self,
+        path: Path = PATH_HISTORY,
+        raw_days: float = HISTORY_RAW_DAYS,
+        hourly_days: float = HISTORY_HOURLY_DAYS,
+        retention_days: float = HISTORY_RETENTION_DAYS,
+    ) -> None:
+        self.path: Path = path
+        self.raw_days: float = raw_days
+        self.hourly_days: float = hourly_days
+        self.retention_days: float = retention_days
+
+        self._lock = threading.Lock()
+        self._is_created: bool = False
+        self._last_compact: float = 0
+
+        # Точки, которые еще не записаны: (name, ts, value)
+        self._pending_lock = threading.Lock()
+        self._pending: list[tuple[str, float, str]] = []
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="History")
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._is_created:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._is_created:
+            conn.executescript(SQL_CREATE)
+            self._is_created = True
+
+        return conn
+
+    @staticmethod
+    def _to_point(
+        name: str, value: Any, dt: datetime | None = None
+    ) -> tuple[str, float, str]:
+        ts: float = dt.timestamp() if dt else time.time()
+        text: str = json.dumps(to_json_value(value), ensure_ascii=False)
+        return name, ts, text
+
+    def _insert(self, points: list[tuple[str, float, str]]) -> None:
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT INTO points (name, ts, resolution, value) VALUES (?, ?, ?, ?)",
+                [(name, ts, Resolution.RAW.value, text) for name, ts, text in points],
+            )
+
+            if time.time() - self._last_compact >= COMPACT_INTERVAL_SECONDS:
+                self._compact(conn)
+
+    def append(self, name: str, value: Any, dt: datetime | None = None) -> None:
+        self._insert([self._to_point(name, value, dt)])
+
+    def append_async(self, name: str, value: Any, dt: datetime | None = None) -> None:
+        point: tuple[str, float, str] = self._to_point(name, value, dt)
+
+        with self._pending_lock:
+            is_scheduled: bool = bool(self._pending)
+            self._pending.append(point)
+
+        if not is_scheduled:
+            self._executor.submit(self._write_pending)
+
+    def _write_pending(self) -> None:
+        with self._pending_lock:
+            points: list[tuple[str, float, str]] = self._pending.copy()
+            self._pending.clear()
+        if not points:
+            return
+
+        try:
+            self._insert(points)
+        except Exception as e:
+            # NOTE: Ошибка истории не должна влиять на аддоны
+            print(f"[#] Не удалось сохранить историю: {e}")
+
+    def flush(self) -> None:
+        """Запись точек, которые еще не записаны. Вызывается при завершении"""
+        self._write_pending()
+
+    def get_range(
+        self,
+        name: str,
+        dt_from: datetime | date | None = None,
+        dt_to: datetime | date | None = None,
+    ) -> list[HistoryPoint]:
+        """Точки результатов в диапазоне [dt_from, dt_to] по возрастанию времени"""
+
+        def _to_ts(value: datetime | date) -> float:
+            if not isinstance(value, datetime):
+                value = datetime.combine(value, datetime.min.time())
+            return value.timestamp()
+
+        sql: str = "SELECT ts, resolution, value FROM points WHERE name = ?"
+        params: list = [name]
+        if dt_from:
+            sql += " AND ts >= ?"
+            params.append(_to_ts(dt_from))
+        if dt_to:
+            # Дата без времени включает весь день
+            if not isinstance(dt_to, datetime):
+                dt_to += timedelta(days=1)
+                sql += " AND ts < ?"
+            else:
+                sql += " AND ts <= ?"
+            params.append(_to_ts(dt_to))
+        sql += " ORDER BY ts"
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(sql, params).fetchall()
+
+        return [
+            HistoryPoint(
+                dt=datetime.fromtimestamp(ts),
+                resolution=Resolution(resolution),
+                value=json.loads(value),
+            )
+            for ts, resolution, value in rows
+        ]
+
+    def get_last(self, name: str) -> HistoryPoint | None:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT ts, resolution, value FROM points WHERE name = ?"
+                " ORDER BY ts DESC LIMIT 1",
+                (name,),
+            ).fetchone()
+
+        if not row:
+            return
+
+        ts, resolution, value = row
+        return HistoryPoint(
+            dt=datetime.fromtimestamp(ts),
+            resolution=Resolution(resolution),
+            value=json.loads(value),
+        )
+
+    def get_names(self) -> list[str]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT DISTINCT name FROM points ORDER BY name").fetchall()
+
+        return [name for (name,) in rows]
+
+    def compact(self, now: datetime | None = None) -> int:
+        """Прореживание и удаление старых точек. Возвращает количество удаленных точек"""
+
+        with self._lock, closing(self._connect()) as conn, conn:
+            return self._compact(conn, now)
+
+    def _downsample(
+        self,
+        conn: sqlite3.Connection,
+        source: Resolution,
+        target: Resolution,
+        before_ts: float,
+    ) -> int:
+        # Граница по началу часа (дня), чтобы не прореживать незавершенный интервал
+        dt: datetime = datetime.fromtimestamp(before_ts).replace(
+            minute=0, second=0, microsecond=0
+        )
+        if target == Resolution.DAY:
+            dt = dt.replace(hour=0)
+        before_ts = dt.timestamp()
+
+        # В каждом часе (дне) остается последняя точка, т.к. результаты - это снимки состояния
+        bucket: str = f"strftime('{BUCKET_BY_RESOLUTION[target]}', ts, 'unixepoch', 'localtime')"
+        deleted: int = conn.execute(
+            f"""
+            DELETE FROM points
+            WHERE resolution = :source AND ts < :before_ts AND id NOT IN (
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (
+                        PARTITION BY name, {bucket} ORDER BY ts DESC, id DESC
+                    ) AS number
+                    FROM points
+                    WHERE resolution = :source AND ts < :before_ts
+                )
+                WHERE number = 1
+            )
+            """,
+            dict(source=source.value, before_ts=before_ts),
+        ).rowcount
+
+        conn.execute(
+            "UPDATE points SET resolution = ? WHERE resolution = ? AND ts < ?",
+            (target.value, source.value, before_ts),
+        )
+        return deleted
+
+    def _compact(self, conn: sqlite3.Connection, now: datetime | None = None) -> int:
+        ts: float = (now or datetime.now()).timestamp()
+        day_seconds: int = 24 * 60 * 60
+
+        deleted: int = self._downsample(
+            conn, Resolution.RAW, Resolution.HOUR, ts - self.raw_days * day_seconds
+        )
+        deleted += self._downsample(
+            conn, Resolution.HOUR, Resolution.DAY, ts - self.hourly_days * day_seconds
+        )
+        deleted += conn.execute(
+            "DELETE FROM points WHERE ts < ?",
+            (ts - self.retention_days * day_seconds,),
+        ).rowcount
+
+        self._last_compact = time.time()
+        return deleted
+
+
+HISTORY = HistoryStore()
+
+
+if __name__ == "__main__":
+    print(f"Path: {HISTORY.path}")
+    print(f"Deleted on compact: {HISTORY.compact()}")
+
+    for name in HISTORY.get_names():
+        points: list[HistoryPoint] = HISTORY.get_range(name)
+        print(f"{name}: {len(points)} points")
+        for point in points[-3:]:
+            print(f"    {point.dt} [{point.resolution.value}] {point.value}")
@@ -4,7 +4,13 @@
 __author__ = "ipetrash"
 
 
-from config import JIRA_HOST
+import hashlib
+import json
+import threading
+
+from pathlib import Path
+
+from config import JIRA_HOST, PATH_CERT, PATH_USERNAMES
 from api import session
 
 
@@ -15,5 +21,79 @@ def get_jira_current_username() -> str:
     return rs.json()["name"]
 
 
+def get_cert_fingerprint(path_cert: Path = PATH_CERT) -> str:
+    return hashlib.sha256(path_cert.read_bytes()).hexdigest()
+
+
+class UsernameCache:
+    """Имена пользователей по отпечатку сертификата. Пользователь определяется
+    сертификатом, поэтому запрос к API нужен только для нового сертификата"""
+
+    def __init__(self, path: Path = PATH_USERNAMES) -> None:
+        self.path: Path = path
+
+        self._lock = threading.Lock()
+        # Одновременные запросы имени для одного сертификата объединяются в один
+        self._resolve_lock = threading.Lock()
+        self._username_by_fingerprint: dict[str, str] | None = None
+
+    def _load(self) -> dict[str, str]:
+        if self._username_by_fingerprint is None:
+            try:
+                self._username_by_fingerprint = json.loads(
+                    self.path.read_text("utf-8")
+                )
+            except (OSError, ValueError):
+                self._username_by_fingerprint = dict()
+
+        return self._username_by_fingerprint
+
+    def get(self, fingerprint: str) -> str | None:
+        with self._lock:
+            return self._load().get(fingerprint)
+
+    def set(self, fingerprint: str, username: str) -> None:
+        with self._lock:
+            username_by_fingerprint: dict[str, str] = self._load()
+            username_by_fingerprint[fingerprint] = username
+
+            try:
+                # Запись через временный файл, чтобы не было недописанного файла
+                path_tmp: Path = self.path.with_name(f"{self.path.name}.tmp")
+                path_tmp.write_text(
+                    json.dumps(username_by_fingerprint, indent=4), encoding="utf-8"
+                )
+                path_tmp.replace(self.path)
+            except OSError:
+                # Кэш в памяти продолжит работать
+                pass
+
+    def get_cached(self, path_cert: Path = PATH_CERT) -> str | None:
+        try:
+            return self.get(get_cert_fingerprint(path_cert))
+        except OSError:
+            return
+
+    def resolve(self, path_cert: Path = PATH_CERT) -> str:
+        fingerprint: str = get_cert_fingerprint(path_cert)
+
+        with self._resolve_lock:
+            username: str | None = self.get(fingerprint)
+            if not username:
+                username = get_jira_current_username()
+                self.set(fingerprint, username)
+
+        return username
+
+
+USERNAME_CACHE = UsernameCache()
+
+
+def get_username() -> str:
+    """Имя текущего пользователя: из кэша по сертификату или из API"""
+    return USERNAME_CACHE.resolve()
+
+
 if __name__ == "__main__":
     print(get_jira_current_username())
+    print(get_username())
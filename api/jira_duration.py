@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "ipetrash"
+
+
+import functools
+import re
+
+from dataclasses import dataclass
+
+from config import JIRA_HOURS_PER_DAY, JIRA_DAYS_PER_WEEK
+
+
+# Jira help:
+#   You can specify a time unit after a time value 'X', such as Xw, Xd, Xh or Xm, to represent weeks (w),
+#   days (d), hours (h) and minutes (m), respectively.
+#   If you do not specify a time unit, minute will be assumed.
+#   Your current conversion rates are 1w = 5d and 1d = 8h.
+
+
+@dataclass(frozen=True)
+class ConversionRates:
+    hours_per_day: float = 8
+    days_per_week: float = 5
+
+    @property
+    def minute(self) -> int:
+        return 60
+
+    @property
+    def hour(self) -> int:
+        return 60 * self.minute
+
+    @property
+    def day(self) -> int:
+        return round(self.hours_per_day * self.hour)
+
+    @property
+    def week(self) -> int:
+        return round(self.days_per_week * self.day)
+
+
+RATES = ConversionRates(
+    hours_per_day=JIRA_HOURS_PER_DAY,
+    days_per_week=JIRA_DAYS_PER_WEEK,
+)
+
+# Ограничение кэша: различных значений залогированного времени немного
+MAX_CACHE_DURATIONS: int = 1024
+
+# Части разделяются запятой или пробелами, после единицы измерения можно без разделителя:
+# "1 day, 30 minutes", "1w 2d 3h 30m", "1.5h", "1h30m", "90".
+# NOTE: Строка разбирается по частям, а не одним регулярным выражением: у выражения
+#       с повторением частей и пробелов в них и в разделителе экспоненциальный перебор
+PATTERN_PART: re.Pattern = re.compile(
+    r"(\d+(?:\.\d+)?)(?:\s*(w(?:eeks?)?|d(?:ays?)?|h(?:ours?)?|m(?:inutes?)?))?",
+    flags=re.IGNORECASE,
+)
+PATTERN_SEPARATOR: re.Pattern = re.compile(r"\s*,\s*|\s+")
+
+# Десятичная запятая ("1,5h") не поддерживается, чтобы не считать ее разделителем частей
+PATTERN_DECIMAL_COMMA: re.Pattern = re.compile(r"\d,\d")
+
+
+def parse_parts(human_time: str) -> list[tuple[str, str | None]]:
+    """Части времени: значение и единица измерения (None, если не задана)"""
+
+    text: str = human_time.strip()
+    if not text or PATTERN_DECIMAL_COMMA.search(text):
+        raise ValueError(f"Неизвестный формат времени: {human_time!r}")
+
+    parts: list[tuple[str, str | None]] = []
+    pos: int = 0
+    while True:
+        m = PATTERN_PART.match(text, pos)
+        if not m:
+            raise ValueError(f"Неизвестный формат времени: {human_time!r}")
+
+        parts.append(m.groups())
+        pos = m.end()
+        if pos == len(text):
+            return parts
+
+        if m_separator := PATTERN_SEPARATOR.match(text, pos):
+            pos = m_separator.end()
+        elif not m.group(2):
+            # Без единицы измерения следующая часть должна быть после разделителя
+            raise ValueError(f"Неизвестный формат времени: {human_time!r}")
+
+
+@functools.lru_cache(maxsize=MAX_CACHE_DURATIONS)
+def logged_human_time_to_seconds(
+    human_time: str,
+    rates: ConversionRates = RATES,
+) -> int:
+    """Конвертирование человеко-читаемого времени в секунды.
+
+    >>> logged_human_time_to_seconds("6 hours, 30 minutes")
+    23400
+    >>> logged_human_time_to_seconds("1d 30m")
+    30600
+    >>> logged_human_time_to_seconds("1.5h")
+    5400
+    """
+
+    unit_seconds: dict[str, int] = {
+        "w": rates.week,
+        "d": rates.day,
+        "h": rates.hour,
+        "m": rates.minute,
+    }
+
+    total_seconds: float = 0
+    for value, unit in parse_parts(human_time):
+        # Без единицы измерения считаются минуты
+        unit = unit[0].lower() if unit else "m"
+        total_seconds += float(value) * unit_seconds[unit]
+
+    return round(total_seconds)
+
+
+def seconds_to_logged_human_time(seconds: int, rates: ConversionRates = RATES) -> str:
+    weeks, seconds = divmod(seconds, rates.week)
+    days, seconds = divmod(seconds, rates.day)
+    hours, seconds = divmod(seconds, rates.hour)
+    minutes, _ = divmod(seconds, rates.minute)
+
+    def _get_suffix(n: int) -> str:
+        return "s" if n > 1 else ""
+
+    items = [
+        f"{weeks} week{_get_suffix(weeks)}" if weeks else "",
+        f"{days} day{_get_suffix(days)}" if days else "",
+        f"{hours} hour{_get_suffix(hours)}" if hours else "",
+        f"{minutes} minute{_get_suffix(minutes)}" if minutes else "",
+    ]
+    return ", ".join(filter(None, items))
+
+
+if __name__ == "__main__":
+    import time
+    import timeit
+
+    from third_party import jira_logged_human_time_to_seconds as old
+
+    default_rates = ConversionRates()
+
+    items: list[tuple[str, int]] = [
+        ("2 hours", 2 * 3600),
+        ("1 hour, 15 minutes", 3600 + 15 * 60),
+        ("1 day, 1 hour", 8 * 3600 + 3600),
+        ("1 day, 30 minutes", 8 * 3600 + 1800),
+        ("1 minute", 60),
+        ("1 week", 5 * 8 * 3600),
+        ("1 week, 2 days, 1 hour", (5 + 2) * 8 * 3600 + 3600),
+    ]
+    for value, expected in items:
+        seconds = logged_human_time_to_seconds(value, default_rates)
+        print(f"{value!r} -> {seconds} seconds")
+        assert seconds == expected == old.logged_human_time_to_seconds(value)
+        assert seconds_to_logged_human_time(seconds, default_rates) == value
+
+    for value, expected in [
+        ("1w 2d 3h 30m", (5 + 2) * 8 * 3600 + 3 * 3600 + 1800),
+        ("1h30m", 3600 + 1800),
+        ("1.5h", 5400),
+        ("0.5d", 4 * 3600),
+        ("90", 90 * 60),
+        ("2 Hours", 2 * 3600),
+    ]:
+        seconds = logged_human_time_to_seconds(value, default_rates)
+        print(f"{value!r} -> {seconds} seconds")
+        assert seconds == expected
+
+    for value in [
+        "",
+        "1 month",
+        "h",
+        "1.h",
+        "130 minutes abc",
+        "1,5h",
+        "1 hour,",
+        "1 " * 20 + "x",
+        "1 " * 1000 + "x",
+    ]:
+        t = time.perf_counter()
+        try:
+            logged_human_time_to_seconds(value, default_rates)
+            assert False, value
+        except ValueError:
+            pass
+
+        # Без экспоненциального перебора
+        assert time.perf_counter() - t < 0.1, value
+
+    rates = ConversionRates(hours_per_day=7.5, days_per_week=4)
+    assert logged_human_time_to_seconds("1w 1d", rates) == 5 * 7.5 * 3600
+    for seconds in range(0, 3 * rates.week, 60):
+        value = seconds_to_logged_human_time(seconds, rates)
+        if value:
+            assert logged_human_time_to_seconds(value, rates) == seconds, value
+
+    number = 100_000
+    value = "1 day, 4 hours, 15 minutes"
+    print()
+    print(
+        "third_party:",
+        timeit.timeit(lambda: old.logged_human_time_to_seconds(value), number=number),
+    )
+    print(
+        "api.jira_duration:",
+        timeit.timeit(lambda: logged_human_time_to_seconds(value), number=number),
+    )
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "ipetrash"
+
+
+import threading
+import time
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Iterable
+
+from api import session
+from api.jira_duration import seconds_to_logged_human_time
+from api.tracing import span
+from config import JIRA_HOST, ISSUE_COLUMNS, ISSUE_CACHE_TTL_MINUTES
+
+
+URL_SEARCH = f"{JIRA_HOST}/rest/api/latest/search"
+
+# Количество задач в одном запросе "key in (...)"
+CHUNK_SIZE: int = 100
+
+LABEL_BY_FIELD: dict[str, str] = {
+    "status": "СТАТУС",
+    "issuetype": "ТИП",
+    "priority": "ПРИОРИТЕТ",
+    "resolution": "РЕШЕНИЕ",
+    "assignee": "ИСПОЛНИТЕЛЬ",
+    "reporter": "АВТОР",
+    "project": "ПРОЕКТ",
+    "components": "КОМПОНЕНТЫ",
+    "fixVersions": "ВЕРСИИ",
+    "timeoriginalestimate": "ОЦЕНКА",
+    "timeestimate": "ОСТАЛОСЬ",
+    "timespent": "ЗАТРАЧЕНО",
+}
+
+# Поля со временем в секундах
+TIME_FIELDS: set[str] = {"timeoriginalestimate", "timeestimate", "timespent"}
+
+
+@dataclass(frozen=True, slots=True)
+class IssueInfo:
+    key: str
+    updated: str
+    fields: dict[str, str]
+    fetched: float
+
+
+def parse_updated(value: str) -> datetime | None:
+    """Время изменения задачи из поля updated (например, "2026-10-01T10:00:00.000+0300")"""
+
+    try:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%z")
+    except ValueError:
+        return
+
+
+def get_field_label(field: str) -> str:
+    return LABEL_BY_FIELD.get(field, field.upper())
+
+
+def get_field_text(field: str, value: Any) -> str:
+    if value is None:
+        return ""
+
+    if field in TIME_FIELDS and isinstance(value, int):
+        return seconds_to_logged_human_time(value)
+
+    if isinstance(value, list):
+        return ", ".join(get_field_text(field, v) for v in value)
+
+    if isinstance(value, dict):
+        for name in ["displayName", "name", "value", "key"]:
+            if name in value:
+                return str(value[name])
+
+    return str(value)
+
+
+def search_issue_infos(
+    keys: list[str],
+    fields: list[str],
+    updated_after: datetime | None = None,
+) -> list[IssueInfo]:
+    """Поиск задач по ключам одним запросом, только с нужными полями.
+
+    Если задан updated_after, то будут только задачи, измененные после него.
+    Время в JQL без часового пояса, поэтому updated_after должен быть в часовом поясе
+    джиры, например, из поля updated задачи.
+    """
+
+    jql: str = f"key in ({', '.join(keys)})"
+    if updated_after:
+        # NOTE: В JQL время с точностью до минуты
+        jql += f' AND updated >= "{updated_after - timedelta(minutes=1):%Y/%m/%d %H:%M}"'
+
+    query = {
+        "jql": jql,
+        "fields": ",".join(["updated", *fields]),
+        "maxResults": len(keys),
+        # Несуществующие или недоступные ключи не должны приводить к ошибке всего запроса
+        "validateQuery": "warn",
+    }
+    rs = session.get(URL_SEARCH, params=query)
+    rs.raise_for_status()
+
+    now: float = time.time()
+    return [
+        IssueInfo(
+            key=issue["key"],
+            updated=issue["fields"]["updated"],
+            fields={
+                field: get_field_text(field, issue["fields"].get(field))
+                for field in fields
+            },
+            fetched=now,
+        )
+        for issue in rs.json()["issues"]
+    ]
+
+
+def get_chunks(items: list[str], size: int = CHUNK_SIZE) -> Iterable[list[str]]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+class IssueInfoCache:
+    """Поля задач. Повторно запрашиваются только задачи, измененные с последнего запроса"""
+
+    def __init__(self, ttl_seconds: float = ISSUE_CACHE_TTL_MINUTES * 60) -> None:
+        self.ttl_seconds: float = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._by_key: dict[str, IssueInfo] = dict()
+
+    def get(self, key: str) -> IssueInfo | None:
+        with self._lock:
+            return self._by_key.get(key)
+
+    def _set(self, items: list[IssueInfo]) -> None:
+        with self._lock:
+            for info in items:
+                self._by_key[info.key] = info
+
+    def update(self, keys: Iterable[str], fields: list[str] = ISSUE_COLUMNS) -> int:
+        """Получение полей задач, которых нет в кэше или которые давно проверялись.
+
+        Возвращает количество запросов.
+        """
+
+        now: float = time.time()
+
+        missing: list[str] = []
+        stale: list[IssueInfo] = []
+        for key in sorted(set(keys)):
+            info: IssueInfo | None = self.get(key)
+            if not info or not set(fields) <= info.fields.keys():
+                missing.append(key)
+            elif now - info.fetched >= self.ttl_seconds:
+                stale.append(info)
+
+        requests: int = 0
+
+        for chunk in get_chunks(missing):
+            with span("search_issue_infos", cat="issues", keys=len(chunk)):
+                found: list[IssueInfo] = search_issue_infos(chunk, fields)
+            requests += 1
+
+            # Чтобы не запрашивать каждый раз удаленные или недоступные задачи
+            found_keys: set[str] = {info.key for info in found}
+            not_found: list[IssueInfo] = [
+                IssueInfo(key, "", {field: "" for field in fields}, time.time())
+                for key in chunk
+                if key not in found_keys
+            ]
+            self._set(found + not_found)
+
+        # Для проверенных ранее задач запрашиваются только измененные. Граница - самое
+        # позднее изменение задач из части: изменения после него будут позже. Время берется
+        # из ответа джиры, а не по часам клиента, которые могут быть в другом поясе
+        stale.sort(key=lambda info: info.updated)
+        for i in range(0, len(stale), CHUNK_SIZE):
+            chunk: list[IssueInfo] = stale[i : i + CHUNK_SIZE]
+            updated_after: datetime | None = max(
+                filter(None, (parse_updated(info.updated) for info in chunk)),
+                default=None,
+            )
+
+            with span("search_issue_infos", cat="issues", keys=len(chunk), stale=True):
+                changed: list[IssueInfo] = search_issue_infos(
+                    [info.key for info in chunk], fields, updated_after
+                )
+            requests += 1
+
+            key_by_changed: dict[str, IssueInfo] = {info.key: info for info in changed}
+            self._set(
+                [
+                    key_by_changed.get(info.key)
+                    or IssueInfo(info.key, info.updated, info.fields, time.time())
+                    for info in chunk
+                ]
+            )
+
+        return requests
+
+
+ISSUE_INFO_CACHE = IssueInfoCache()
+
+
+if __name__ == "__main__":
+    import sys
+
+    keys: list[str] = sys.argv[1:]
+    if not keys:
+        print(f"Использование: {sys.argv[0]} <ключ задачи> [<ключ задачи> ...]")
+        sys.exit(1)
+
+    fields: list[str] = ISSUE_COLUMNS or ["status", "issuetype"]
+    for _ in range(2):
+        t = time.perf_counter()
+        requests: int = ISSUE_INFO_CACHE.update(keys, fields)
+        print(f"Requests: {requests}, elapsed: {time.perf_counter() - t:.3f} secs")
+
+    for key in keys:
+        print(ISSUE_INFO_CACHE.get(key))
@@ -4,29 +4,76 @@
 __author__ = "ipetrash"
 
 
+import calendar
 import enum
+import functools
+import io
+import os
 import re
+import sys
+import threading
+import time
 import xml.etree.ElementTree as ET
+import zoneinfo
 
 from collections import defaultdict
 from dataclasses import dataclass
-from datetime import datetime, date, timezone
-
-from config import USERNAME, JIRA_HOST
+from datetime import datetime, date, timedelta, timezone, tzinfo
+from typing import Iterable, Iterator
+from urllib.parse import quote, unquote
+
+from config import (
+    USERNAME,
+    JIRA_HOST,
+    RSS_PROVIDERS,
+    RSS_PROJECTS,
+    RSS_ACTIVITIES,
+    RSS_WITH_DESCRIPTIONS,
+)
 from api import session, get_human_date
-from api.jira import get_jira_current_username
-from third_party.decode_escapes_telegram_bot.utils import decode
-from third_party.jira_logged_human_time_to_seconds import logged_human_time_to_seconds
+from api.archive import ARCHIVE
+from api.metrics import PARSE_DURATION
+from api.tracing import traced
+from api.jira import get_username
+from api.jira_duration import logged_human_time_to_seconds
+from third_party.decode_escapes_telegram_bot.utils import decode_escapes, decode_html
 from third_party.seconds_to_str import seconds_to_str
 
 PATTERN_TAGS: re.Pattern = re.compile("<.*?>")
 PATTERN_SPACES: re.Pattern = re.compile(r"\s{2,}")
 
 
+# Ограничение кэша очищенных строк: заголовки и описания часто повторяются
+MAX_CACHE_CLEAN_HTML: int = 4096
+
+
+def decode_fast(text: str) -> str:
+    """Аналог decode, но пропускает этапы, которые не могут ничего изменить.
+
+    Проверка выполняется перед каждым этапом, т.к. предыдущий этап может
+    добавить символы для следующего, например, "\\x26" -> "&"
+    """
+
+    if "\\" in text:
+        text = decode_escapes(text)
+
+    if "&" in text:
+        text = decode_html(text)
+
+    if "%" in text:
+        text = unquote(text)
+
+    return text
+
+
+@functools.lru_cache(maxsize=MAX_CACHE_CLEAN_HTML)
 def get_clean_html(raw_html: str) -> str:
-    text = PATTERN_TAGS.sub("", raw_html)
+    text = raw_html
+    if "<" in text:
+        text = PATTERN_TAGS.sub("", text)
+
     text = PATTERN_SPACES.sub(" ", text).strip()
-    return decode(text)
+    return decode_fast(text)
 
 
 class ActivityActionEnum(enum.Enum):
@@ -47,24 +94,60 @@ class ActivityActionEnum(enum.Enum):
     UNKNOWN = enum.auto()
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Logged:
     human_time: str
     seconds: int
     description: str | None = None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
+class Issue:
+    jira_id: str
+    jira_title: str
+
+
+# NOTE: Таблица задач разбора: у активностей одной задачи будет один объект Issue,
+#       вместо своих копий строк с ключом и названием. Таблица создается на каждый разбор,
+#       а не общая, чтобы при постоянных обновлениях (команда, демон) задачи не копились
+IssueTable = dict[tuple[str, str], Issue]
+
+
+def get_issue(jira_id: str, jira_title: str, issue_table: IssueTable) -> Issue:
+    key: tuple[str, str] = (jira_id, jira_title)
+
+    issue: Issue | None = issue_table.get(key)
+    if issue is None:
+        issue = issue_table[key] = Issue(
+            jira_id=sys.intern(jira_id), jira_title=sys.intern(jira_title)
+        )
+
+    return issue
+
+
+@dataclass(frozen=True, slots=True)
 class Activity:
     id: str
-    entry_dt: datetime
+    # Время в секундах от начала эпохи (UTC), datetime создается при обращении к entry_dt
+    entry_ts: int
     action: ActivityActionEnum
     action_text: str
-    jira_id: str
-    jira_title: str
+    issue: Issue
     logged: Logged | None = None
     link_to_comment: str | None = None
 
+    @property
+    def entry_dt(self) -> datetime:
+        return datetime.fromtimestamp(self.entry_ts, tz=LOCAL_TIMEZONE)
+
+    @property
+    def jira_id(self) -> str:
+        return self.issue.jira_id
+
+    @property
+    def jira_title(self) -> str:
+        return self.issue.jira_title
+
     def is_logged(self) -> bool:
         return self.logged is not None
 
@@ -74,48 +157,300 @@ def utc_to_local(utc_dt: datetime) -> datetime:
     return utc_dt.replace(tzinfo=timezone.utc).astimezone(tz=None)
 
 
+class SystemLocalTimezone(tzinfo):
+    """Часовой пояс системы через time.localtime, учитывает переход на летнее время.
+
+    Используется, если часовой пояс не получилось найти в zoneinfo (например, на Windows)
+    """
+
+    # SOURCE: https://docs.python.org/3/library/datetime.html#tzinfo-objects
+    def _get_local(self, dt: datetime) -> time.struct_time:
+        tt = (
+            dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second, dt.weekday(), 0, -1
+        )
+        # Подходят те варианты, у которых флаг летнего времени совпал с указанным
+        stamps: list[float] = []
+        for is_dst in (0, 1):
+            stamp: float = time.mktime(tt[:8] + (is_dst,))
+            if time.localtime(stamp).tm_isdst == is_dst:
+                stamps.append(stamp)
+
+        if not stamps:  # Несуществующее время при переходе на летнее
+            stamps.append(time.mktime(tt))
+
+        # Неоднозначное время при переходе на зимнее: fold=1 - второе (более позднее)
+        return time.localtime(max(stamps) if dt.fold else min(stamps))
+
+    def utcoffset(self, dt: datetime | None) -> timedelta:
+        if dt is None:
+            return timedelta(seconds=-time.timezone)
+        return timedelta(seconds=self._get_local(dt).tm_gmtoff)
+
+    def dst(self, dt: datetime | None) -> timedelta:
+        if dt is None or not self._get_local(dt).tm_isdst:
+            return timedelta(0)
+        return timedelta(seconds=time.timezone - time.altzone)
+
+    def tzname(self, dt: datetime | None) -> str:
+        return time.tzname[dt is not None and self._get_local(dt).tm_isdst > 0]
+
+    def fromutc(self, dt: datetime) -> datetime:
+        ts: int = calendar.timegm(dt.replace(tzinfo=None).timetuple())
+        offset: int = time.localtime(ts).tm_gmtoff
+
+        # Если это же локальное время уже было с прежним смещением, то это второе
+        prev_offset: int = time.localtime(ts - 3 * 3600).tm_gmtoff
+        fold: int = int(
+            prev_offset > offset
+            and time.localtime(ts + offset - prev_offset).tm_gmtoff == prev_offset
+        )
+
+        return (dt + timedelta(seconds=offset)).replace(tzinfo=self, fold=fold)
+
+
+def get_local_timezone_name() -> str | None:
+    if name := os.environ.get("TZ"):
+        return name.removeprefix(":")
+
+    # Linux и macOS: /etc/localtime ссылается на файл из базы часовых поясов
+    path: str = os.path.realpath("/etc/localtime")
+    _, sep, name = path.partition("zoneinfo/")
+    if sep and name:
+        return name
+
+
+def get_local_timezone() -> tzinfo:
+    name: str | None = get_local_timezone_name()
+    if name:
+        try:
+            return zoneinfo.ZoneInfo(name)
+        except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+            pass
+
+    return SystemLocalTimezone()
+
+
+# NOTE: Обновляется при каждом разборе, чтобы не искать часовой пояс на каждую запись
+LOCAL_TIMEZONE: tzinfo = get_local_timezone()
+
+
+def update_local_timezone() -> tzinfo:
+    global LOCAL_TIMEZONE
+
+    LOCAL_TIMEZONE = get_local_timezone()
+    return LOCAL_TIMEZONE
+
+
+def parse_utc_timestamp(text: str) -> int:
+    """Разбор времени вида "2024-12-04T09:38:00.000Z" в секунды от начала эпохи.
+
+    Дробная часть секунд отбрасывается. Для других форматов используется datetime.strptime
+    """
+
+    if len(text) == 24 and text[4] == "-" and text[10] == "T" and text[-1] == "Z":
+        return calendar.timegm(
+            (
+                int(text[0:4]),
+                int(text[5:7]),
+                int(text[8:10]),
+                int(text[11:13]),
+                int(text[14:16]),
+                int(text[17:19]),
+            )
+        )
+
+    dt = datetime.strptime(text, "%Y-%m-%dT%H:%M:%S.%fZ")
+    return calendar.timegm(dt.timetuple())
+
+
 MAX_RESULTS: int = 250
 
 
+def get_archive_endpoint(username: str) -> str:
+    # Адрес RSS пользователя в архиве ответов
+    return f"activity/{username}"
+
+
+def get_rss_filter_params(
+    providers: list[str] = RSS_PROVIDERS,
+    projects: list[str] = RSS_PROJECTS,
+    activities: list[str] = RSS_ACTIVITIES,
+) -> str:
+    """Фильтры на стороне сервера, чтобы в RSS не было лишних записей.
+
+    providers - источники активностей (issues - задачи джиры),
+    projects - ключи проектов,
+    activities - типы активностей джиры (например, issue:update, comment:post)
+    """
+
+    params: str = ""
+    if projects:
+        params += "&streams=key+IS+" + "+".join(map(quote, projects))
+    if providers:
+        params += "&providers=" + "+".join(map(quote, providers))
+    if activities:
+        params += "&issues=activity+IS+" + "+".join(
+            quote(activity, safe="") for activity in activities
+        )
+    return params
+
+
+def get_rss_jira_log_url(username: str, max_results: int = MAX_RESULTS) -> str:
+    return (
+        f"{JIRA_HOST}/activity?maxResults={max_results}"
+        f"&streams=user+IS+{username}{get_rss_filter_params()}"
+        "&os_authType=basic&title=undefined"
+    )
+
+
+def put_to_archive(content: bytes, username: str, url: str, **kwargs) -> None:
+    # Ответ уже получен, поэтому ошибка архива (например, нет места) не должна
+    # прерывать обновление
+    try:
+        ARCHIVE.put(content, endpoint=get_archive_endpoint(username), url=url, **kwargs)
+    except Exception as e:
+        print(f"[#] Не удалось сохранить ответ в архив: {e}")
+
+
 def get_rss_jira_log(username: str | None = USERNAME) -> bytes:
     if not username:
-        username = get_jira_current_username()
+        username = get_username()
 
-    url: str = (
-        f"{JIRA_HOST}/activity?maxResults={MAX_RESULTS}"
-        f"&streams=user+IS+{username}&os_authType=basic&title=undefined"
-    )
+    url: str = get_rss_jira_log_url(username)
     print(url)
 
     rs = session.get(url)
     rs.raise_for_status()
+
+    put_to_archive(rs.content, username, url)
+
     return rs.content
 
 
+def get_newest_entry_key(xml_data: bytes) -> str | None:
+    """Идентификатор и время обновления первой (самой новой) записи RSS.
+
+    Разбор останавливается на первой записи, поэтому для большого RSS это дешево.
+    """
+
+    ns_atom = "{http://www.w3.org/2005/Atom}"
+    for _, el in ET.iterparse(io.BytesIO(xml_data), events=("end",)):
+        if el.tag == f"{ns_atom}entry":
+            return f"{el.findtext(f'{ns_atom}id')} {el.findtext(f'{ns_atom}updated')}"
+
+    return None
+
+
+class FeedChangeProbe:
+    """Проверка изменений RSS перед полным запросом.
+
+    Запрашивается одна запись (maxResults=1) и ее ключ сравнивается с ключом самой
+    новой записи из последнего полного RSS. Если сервер вернул ETag, то он передается
+    в If-None-Match, и при ответе 304 разбора нет совсем.
+
+    ETag запоминается, только если он соответствует последнему полному RSS, иначе
+    после неудачного полного запроса ответ 304 скрывал бы изменения.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._key_by_username: dict[str, str | None] = dict()
+        self._etag_by_username: dict[str, str] = dict()
+
+        # ETag нового ответа и ключ его записи, до успешного полного запроса
+        self._pending_etag_by_username: dict[str, tuple[str | None, str]] = dict()
+
+    def is_changed(self, username: str) -> bool:
+        with self._lock:
+            if username not in self._key_by_username:
+                return True
+
+            last_key: str | None = self._key_by_username[username]
+            etag: str | None = self._etag_by_username.get(username)
+
+        headers: dict[str, str] = dict()
+        if etag:
+            headers["If-None-Match"] = etag
+
+        rs = session.get(get_rss_jira_log_url(username, max_results=1), headers=headers)
+        if rs.status_code == 304:
+            return False
+
+        rs.raise_for_status()
+
+        key: str | None = get_newest_entry_key(rs.content)
+        new_etag: str | None = rs.headers.get("ETag")
+        with self._lock:
+            if key == last_key:
+                if new_etag:
+                    self._etag_by_username[username] = new_etag
+            else:
+                # Сохранится в update, когда полный RSS с этой записью будет получен
+                self._etag_by_username.pop(username, None)
+                if new_etag:
+                    self._pending_etag_by_username[username] = (key, new_etag)
+
+        return key != last_key
+
+    def update(self, username: str, xml_data: bytes) -> None:
+        key: str | None = get_newest_entry_key(xml_data)
+        with self._lock:
+            self._key_by_username[username] = key
+
+            pending: tuple[str | None, str] | None = self._pending_etag_by_username.pop(
+                username, None
+            )
+            if pending and pending[0] == key:
+                self._etag_by_username[username] = pending[1]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._key_by_username.clear()
+            self._etag_by_username.clear()
+            self._pending_etag_by_username.clear()
+
+
+def to_ms(dt: datetime) -> int:
+    return int(dt.timestamp() * 1000)
+
+
 def get_rss_jira_log_v2(dt1, dt2, username: str | None = USERNAME) -> bytes:
     if not username:
-        username = get_jira_current_username()
+        username = get_username()
 
     url: str = (
         f"{JIRA_HOST}/activity?maxResults={MAX_RESULTS}&streams=user+IS+{username}"
         f"&streams=update-date+BETWEEN+{to_ms(dt1)}+{to_ms(dt2)}"
-        "&os_authType=basic&title=undefined"
+        f"{get_rss_filter_params()}&os_authType=basic&title=undefined"
     )
     print(url)
 
     rs = session.get(url)
     rs.raise_for_status()
 
-    from pathlib import Path
-
-    Path(f"{dt1.date().isoformat()}-{dt2.date().isoformat()}.xml").write_bytes(
-        rs.content
-    )
+    # Одинаковые ответы хранятся в архиве один раз
+    put_to_archive(rs.content, username, url, dt_from=dt1, dt_to=dt2)
 
     return rs.content
 
 
-def get_date_by_activities(root) -> dict[date, list[Activity]]:
+# Компактное представление активности из простых типов, чтобы передавать между процессами:
+# (id, entry_ts, action, action_text, jira_id, jira_title,
+#  logged_human_time, logged_seconds, logged_description, link_to_comment)
+ActivityRecord = tuple[
+    str, int, int, str, str, str, str | None, int | None, str | None, str | None
+]
+
+
+def iter_activity_records(
+    root,
+    with_descriptions: bool = RSS_WITH_DESCRIPTIONS,
+) -> Iterator[ActivityRecord]:
+    """Разбор записей RSS.
+
+    Если with_descriptions=False, то описания залогированного из <content> не разбираются.
+    """
+
     ns = {
         "": "http://www.w3.org/2005/Atom",
         "activity": "http://activitystrea.ms/spec/1.0/",
@@ -135,8 +470,6 @@ def get_date_by_activities(root) -> dict[date, list[Activity]]:
 
         return ActivityActionEnum.UNKNOWN
 
-    result: dict[date, list[Activity]] = defaultdict(list)
-
     pattern_logged = re.compile("logged '(.+?)'", flags=re.IGNORECASE)
 
     for entry in root.findall("./entry", namespaces=ns):
@@ -149,8 +482,10 @@ def get_date_by_activities(root) -> dict[date, list[Activity]]:
 
         action: ActivityActionEnum = _get_activity_action(title)
 
-        # Ищем в <entry> строку с логированием
+        # Ищем в <entry> строку с логированием, сначала в title, чтобы не склеивать весь текст
         if m := pattern_logged.search(
+            entry.find("./title", namespaces=ns).text
+        ) or pattern_logged.search(
             # Не всегда у title есть строка с логами
             # Если несколько полей менялось, то инфа по залогированному будет в другом теге
             "".join(entry.itertext())
@@ -161,20 +496,11 @@ def get_date_by_activities(root) -> dict[date, list[Activity]]:
             logged_human_time = logged_seconds = None
 
         logged_description = None
-        if action == ActivityActionEnum.LOGGED:
+        if with_descriptions and action == ActivityActionEnum.LOGGED:
             content_el = entry.find("./content", namespaces=ns)
             if content_el is not None:
                 logged_description = get_clean_html(content_el.text)
 
-        if logged_seconds:
-            logged = Logged(
-                human_time=logged_human_time,
-                seconds=logged_seconds,
-                description=logged_description,
-            )
-        else:
-            logged = None
-
         try:
             jira_id = _get_text(entry, "./activity:object/title")
             jira_title = _get_text(entry, "./activity:object/summary")
@@ -189,40 +515,109 @@ def get_date_by_activities(root) -> dict[date, list[Activity]]:
                 link_to_comment = href
                 break
 
-        # Переменная entry_dt имеет время в UTC, и желательно его привести в локальное время
-        entry_dt = datetime.strptime(
-            _get_text(entry, "./published"),
-            "%Y-%m-%dT%H:%M:%S.%fZ",
+        yield (
+            id,
+            parse_utc_timestamp(_get_text(entry, "./published")),
+            action.value,
+            title,
+            jira_id,
+            jira_title,
+            logged_human_time,
+            logged_seconds,
+            logged_description,
+            link_to_comment,
         )
-        entry_dt = utc_to_local(entry_dt)
-        entry_date = entry_dt.date()
-
-        result[entry_date].append(
-            Activity(
-                id=id,
-                entry_dt=entry_dt,
-                action=action,
-                action_text=title,
-                jira_id=jira_id,
-                jira_title=jira_title,
-                logged=logged,
-                link_to_comment=link_to_comment,
-            )
+
+
+def get_activity(record: ActivityRecord, issue_table: IssueTable) -> Activity:
+    (
+        id,
+        entry_ts,
+        action,
+        action_text,
+        jira_id,
+        jira_title,
+        logged_human_time,
+        logged_seconds,
+        logged_description,
+        link_to_comment,
+    ) = record
+
+    if logged_seconds:
+        logged = Logged(
+            human_time=logged_human_time,
+            seconds=logged_seconds,
+            description=logged_description,
         )
-        # print(result[entry_date][-1])
+    else:
+        logged = None
+
+    return Activity(
+        id=id,
+        entry_ts=entry_ts,
+        action=ActivityActionEnum(action),
+        action_text=action_text,
+        issue=get_issue(jira_id, jira_title, issue_table),
+        logged=logged,
+        link_to_comment=link_to_comment,
+    )
+
+
+def get_date_by_records(records: Iterable[ActivityRecord]) -> dict[date, list[Activity]]:
+    result: dict[date, list[Activity]] = defaultdict(list)
+
+    # Часовой пояс определяется один раз на разбор
+    local_timezone: tzinfo = update_local_timezone()
+
+    issue_table: IssueTable = dict()
+    for record in records:
+        activity: Activity = get_activity(record, issue_table)
+
+        # Время в UTC, для группировки по дням оно приводится в локальное время
+        entry_date: date = datetime.fromtimestamp(
+            activity.entry_ts, tz=local_timezone
+        ).date()
+        result[entry_date].append(activity)
 
     return result
 
 
-def parse_date_by_activities(xml_data: bytes) -> dict[date, list[Activity]]:
+def get_date_by_activities(
+    root,
+    with_descriptions: bool = RSS_WITH_DESCRIPTIONS,
+) -> dict[date, list[Activity]]:
+    return get_date_by_records(iter_activity_records(root, with_descriptions))
+
+
+@traced()
+@PARSE_DURATION.timed(parser="jira_rss")
+def parse_date_by_activities(
+    xml_data: bytes,
+    with_descriptions: bool = RSS_WITH_DESCRIPTIONS,
+) -> dict[date, list[Activity]]:
     root = ET.fromstring(xml_data)
-    return get_date_by_activities(root)
+    return get_date_by_activities(root, with_descriptions)
 
 
 def get_logged_total_seconds(activities: list[Activity]) -> int:
     return sum(obj.logged.seconds for obj in activities if obj.logged)
 
 
+def get_last_logged_activity(
+    date_by_activities: dict[date, list[Activity]],
+) -> Activity | None:
+    return max(
+        (
+            obj
+            for activities in date_by_activities.values()
+            for obj in activities
+            if obj.logged
+        ),
+        key=lambda obj: obj.entry_ts,
+        default=None,
+    )
+
+
 if __name__ == "__main__":
     # t = datetime.now()
     # print(t)
@@ -295,9 +690,6 @@ if __name__ == "__main__":
 
         return items
 
-    def to_ms(dt: datetime) -> int:
-        return int(dt.timestamp() * 1000)
-
     # dt = get_zero_time(datetime.utcnow())
     # print(dt)
     dt = get_zero_time(datetime.now())
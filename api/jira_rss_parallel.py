@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "ipetrash"
+
+
+import os
+import re
+import xml.etree.ElementTree as ET
+
+from datetime import datetime, date
+from multiprocessing.pool import Pool
+
+from api.archive import ARCHIVE, RawArchive
+from api.jira_rss import (
+    Activity,
+    ActivityRecord,
+    get_date_by_records,
+    get_archive_endpoint,
+    iter_activity_records,
+)
+from api.metrics import PARSE_DURATION
+from api.tracing import traced
+from config import USERNAME, RSS_WITH_DESCRIPTIONS
+
+
+# RSS меньше этого размера разбирается в текущем процессе: передача между процессами дороже
+PARALLEL_MIN_BYTES: int = 2 * 1024 * 1024
+
+# Пул процессов для разбора (см. create_parse_pool). Отдельно от api.POOL, чтобы разбор
+# не ждал в очереди за запросами, которые выполняются в его процессах
+PARSE_POOL: Pool | None = None
+PARSE_MAX_PROCESSES: int = 4
+
+PATTERN_ENTRY_START: re.Pattern = re.compile(rb"<entry[\s>]")
+ENTRY_END: bytes = b"</entry>"
+FEED_END: bytes = b"</feed>"
+
+
+def split_feed(xml_data: bytes, parts: int) -> list[bytes]:
+    """Разделение RSS на parts документов с примерно равным количеством байт.
+
+    Каждый документ - это начало исходного (с пространствами имен) и часть записей.
+    """
+
+    m = PATTERN_ENTRY_START.search(xml_data)
+    end: int = xml_data.rfind(ENTRY_END)
+    if parts < 2 or not m or end == -1:
+        return [xml_data]
+
+    header: bytes = xml_data[: m.start()]
+    end += len(ENTRY_END)
+
+    items: list[bytes] = []
+    start: int = m.start()
+    chunk_size: int = (end - start) // parts + 1
+    while start < end:
+        # Граница части сдвигается на конец ближайшей записи
+        chunk_end: int = xml_data.find(ENTRY_END, min(start + chunk_size, end - 1))
+        chunk_end = end if chunk_end == -1 else chunk_end + len(ENTRY_END)
+
+        items.append(header + xml_data[start:chunk_end] + FEED_END)
+        start = chunk_end
+
+    return items
+
+
+def parse_records(
+    xml_data: bytes,
+    with_descriptions: bool = RSS_WITH_DESCRIPTIONS,
+) -> list[ActivityRecord]:
+    # NOTE: Выполняется в процессах пула, поэтому возвращаются кортежи из простых типов
+    root = ET.fromstring(xml_data)
+    return list(iter_activity_records(root, with_descriptions))
+
+
+def create_parse_pool(processes: int | None = None) -> Pool:
+    """Пул процессов для разбора (PARSE_POOL), по количеству ядер, но не больше PARSE_MAX_PROCESSES"""
+    return Pool(processes=processes or min(os.cpu_count() or 1, PARSE_MAX_PROCESSES))
+
+
+def _parse_records(args: tuple[bytes, bool]) -> list[ActivityRecord]:
+    return parse_records(*args)
+
+
+@traced()
+@PARSE_DURATION.timed(parser="jira_rss_parallel")
+def parse_date_by_activities_parallel(
+    items: list[bytes],
+    with_descriptions: bool = RSS_WITH_DESCRIPTIONS,
+    pool: Pool | None = None,
+    processes: int | None = None,
+    min_bytes: int = PARALLEL_MIN_BYTES,
+) -> dict[date, list[Activity]]:
+    """Разбор нескольких RSS (например, окон по датам) в пуле процессов.
+
+    Большие RSS делятся на части по записям, чтобы загрузить все процессы.
+    Процессы возвращают компактные записи, которые собираются в активности по датам
+    в текущем процессе. По-умолчанию, используется пул PARSE_POOL, а если его нет,
+    то создается временный пул на processes процессов (по количеству ядер).
+    Если данных мало, то разбор выполняется без пула.
+    """
+
+    total_bytes: int = sum(map(len, items))
+    if total_bytes < min_bytes:
+        return get_date_by_records(
+            record
+            for xml_data in items
+            for record in parse_records(xml_data, with_descriptions)
+        )
+
+    if pool is None:
+        pool = PARSE_POOL
+
+    number: int = processes or os.cpu_count() or 1
+
+    # Части примерно одного размера: большие RSS делятся, маленькие остаются целыми
+    part_size: int = max(1, total_bytes // number)
+    tasks: list[tuple[bytes, bool]] = [
+        (part, with_descriptions)
+        for xml_data in items
+        for part in split_feed(xml_data, round(len(xml_data) / part_size))
+    ]
+
+    if pool:
+        chunks = pool.map(_parse_records, tasks)
+    else:
+        with Pool(processes=number) as tmp_pool:
+            chunks = tmp_pool.map(_parse_records, tasks)
+
+    return get_date_by_records(record for chunk in chunks for record in chunk)
+
+
+def replay_date_by_activities(
+    username: str | None = USERNAME,
+    dt_from: datetime | date | None = None,
+    dt_to: datetime | date | None = None,
+    with_descriptions: bool = RSS_WITH_DESCRIPTIONS,
+    archive: RawArchive = ARCHIVE,
+) -> dict[date, list[Activity]]:
+    """Разбор RSS из архива ответов, без запросов.
+
+    Берутся последние ответы пользователя по каждому диапазону дат, которые пересекаются
+    с [dt_from, dt_to]. Активности, которые есть в нескольких ответах, не повторяются.
+    """
+
+    if not username:
+        raise ValueError("Для разбора из архива нужно имя пользователя")
+
+    items: list[bytes] = [
+        archive.get(response.hash)
+        for response in archive.find(get_archive_endpoint(username), dt_from, dt_to)
+    ]
+    date_by_activities = parse_date_by_activities_parallel(items, with_descriptions)
+
+    ids: set[str] = set()
+    result: dict[date, list[Activity]] = dict()
+    for entry_date, activities in sorted(date_by_activities.items(), reverse=True):
+        unique: list[Activity] = []
+        for activity in sorted(activities, key=lambda obj: obj.entry_ts, reverse=True):
+            if activity.id not in ids:
+                ids.add(activity.id)
+                unique.append(activity)
+
+        result[entry_date] = unique
+
+    return result
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from pathlib import Path
+
+    from api.jira_rss import parse_date_by_activities
+
+    paths: list[Path] = [Path(arg) for arg in sys.argv[1:]]
+    if not paths:
+        print(f"Использование: {sys.argv[0]} <путь к XML с RSS> [<путь к XML с RSS> ...]")
+        sys.exit(1)
+
+    items: list[bytes] = [path.read_bytes() for path in paths]
+
+    t = time.perf_counter()
+    for xml_data in items:
+        parse_date_by_activities(xml_data)
+    print(f"Serial: {time.perf_counter() - t:.3f} secs")
+
+    t = time.perf_counter()
+    parse_date_by_activities_parallel(items, min_bytes=0)
+    print(f"Parallel: {time.perf_counter() - t:.3f} secs")
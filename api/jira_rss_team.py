@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "ipetrash"
+
+
+import threading
+import time
+
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from datetime import date
+from multiprocessing.pool import Pool
+from typing import Callable
+from urllib.parse import urlparse
+
+from config import JIRA_HOST, TEAM_MAX_WORKERS, TEAM_REQUESTS_PER_SECOND
+from api import cancellation, jira_rss_parallel
+from api.aggregation import get_logged_by_day
+from api.jira_rss import Activity, get_date_by_records, get_rss_jira_log
+from api.tracing import span
+
+
+class RateLimiter:
+    """Ограничение частоты запросов к одному хосту: не чаще requests_per_second в секунду"""
+
+    def __init__(self, requests_per_second: float) -> None:
+        self.interval: float = 1 / requests_per_second if requests_per_second > 0 else 0
+        self._lock = threading.Lock()
+        self._next_by_host: dict[str, float] = defaultdict(float)
+
+    def wait(self, host: str) -> None:
+        if not self.interval:
+            return
+
+        # Время запроса резервируется под блокировкой, а ожидание - без нее
+        with self._lock:
+            now: float = time.monotonic()
+            started: float = max(now, self._next_by_host[host])
+            self._next_by_host[host] = started + self.interval
+
+        if started > now:
+            time.sleep(started - now)
+
+
+RATE_LIMITER = RateLimiter(TEAM_REQUESTS_PER_SECOND)
+
+
+@dataclass
+class UserLogged:
+    username: str
+    date_by_seconds: dict[date, int] = field(default_factory=dict)
+    error: Exception | None = None
+
+    @property
+    def total_seconds(self) -> int:
+        return sum(self.date_by_seconds.values())
+
+
+def get_date_by_seconds(
+    date_by_activities: dict[date, list[Activity]],
+) -> dict[date, int]:
+    return {
+        obj.date: obj.logged_seconds
+        for obj in get_logged_by_day(date_by_activities)
+        if obj.logged_seconds
+    }
+
+
+def get_user_logged(
+    username: str,
+    pool: Pool,
+    rate_limiter: RateLimiter = RATE_LIMITER,
+) -> UserLogged:
+    with span("get_user_logged", cat="team", username=username):
+        try:
+            # Задачи отмененного обновления, которые еще в очереди, не ждут ограничителя
+            cancellation.check()
+            rate_limiter.wait(urlparse(JIRA_HOST).netloc)
+            cancellation.check()
+
+            xml_data: bytes = get_rss_jira_log(username)
+            cancellation.check()
+
+            # NOTE: Разбор в процессе пула, чтобы из-за GIL он не выполнялся по очереди
+            #       с разбором других пользователей и не задерживал обработку ответов
+            records = pool.apply(jira_rss_parallel.parse_records, (xml_data, False))
+            date_by_activities = get_date_by_records(records)
+            return UserLogged(
+                username=username,
+                date_by_seconds=get_date_by_seconds(date_by_activities),
+            )
+        except cancellation.Cancelled:
+            raise
+        except Exception as e:
+            return UserLogged(username=username, error=e)
+
+
+def get_team_logged(
+    usernames: list[str],
+    on_result: Callable[[UserLogged], None] | None = None,
+    max_workers: int = TEAM_MAX_WORKERS,
+    rate_limiter: RateLimiter = RATE_LIMITER,
+) -> list[UserLogged]:
+    """Получение залогированного времени пользователей параллельно.
+
+    Запросы выполняются в потоках, а RSS разбираются в пуле процессов
+    jira_rss_parallel.PARSE_POOL (если его нет, то на время вызова создается временный).
+    on_result вызывается из рабочих потоков по мере получения результатов.
+    Ошибка одного пользователя не прерывает остальные, она будет в UserLogged.error.
+    Результат в порядке usernames.
+    """
+
+    # Без повторов, но с сохранением порядка
+    usernames = list(dict.fromkeys(usernames))
+    if not usernames:
+        return []
+
+    username_by_result: dict[str, UserLogged] = dict()
+    with (
+        (
+            nullcontext(jira_rss_parallel.PARSE_POOL)
+            if jira_rss_parallel.PARSE_POOL
+            else jira_rss_parallel.create_parse_pool()
+        ) as pool,
+        ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(usernames))),
+            thread_name_prefix="TeamLogged",
+        ) as executor,
+    ):
+        futures = [
+            executor.submit(
+                cancellation.bind(get_user_logged), username, pool, rate_limiter
+            )
+            for username in usernames
+        ]
+        for future in as_completed(futures):
+            try:
+                result: UserLogged = future.result()
+            except cancellation.Cancelled:
+                # Задачи, которые еще не начали выполняться, не нужны
+                for f in futures:
+                    f.cancel()
+                raise
+
+            username_by_result[result.username] = result
+
+            if on_result:
+                on_result(result)
+
+    return [username_by_result[username] for username in usernames]
+
+
+def get_team_matrix(
+    items: list[UserLogged],
+) -> tuple[list[date], dict[str, list[int]]]:
+    """Матрица пользователь × дата: список дат (по убыванию) и секунды по датам у каждого"""
+
+    dates: list[date] = sorted(
+        {d for obj in items for d in obj.date_by_seconds},
+        reverse=True,
+    )
+    matrix: dict[str, list[int]] = {
+        obj.username: [obj.date_by_seconds.get(d, 0) for d in dates]
+        for obj in items
+    }
+    return dates, matrix
+
+
+if __name__ == "__main__":
+    import sys
+
+    from third_party.seconds_to_str import seconds_to_str
+
+    usernames: list[str] = sys.argv[1:]
+    if not usernames:
+        print(f"Использование: {sys.argv[0]} <username> [<username> ...]")
+        sys.exit(1)
+
+    t = time.perf_counter()
+    items: list[UserLogged] = get_team_logged(
+        usernames,
+        on_result=lambda obj: print(f"{obj.username}: {obj.error or 'OK'}"),
+    )
+    print(f"Elapsed: {time.perf_counter() - t:.3f} secs\n")
+
+    dates, matrix = get_team_matrix(items)
+    for username, values in matrix.items():
+        print(username, [seconds_to_str(value) for value in values[:7]])
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "ipetrash"
+
+
+import threading
+
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, date, timedelta
+from typing import Any
+
+from api import cancellation, session
+from api.jira import get_username
+from api.jira_duration import seconds_to_logged_human_time
+from api.jira_rss import (
+    Activity,
+    ActivityActionEnum,
+    IssueTable,
+    Logged,
+    get_clean_html,
+    get_issue,
+    update_local_timezone,
+)
+from api.metrics import PARSE_DURATION
+from api.tracing import span, traced
+from config import JIRA_HOST, WORKLOG_DAYS, WORKLOG_MAX_WORKERS
+
+
+URL_SEARCH = f"{JIRA_HOST}/rest/api/latest/search"
+URL_WORKLOG = f"{JIRA_HOST}/rest/api/latest/issue/{{key}}/worklog"
+
+# Максимальное количество задач на странице поиска
+SEARCH_PAGE_SIZE: int = 100
+
+
+@dataclass(frozen=True, slots=True)
+class WorklogIssue:
+    key: str
+    summary: str
+    updated: str
+
+
+def get_jql(date_from: date, username: str | None = None) -> str:
+    author: str = f'"{username}"' if username else "currentUser()"
+    return (
+        f'worklogAuthor = {author} AND worklogDate >= "{date_from:%Y-%m-%d}"'
+        " ORDER BY updated DESC"
+    )
+
+
+def search_worklog_issues(jql: str) -> list[WorklogIssue]:
+    """Поиск задач по JQL, все страницы"""
+
+    items: list[WorklogIssue] = []
+
+    start_at: int = 0
+    while True:
+        query = {
+            "jql": jql,
+            "fields": "summary,updated",
+            "startAt": start_at,
+            "maxResults": SEARCH_PAGE_SIZE,
+        }
+        rs = session.get(URL_SEARCH, params=query)
+        rs.raise_for_status()
+
+        data: dict[str, Any] = rs.json()
+        issues: list[dict[str, Any]] = data["issues"]
+        for issue in issues:
+            items.append(
+                WorklogIssue(
+                    key=issue["key"],
+                    summary=issue["fields"]["summary"],
+                    updated=issue["fields"]["updated"],
+                )
+            )
+
+        start_at += len(issues)
+        if not issues or start_at >= data["total"]:
+            break
+
+    return items
+
+
+def get_worklogs(key: str) -> list[dict[str, Any]]:
+    """Ворклоги задачи, все страницы"""
+
+    url: str = URL_WORKLOG.format(key=key)
+
+    items: list[dict[str, Any]] = []
+    while True:
+        rs = session.get(url, params={"startAt": len(items)})
+        rs.raise_for_status()
+
+        data: dict[str, Any] = rs.json()
+        worklogs: list[dict[str, Any]] = data["worklogs"]
+        items += worklogs
+
+        if not worklogs or len(items) >= data.get("total", len(items)):
+            break
+
+    return items
+
+
+class WorklogCache:
+    """Ворклоги задач. Запрос повторяется, только если у задачи изменилось поле updated"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._by_key: dict[str, tuple[str, list[dict[str, Any]]]] = dict()
+
+    def get(self, issue: WorklogIssue) -> list[dict[str, Any]]:
+        with self._lock:
+            cached = self._by_key.get(issue.key)
+
+        if cached and cached[0] == issue.updated:
+            return cached[1]
+
+        with span("get_worklogs", cat="worklog", key=issue.key):
+            worklogs = get_worklogs(issue.key)
+
+        with self._lock:
+            self._by_key[issue.key] = issue.updated, worklogs
+        return worklogs
+
+    def clear(self) -> None:
+        with self._lock:
+            self._by_key.clear()
+
+
+WORKLOG_CACHE = WorklogCache()
+
+
+def parse_started(text: str) -> int:
+    # Пример: 2026-10-19T10:00:00.000+0300
+    return int(datetime.strptime(text, "%Y-%m-%dT%H:%M:%S.%f%z").timestamp())
+
+
+def is_worklog_author(worklog: dict[str, Any], username: str) -> bool:
+    author: dict[str, Any] = worklog.get("author") or dict()
+    return username in (author.get("name"), author.get("key"))
+
+
+@traced()
+@PARSE_DURATION.timed(parser="jira_worklog")
+def get_date_by_activities_from_worklogs(
+    issue_by_worklogs: list[tuple[WorklogIssue, list[dict[str, Any]]]],
+    username: str,
+    date_from: date,
+) -> dict[date, list[Activity]]:
+    local_timezone = update_local_timezone()
+
+    issue_table: IssueTable = dict()
+    items: list[Activity] = []
+    for issue, worklogs in issue_by_worklogs:
+        for worklog in worklogs:
+            if not is_worklog_author(worklog, username):
+                continue
+
+            entry_ts: int = parse_started(worklog["started"])
+            entry_date: date = datetime.fromtimestamp(entry_ts, tz=local_timezone).date()
+            if entry_date < date_from:
+                continue
+
+            seconds: int = worklog["timeSpentSeconds"]
+            human_time: str = seconds_to_logged_human_time(seconds)
+            comment: str | None = worklog.get("comment")
+
+            author: str = worklog["author"].get("displayName") or username
+            items.append(
+                Activity(
+                    id=f"worklog:{worklog['id']}",
+                    entry_ts=entry_ts,
+                    action=ActivityActionEnum.LOGGED,
+                    action_text=f"{author} logged '{human_time}' on {issue.key}",
+                    issue=get_issue(issue.key, issue.summary, issue_table),
+                    logged=Logged(
+                        human_time=human_time,
+                        seconds=seconds,
+                        description=get_clean_html(comment) if comment else None,
+                    ),
+                )
+            )
+
+    # Как в RSS: сначала новые
+    result: dict[date, list[Activity]] = defaultdict(list)
+    for activity in sorted(items, key=lambda obj: obj.entry_ts, reverse=True):
+        result[
+            datetime.fromtimestamp(activity.entry_ts, tz=local_timezone).date()
+        ].append(activity)
+
+    return result
+
+
+def get_worklog_activities(
+    username: str | None = None,
+    days: int = WORKLOG_DAYS,
+    max_workers: int = WORKLOG_MAX_WORKERS,
+    cache: WorklogCache = WORKLOG_CACHE,
+) -> dict[date, list[Activity]]:
+    """Залогированное время пользователя за последние days дней из ворклогов задач.
+
+    Задачи ищутся через JQL по worklogAuthor и worklogDate, ворклоги задач запрашиваются
+    параллельно. Результат в той же модели, что и разбор RSS.
+    Если username не задан, то ищутся ворклоги текущего пользователя.
+    """
+
+    date_from: date = date.today() - timedelta(days=days)
+
+    with span("search_worklog_issues", cat="worklog", username=username):
+        issues: list[WorklogIssue] = search_worklog_issues(
+            get_jql(date_from, username)
+        )
+
+    # В ворклогах задачи есть и чужие, поэтому они фильтруются по автору
+    if not username:
+        username = get_username()
+
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(issues) or 1)),
+        thread_name_prefix="Worklog",
+    ) as executor:
+        issue_by_worklogs = list(zip(issues, executor.map(cancellation.bind(cache.get), issues)))
+
+    return get_date_by_activities_from_worklogs(issue_by_worklogs, username, date_from)
+
+
+if __name__ == "__main__":
+    import time
+
+    from api.aggregation import get_logged_by_day
+    from third_party.seconds_to_str import seconds_to_str
+
+    # Второй раз ворклоги берутся из кэша
+    for _ in range(2):
+        t = time.perf_counter()
+        date_by_activities = get_worklog_activities()
+        print(f"Elapsed: {time.perf_counter() - t:.3f} secs")
+
+    for obj in get_logged_by_day(date_by_activities):
+        print(obj.date, seconds_to_str(obj.logged_seconds), obj.activities)
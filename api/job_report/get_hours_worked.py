@@ -9,6 +9,7 @@ import re
 from bs4 import BeautifulSoup
 from bs4.element import Tag
 
+from api.metrics import PARSE_DURATION
 from api.job_report.utils import (
     NotFoundReport,
     ReportTypeEnum,
@@ -43,6 +44,7 @@ def get_tr_for_current_user(html: str) -> Tag:
     return th_el.parent
 
 
+@PARSE_DURATION.timed(parser="get_hours_worked")
 def parse_current_user_deviation_hours(html: str) -> tuple[str, str]:
     current_user_tr: Tag = get_tr_for_current_user(html)
 
@@ -10,6 +10,7 @@ from dataclasses import dataclass
 from bs4 import BeautifulSoup
 
 from api.job_report.utils import session, HOST, NotFoundReport
+from api.metrics import PARSE_DURATION
 
 
 URL = f"{HOST}/pa-reports-new/report/"
@@ -25,7 +26,12 @@ def get_time_spent_in_office() -> TimeSpent:
     rs = session.get(URL)
     rs.raise_for_status()
 
-    soup = BeautifulSoup(rs.content, "html.parser")
+    return parse_time_spent_in_office(rs.content)
+
+
+@PARSE_DURATION.timed(parser="get_time_spent_in_office")
+def parse_time_spent_in_office(html: bytes | str) -> TimeSpent:
+    soup = BeautifulSoup(html, "html.parser")
     text = soup.get_text(strip=True)
 
     def _find(pattern: str, about: str) -> str:
@@ -6,6 +6,7 @@ __author__ = "ipetrash"
 
 from dataclasses import dataclass
 from bs4 import BeautifulSoup
+from api.metrics import PARSE_DURATION
 from api.job_report.utils import (
     get_report,
     ReportTypeEnum,
@@ -39,7 +40,11 @@ def get_worklog() -> Worklog:
         report_type=ReportTypeEnum.WORKLOG,
         period_type=PeriodTypeEnum.MONTH,
     )
+    return parse_worklog(report)
 
+
+@PARSE_DURATION.timed(parser="get_worklog")
+def parse_worklog(report: str) -> Worklog:
     soup = BeautifulSoup(report, "html.parser")
     current_user_tr = soup.select_one("table > tbody > tr.current")
     if not current_user_tr:
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "ipetrash"
+
+
+import bisect
+import functools
+import re
+import threading
+import time
+
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Iterator
+from urllib.parse import urlparse
+
+
+# NOTE: Модуль не должен импортировать api, т.к. используется в api/__init__.py
+
+
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+LabelValues = tuple[str, ...]
+
+
+class Metric:
+    type_name: str = ""
+
+    def __init__(self, name: str, help: str, label_names: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self._lock = threading.Lock()
+
+    def _get_label_values(self, labels: dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def _format_labels(self, values: LabelValues, **extra: str) -> str:
+        pairs: list[tuple[str, str]] = list(zip(self.label_names, values))
+        pairs += list(extra.items())
+        if not pairs:
+            return ""
+
+        def _escape(value: str) -> str:
+            return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+        return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+    def get_lines(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+
+
+class Counter(Metric):
+    type_name: str = "counter"
+
+    def __init__(self, name: str, help: str, label_names: tuple[str, ...] = ()) -> None:
+        super().__init__(name, help, label_names)
+        self._values: dict[LabelValues, float] = dict()
+
+    def inc(self, value: float = 1, **labels: str) -> None:
+        key: LabelValues = self._get_label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def get_total(self) -> float:
+        with self._lock:
+            return sum(self._values.values())
+
+    def get_lines(self) -> list[str]:
+        lines: list[str] = super().get_lines()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{self._format_labels(key)} {value}")
+        return lines
+
+
+class Histogram(Metric):
+    type_name: str = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, label_names)
+        self.buckets = buckets
+
+        # Для каждого набора меток: [количество по бакетам..., +Inf], сумма, последнее значение
+        self._counts: dict[LabelValues, list[int]] = dict()
+        self._sums: dict[LabelValues, float] = dict()
+        self._lasts: dict[LabelValues, float] = dict()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key: LabelValues = self._get_label_values(labels)
+        idx: int = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts: list[int] | None = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+            counts[idx] += 1
+
+            self._sums[key] = self._sums.get(key, 0.0) + value
+            self._lasts[key] = value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        started: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def timed(self, **labels: str) -> Callable:
+        def decorator(func: Callable) -> Callable:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.time(**labels):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def get_count(self) -> int:
+        with self._lock:
+            return sum(sum(counts) for counts in self._counts.values())
+
+    def get_sum(self) -> float:
+        with self._lock:
+            return sum(self._sums.values())
+
+    def get_lasts(self) -> dict[LabelValues, float]:
+        with self._lock:
+            return dict(self._lasts)
+
+    def get_lines(self) -> list[str]:
+        lines: list[str] = super().get_lines()
+        with self._lock:
+            for key, counts in sorted(self._counts.items()):
+                cumulative: int = 0
+                for bucket, count in zip(self.buckets, counts):
+                    cumulative += count
+                    labels: str = self._format_labels(key, le=str(bucket))
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+
+                cumulative += counts[-1]
+                labels: str = self._format_labels(key, le="+Inf")
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                lines.append(f"{self.name}_sum{self._format_labels(key)} {self._sums[key]}")
+                lines.append(f"{self.name}_count{self._format_labels(key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = dict()
+
+    def _register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Метрика {metric.name!r} уже зарегистрирована")
+
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, label_names: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help, label_names))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help, label_names, buckets))
+
+    def to_prometheus(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines += metric.get_lines()
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total",
+    "Количество HTTP-запросов",
+    ("endpoint", "method", "status"),
+)
+HTTP_ERRORS = REGISTRY.counter(
+    "http_request_errors_total",
+    "Количество HTTP-запросов, завершившихся исключением",
+    ("endpoint", "method"),
+)
+HTTP_CANCELLED = REGISTRY.counter(
+    "http_requests_cancelled_total",
+    "Количество HTTP-запросов, прерванных отменой операции",
+    ("endpoint", "method"),
+)
+HTTP_RESPONSE_BYTES = REGISTRY.counter(
+    "http_response_bytes_total",
+    "Количество полученных байт в ответах",
+    ("endpoint",),
+)
+HTTP_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "Время выполнения HTTP-запросов",
+    ("endpoint",),
+)
+PARSE_DURATION = REGISTRY.histogram(
+    "parse_duration_seconds",
+    "Время разбора ответов",
+    ("parser",),
+)
+RENDER_DURATION = REGISTRY.histogram(
+    "render_duration_seconds",
+    "Время заполнения виджетов",
+    ("widget",),
+)
+REFRESH_DURATION = REGISTRY.histogram(
+    "refresh_duration_seconds",
+    "Время обновления",
+    ("status",),
+)
+TLS_HANDSHAKES = REGISTRY.counter(
+    "tls_handshakes_total",
+    "Количество рукопожатий TLS (resumed - с возобновлением сессии)",
+    ("host", "resumed"),
+)
+TLS_HANDSHAKE_DURATION = REGISTRY.histogram(
+    "tls_handshake_duration_seconds",
+    "Время рукопожатий TLS",
+    ("resumed",),
+)
+
+
+PATTERN_ENDPOINT_ID: re.Pattern = re.compile(r"/(?:[A-Z][A-Z0-9_]*-\d+|\d+)(?=/|$)")
+
+
+def get_endpoint(url: str) -> str:
+    # NOTE: Идентификаторы задач и числа заменяются, чтобы не плодить метки
+    path: str = urlparse(url).path or "/"
+    return PATTERN_ENDPOINT_ID.sub("/{id}", path)
+
+
+def get_summary() -> dict[str, str]:
+    requests_number: float = HTTP_REQUESTS.get_total()
+    errors_number: float = HTTP_ERRORS.get_total()
+    duration_count: int = HTTP_DURATION.get_count()
+    avg_duration: float = (
+        HTTP_DURATION.get_sum() / duration_count if duration_count else 0.0
+    )
+
+    summary: dict[str, str] = {
+        "Запросов": f"{requests_number:.0f}",
+        "Ошибок": f"{errors_number:.0f}",
+        "Среднее время запроса": f"{avg_duration * 1000:.0f} мс",
+        "Получено байт": f"{HTTP_RESPONSE_BYTES.get_total():.0f}",
+    }
+
+    handshakes_count: int = TLS_HANDSHAKE_DURATION.get_count()
+    if handshakes_count:
+        summary["Рукопожатий TLS"] = f"{TLS_HANDSHAKES.get_total():.0f}"
+        summary["Среднее время рукопожатия"] = (
+            f"{TLS_HANDSHAKE_DURATION.get_sum() / handshakes_count * 1000:.0f} мс"
+        )
+
+    for histogram, title in [
+        (PARSE_DURATION, "Разбор"),
+        (RENDER_DURATION, "Отрисовка"),
+    ]:
+        for key, value in sorted(histogram.get_lasts().items()):
+            summary[f"{title} ({', '.join(key)})"] = f"{value * 1000:.0f} мс"
+
+    return summary
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.rstrip("/") not in ("", "/metrics"):
+            self.send_error(404)
+            return
+
+        data: bytes = REGISTRY.to_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def start_http_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+
+    thread = threading.Thread(
+        target=server.serve_forever,
+        name="MetricsHttpServer",
+        daemon=True,
+    )
+    thread.start()
+
+    return server
+
+
+if __name__ == "__main__":
+    HTTP_REQUESTS.inc(
+        endpoint=get_endpoint("https://jira/rest/api/2/issue/FOO-123/worklog"),
+        method="GET",
+        status="200",
+    )
+    HTTP_DURATION.observe(0.3, endpoint="/activity")
+    with PARSE_DURATION.time(parser="jira_rss"):
+        time.sleep(0.01)
+
+    print(REGISTRY.to_prometheus())
+    print(get_summary())
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "ipetrash"
+
+
+import os
+import shutil
+import subprocess
+import sys
+
+from datetime import datetime, date, time, timedelta
+
+from config import (
+    POLLING_MIN_INTERVAL_MINUTES,
+    POLLING_MAX_INTERVAL_MINUTES,
+    POLLING_OFF_HOURS_INTERVAL_MINUTES,
+    POLLING_WORKING_HOURS,
+    POLLING_WORKING_DAYS,
+    POLLING_IDLE_MINUTES,
+    POLLING_DAILY_BUDGET,
+)
+
+
+def get_idle_seconds() -> float | None:
+    """Сколько секунд не было ввода с клавиатуры и мыши. None, если узнать не получилось"""
+
+    try:
+        if sys.platform == "win32":
+            import ctypes
+
+            class LASTINPUTINFO(ctypes.Structure):
+                _fields_ = [
+                    ("cbSize", ctypes.c_uint),
+                    ("dwTime", ctypes.c_uint),
+                ]
+
+            info = LASTINPUTINFO()
+            info.cbSize = ctypes.sizeof(info)
+            if not ctypes.windll.user32.GetLastInputInfo(ctypes.byref(info)):
+                return None
+
+            # GetTickCount и dwTime 32-битные, поэтому разница по модулю
+            millis: int = (ctypes.windll.kernel32.GetTickCount() - info.dwTime) & 0xFFFFFFFF
+            return millis / 1000
+
+        if shutil.which("xprintidle"):
+            output: str = subprocess.check_output(
+                ["xprintidle"], text=True, timeout=5
+            )
+            return int(output.strip()) / 1000
+
+    except Exception:
+        pass
+
+    return None
+
+
+def is_session_locked() -> bool:
+    try:
+        if sys.platform == "win32":
+            import ctypes
+
+            DESKTOP_SWITCHDESKTOP = 0x0100
+
+            # Если сессия заблокирована, переключиться на рабочий стол ввода нельзя
+            user32 = ctypes.windll.user32
+            desktop = user32.OpenInputDesktop(0, False, DESKTOP_SWITCHDESKTOP)
+            if not desktop:
+                return True
+
+            try:
+                return not user32.SwitchDesktop(desktop)
+            finally:
+                user32.CloseDesktop(desktop)
+
+        session_id: str | None = os.environ.get("XDG_SESSION_ID")
+        if session_id and shutil.which("loginctl"):
+            output: str = subprocess.check_output(
+                ["loginctl", "show-session", session_id, "-p", "LockedHint", "--value"],
+                text=True,
+                timeout=5,
+            )
+            return output.strip() == "yes"
+
+    except Exception:
+        pass
+
+    return False
+
+
+class PollingPolicy:
+    """Адаптивный интервал авто-обновления.
+
+    После новой залогированной активности интервал минимальный, если изменений нет -
+    удваивается до максимального (в рабочее время) или до интервала нерабочего времени.
+    Количество запросов в день ограничено бюджетом: оставшиеся запросы распределяются
+    до конца дня, а после исчерпания бюджета обновление будет на следующий день.
+    """
+
+    def __init__(
+        self,
+        min_interval_minutes: float = POLLING_MIN_INTERVAL_MINUTES,
+        max_interval_minutes: float = POLLING_MAX_INTERVAL_MINUTES,
+        off_hours_interval_minutes: float = POLLING_OFF_HOURS_INTERVAL_MINUTES,
+        working_hours: list[int] = POLLING_WORKING_HOURS,
+        working_days: list[int] = POLLING_WORKING_DAYS,
+        idle_minutes: float | None = POLLING_IDLE_MINUTES,
+        daily_budget: int | None = POLLING_DAILY_BUDGET,
+    ) -> None:
+        self.min_interval: int = int(min_interval_minutes * 60)
+        self.max_interval: int = int(max_interval_minutes * 60)
+        self.off_hours_interval: int = int(off_hours_interval_minutes * 60)
+
+        start_hour, end_hour = working_hours
+        self.working_start: time = time(hour=start_hour)
+        self.working_end: time = time(hour=end_hour) if end_hour < 24 else time.max
+        self.working_days: set[int] = set(working_days)  # Как в date.isoweekday()
+
+        self.idle_seconds: float | None = idle_minutes * 60 if idle_minutes else None
+        self.daily_budget: int | None = daily_budget or None
+
+        self.interval: int = self.min_interval
+
+        self._requests_date: date | None = None
+        self._requests: int = 0
+
+    def is_working_time(self, dt: datetime) -> bool:
+        return (
+            dt.isoweekday() in self.working_days
+            and self.working_start <= dt.time() < self.working_end
+        )
+
+    def get_next_working_start(self, dt: datetime) -> datetime | None:
+        if not self.working_days:
+            return None
+
+        d: date = dt.date()
+        for _ in range(8):
+            start = datetime.combine(d, self.working_start)
+            if start > dt and d.isoweekday() in self.working_days:
+                return start
+            d += timedelta(days=1)
+
+        return None
+
+    def is_user_away(self) -> bool:
+        if is_session_locked():
+            return True
+
+        if self.idle_seconds is None:
+            return False
+
+        idle_seconds: float | None = get_idle_seconds()
+        return idle_seconds is not None and idle_seconds >= self.idle_seconds
+
+    def get_requests(self, dt: datetime) -> int:
+        if self._requests_date != dt.date():
+            return 0
+        return self._requests
+
+    def register_request(self, dt: datetime | None = None) -> None:
+        if not dt:
+            dt = datetime.now()
+
+        if self._requests_date != dt.date():
+            self._requests_date = dt.date()
+            self._requests = 0
+
+        self._requests += 1
+
+    def get_remaining_budget(self, dt: datetime) -> int | None:
+        if self.daily_budget is None:
+            return None
+        return max(0, self.daily_budget - self.get_requests(dt))
+
+    def next_interval(self, changed: bool, dt: datetime | None = None) -> int:
+        """Интервал до следующего обновления в секундах"""
+
+        if not dt:
+            dt = datetime.now()
+
+        is_working_time: bool = self.is_working_time(dt)
+        max_interval: int = self.max_interval if is_working_time else self.off_hours_interval
+
+        if changed:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * 2, max_interval)
+
+        # Сброс на минимальный интервал к началу рабочего дня
+        interval: int = self.interval
+        if not is_working_time:
+            next_working_start: datetime | None = self.get_next_working_start(dt)
+            if next_working_start:
+                seconds: int = int((next_working_start - dt).total_seconds())
+                if seconds < interval:
+                    interval = seconds
+                    self.interval = self.min_interval
+
+        remaining_budget: int | None = self.get_remaining_budget(dt)
+        if remaining_budget is not None:
+            tomorrow = datetime.combine(dt.date() + timedelta(days=1), time())
+            seconds_to_tomorrow: int = int((tomorrow - dt).total_seconds()) + 1
+            if remaining_budget == 0:
+                interval = max(interval, seconds_to_tomorrow)
+            else:
+                interval = max(interval, seconds_to_tomorrow // remaining_budget)
+
+        return max(interval, 1)
+
+
+if __name__ == "__main__":
+    from third_party.seconds_to_str import seconds_to_str
+
+    print(f"Idle seconds: {get_idle_seconds()}")
+    print(f"Session is locked: {is_session_locked()}")
+    print()
+
+    policy = PollingPolicy(
+        min_interval_minutes=5,
+        max_interval_minutes=60,
+        off_hours_interval_minutes=240,
+        working_hours=[9, 18],
+        working_days=[1, 2, 3, 4, 5],
+        daily_budget=100,
+    )
+
+    # Симуляция недели: новое залогированное время в 10:00 и 15:00 рабочих дней
+    dt = datetime(2026, 10, 19, 8, 0)  # Понедельник
+    end_dt = dt + timedelta(days=7)
+    last_dt = dt
+    requests_by_day: dict[date, int] = dict()
+    while dt < end_dt:
+        policy.register_request(dt)
+        requests_by_day[dt.date()] = requests_by_day.get(dt.date(), 0) + 1
+
+        changed: bool = dt.isoweekday() in policy.working_days and any(
+            last_dt < datetime.combine(dt.date(), time(hour)) <= dt for hour in (10, 15)
+        )
+        interval: int = policy.next_interval(changed, dt)
+        if dt.date() == date(2026, 10, 19):
+            print(f"{dt:%a %H:%M}{' *' if changed else '  '} -> {seconds_to_str(interval)}")
+
+        last_dt = dt
+        dt += timedelta(seconds=interval)
+
+    print()
+    for d, number in requests_by_day.items():
+        print(f"{d:%a %d.%m}: {number} requests")
@@ -5,12 +5,9 @@ __author__ = "ipetrash"
 
 
 import importlib
-import sys
 
 from pathlib import Path
 
-from PyQt6.QtWidgets import QTextBrowser
-
 from config import DIR
 
 
@@ -35,30 +32,6 @@ def get_module_from_requirements(module_name: str) -> str | None:
             return line
 
 
-def get_not_module_widget(
-    module_name: str,
-    text_template: str = "Для работы аддона нужно установить {name} и перезапустить приложение",
-) -> QTextBrowser:
-    name: str | None = get_module_from_requirements(module_name)
-    if not name:
-        name = module_name
-
-    html_text = f"""
-        <p>
-            <b><font color="red">
-            {text_template.format(name=name)}
-            </font></b>
-        </p>
-        <p>Команда:</p>
-        <p>{sys.executable} -m pip install {name}</p>
-    """
-
-    text_browser = QTextBrowser()
-    text_browser.setHtml(html_text)
-
-    return text_browser
-
-
 if __name__ == "__main__":
     print(is_installed("psutil"))
     # False
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "ipetrash"
+
+
+import gzip
+import pickle
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from config import PATH_SNAPSHOTS
+
+
+@dataclass(frozen=True, slots=True)
+class Snapshot:
+    dt: datetime
+    data: Any
+
+
+class SnapshotStore:
+    """Снимки последних успешных результатов для быстрого показа при запуске.
+
+    Результат сериализуется сразу при сохранении (чтобы последующие изменения
+    объектов не попали в снимок), а сжатие и запись в файл выполняются в фоне.
+    """
+
+    def __init__(self, path: Path = PATH_SNAPSHOTS) -> None:
+        self.path: Path = path
+
+        self._lock = threading.Lock()
+        self._pending: dict[str, bytes] = dict()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Snapshot")
+
+    def _get_path(self, name: str) -> Path:
+        return self.path / f"{name}.pickle.gz"
+
+    def put(self, name: str, data: Any, dt: datetime | None = None) -> None:
+        raw: bytes = pickle.dumps(
+            Snapshot(dt=dt or datetime.now(), data=data),
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+
+        with self._lock:
+            # Если предыдущий снимок еще не записан, то будет записан только новый
+            is_scheduled: bool = name in self._pending
+            self._pending[name] = raw
+
+        if not is_scheduled:
+            self._executor.submit(self._write, name)
+
+    def _write(self, name: str) -> None:
+        with self._lock:
+            raw: bytes | None = self._pending.pop(name, None)
+        if raw is None:
+            return
+
+        path: Path = self._get_path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Запись через временный файл, чтобы не было недописанных файлов
+        path_tmp: Path = path.with_name(f"{path.name}.tmp")
+        path_tmp.write_bytes(gzip.compress(raw, compresslevel=6))
+        path_tmp.replace(path)
+
+    def flush(self) -> None:
+        """Запись снимков, которые еще не записаны. Вызывается при завершении"""
+
+        with self._lock:
+            names: list[str] = list(self._pending)
+
+        for name in names:
+            self._write(name)
+
+    def get(self, name: str) -> Snapshot | None:
+        path: Path = self._get_path(name)
+        if not path.exists():
+            return
+
+        try:
+            snapshot = pickle.loads(gzip.decompress(path.read_bytes()))
+        except Exception:
+            # Снимок от другой версии программы или поврежденный файл
+            return
+
+        return snapshot if isinstance(snapshot, Snapshot) else None
+
+
+SNAPSHOTS = SnapshotStore()
+
+
+if __name__ == "__main__":
+    from api import get_ago
+
+    for path in sorted(SNAPSHOTS.path.glob("*.pickle.gz")):
+        name: str = path.name.removesuffix(".pickle.gz")
+        snapshot: Snapshot | None = SNAPSHOTS.get(name)
+        if snapshot:
+            print(f"{name}: {snapshot.dt} ({get_ago(snapshot.dt)}), {path.stat().st_size} bytes")
+        else:
+            print(f"{name}: <не удалось прочитать>")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "ipetrash"
+
+
+import functools
+import json
+import os
+import threading
+import time
+
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+
+# NOTE: Модуль не должен импортировать api, т.к. используется в api/__init__.py
+
+
+# Ограничение на количество хранимых событий, старые будут вытесняться
+MAX_EVENTS: int = 100_000
+
+
+class Tracer:
+    def __init__(self, max_events: int = MAX_EVENTS) -> None:
+        self.enabled: bool = True
+
+        # NOTE: deque.append потокобезопасный
+        self._events: deque[dict[str, Any]] = deque(maxlen=max_events)
+        self._thread_names: dict[tuple[int, int], str] = dict()
+
+    @staticmethod
+    def _now_us() -> float:
+        return time.perf_counter_ns() / 1000
+
+    @contextmanager
+    def span(self, name: str, cat: str = "app", **args) -> Iterator[dict[str, Any]]:
+        # В args можно дописать значения внутри блока with, например, статус ответа
+        if not self.enabled:
+            yield args
+            return
+
+        pid: int = os.getpid()
+        tid: int = threading.get_ident()
+        self._thread_names[(pid, tid)] = threading.current_thread().name
+
+        started: float = self._now_us()
+        try:
+            yield args
+        except BaseException as e:
+            args["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self._events.append(
+                {
+                    "name": name,
+                    "cat": cat,
+                    "ph": "X",
+                    "ts": started,
+                    "dur": self._now_us() - started,
+                    "pid": pid,
+                    "tid": tid,
+                    "args": args,
+                }
+            )
+
+    def traced(self, name: str | None = None, cat: str = "app") -> Callable:
+        def decorator(func: Callable) -> Callable:
+            span_name: str = name if name else func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name, cat=cat):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def clear(self) -> None:
+        self._events.clear()
+
+    def get_events(self) -> list[dict[str, Any]]:
+        return list(self._events)
+
+    def get_chrome_trace(self) -> dict[str, Any]:
+        # SOURCE: https://docs.google.com/document/d/1CvAClvFfyA5R-PhYUmn5OOQtYMH4h6I0nSsKchNAySU
+        metadata: list[dict[str, Any]] = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": tid,
+                "args": {"name": thread_name},
+            }
+            for (pid, tid), thread_name in list(self._thread_names.items())
+        ]
+        return {
+            "traceEvents": metadata + self.get_events(),
+            "displayTimeUnit": "ms",
+        }
+
+    def export_chrome_trace(self, path: Path | str) -> int:
+        trace: dict[str, Any] = self.get_chrome_trace()
+        Path(path).write_text(
+            json.dumps(trace, ensure_ascii=False, default=str),
+            encoding="utf-8",
+        )
+        return len(trace["traceEvents"])
+
+
+TRACER = Tracer()
+
+span = TRACER.span
+traced = TRACER.traced
+
+
+if __name__ == "__main__":
+    @traced()
+    def foo(n: int) -> int:
+        time.sleep(0.01)
+        return n * 2
+
+    with span("main", n=3) as span_args:
+        thread = threading.Thread(target=foo, args=(1,), name="Worker")
+        thread.start()
+        span_args["result"] = foo(3)
+        thread.join()
+
+    for event in TRACER.get_events():
+        print(event)
+
+    path = Path("trace.json")
+    print(TRACER.export_chrome_trace(path), path.resolve())
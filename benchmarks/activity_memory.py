@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "ipetrash"
+
+
+# Замер памяти на активности: прежнее представление (dataclass с __dict__, datetime
+# и своими копиями строк задачи) против текущего (slots, frozen, общая таблица задач).
+#
+# Запуск: python -m benchmarks.activity_memory [<количество активностей>] [<количество задач>]
+
+
+import random
+import sys
+import tracemalloc
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from api.jira_rss import (
+    Activity,
+    ActivityActionEnum,
+    IssueTable,
+    Logged,
+    get_issue,
+    utc_to_local,
+)
+
+
+# Одна таблица задач на все активности замера, как при разборе одного RSS
+ISSUE_TABLE: IssueTable = dict()
+
+
+@dataclass
+class OldLogged:
+    human_time: str
+    seconds: int
+    description: str | None = None
+
+
+@dataclass
+class OldActivity:
+    id: str
+    entry_dt: datetime
+    action: ActivityActionEnum
+    action_text: str
+    jira_id: str
+    jira_title: str
+    logged: OldLogged | None = None
+    link_to_comment: str | None = None
+
+
+def _copy(text: str) -> str:
+    # Как при разборе XML: у каждой записи свой объект строки
+    return "".join(list(text))
+
+
+def get_raw_items(number: int, issues: int, seed: int = 42) -> list[dict[str, Any]]:
+    rnd = random.Random(seed)
+
+    start_ts: int = int(datetime(2025, 1, 1, tzinfo=timezone.utc).timestamp())
+
+    items: list[dict[str, Any]] = []
+    for i in range(number):
+        issue_idx: int = rnd.randrange(issues)
+        is_logged: bool = rnd.random() < 0.5
+        action: ActivityActionEnum = (
+            ActivityActionEnum.LOGGED if is_logged else ActivityActionEnum.COMMENTED
+        )
+        items.append(
+            dict(
+                id=f"urn:uuid:{rnd.getrandbits(128):032x}",
+                entry_ts=start_ts + i * 600,
+                action=action,
+                action_text=f"User {action.name.lower()} PROJ-{issue_idx}",
+                jira_id=f"PROJ-{issue_idx}",
+                jira_title=f"Issue title number {issue_idx} with some words",
+                logged_seconds=rnd.randrange(1, 16) * 900 if is_logged else None,
+            )
+        )
+
+    return items
+
+
+def create_old(raw: dict[str, Any]) -> OldActivity:
+    logged_seconds: int | None = raw["logged_seconds"]
+    return OldActivity(
+        id=raw["id"],
+        entry_dt=utc_to_local(datetime.utcfromtimestamp(raw["entry_ts"])),
+        action=raw["action"],
+        action_text=raw["action_text"],
+        jira_id=_copy(raw["jira_id"]),
+        jira_title=_copy(raw["jira_title"]),
+        logged=(
+            OldLogged(human_time=f"{logged_seconds // 60}m", seconds=logged_seconds)
+            if logged_seconds
+            else None
+        ),
+    )
+
+
+def create_new(raw: dict[str, Any]) -> Activity:
+    logged_seconds: int | None = raw["logged_seconds"]
+    return Activity(
+        id=raw["id"],
+        entry_ts=raw["entry_ts"],
+        action=raw["action"],
+        action_text=raw["action_text"],
+        issue=get_issue(_copy(raw["jira_id"]), _copy(raw["jira_title"]), ISSUE_TABLE),
+        logged=(
+            Logged(human_time=f"{logged_seconds // 60}m", seconds=logged_seconds)
+            if logged_seconds
+            else None
+        ),
+    )
+
+
+def measure(
+    raw_items: list[dict[str, Any]],
+    create: Callable[[dict[str, Any]], Any],
+) -> tuple[int, int]:
+    # Строки id и action_text одинаковые в обоих вариантах, поэтому создаются до замера
+    tracemalloc.start()
+    try:
+        items = [create(raw) for raw in raw_items]
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return current, sys.getsizeof(items[0])
+
+
+if __name__ == "__main__":
+    number: int = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    issues: int = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    raw_items = get_raw_items(number, issues)
+    print(f"Активностей: {number}, задач: {issues}")
+
+    ISSUE_TABLE.clear()
+
+    lines: list[tuple[str, str, str, str]] = [
+        ("ВАРИАНТ", "ВСЕГО, МБ", "НА АКТИВНОСТЬ, Б", "ОБЪЕКТ, Б"),
+    ]
+    results: dict[str, int] = dict()
+    for title, create in [("dataclass", create_old), ("slots", create_new)]:
+        total, size = measure(raw_items, create)
+        results[title] = total
+        lines.append(
+            (title, f"{total / 1024 / 1024:.1f}", f"{total / number:.0f}", str(size))
+        )
+
+    max_len_columns = [max(map(len, col)) for col in zip(*lines)]
+    my_table_format = " | ".join("{:<%s}" % max_len for max_len in max_len_columns)
+    for line in lines:
+        print(my_table_format.format(*line))
+
+    print(f"Экономия: {(1 - results['slots'] / results['dataclass']) * 100:.0f}%")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "ipetrash"
+
+
+# Проверка и замер очистки заголовков и описаний записей RSS: прежний вариант
+# (все этапы decode для каждой строки) против текущего get_clean_html
+# (пропуск лишних этапов и кэш). Результаты должны совпадать полностью.
+#
+# Запуск: python -m benchmarks.clean_html <путь к XML с RSS> [<путь к XML с RSS> ...]
+
+
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+from pathlib import Path
+from typing import Callable
+
+from api.jira_rss import PATTERN_TAGS, PATTERN_SPACES, get_clean_html
+from third_party.decode_escapes_telegram_bot.utils import decode
+
+
+NS: dict[str, str] = {"": "http://www.w3.org/2005/Atom"}
+
+
+def get_clean_html_old(raw_html: str) -> str:
+    text = PATTERN_TAGS.sub("", raw_html)
+    text = PATTERN_SPACES.sub(" ", text).strip()
+    return decode(text)
+
+
+def get_texts(path: Path) -> list[str]:
+    root = ET.fromstring(path.read_bytes())
+
+    items: list[str] = []
+    for entry in root.findall("./entry", namespaces=NS):
+        items.append(entry.find("./title", namespaces=NS).text.strip())
+
+        content_el = entry.find("./content", namespaces=NS)
+        if content_el is not None and content_el.text:
+            items.append(content_el.text)
+
+    return items
+
+
+def get_result(func: Callable[[str], str], text: str) -> str | tuple[str, str]:
+    try:
+        return func(text)
+    except Exception as e:
+        return "<error>", repr(e)
+
+
+def measure(func: Callable[[str], str], texts: list[str]) -> float:
+    t = time.perf_counter()
+    for text in texts:
+        get_result(func, text)
+    return time.perf_counter() - t
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(f"Использование: {sys.argv[0]} <путь к XML с RSS> [<путь к XML с RSS> ...]")
+        sys.exit(1)
+
+    texts: list[str] = []
+    for arg in sys.argv[1:]:
+        texts += get_texts(Path(arg))
+
+    mismatches: int = 0
+    for text in texts:
+        expected = get_result(get_clean_html_old, text)
+        actual = get_result(get_clean_html, text)
+        if expected != actual:
+            mismatches += 1
+            print(f"Несовпадение: {text!r}\n    {expected!r}\n    {actual!r}")
+
+    get_clean_html.cache_clear()
+
+    print(f"Строк: {len(texts)}, уникальных: {len(set(texts))}")
+    print(f"Прежний вариант: {measure(get_clean_html_old, texts):.3f} сек")
+    print(f"get_clean_html: {measure(get_clean_html, texts):.3f} сек")
+    print(f"get_clean_html (повторно): {measure(get_clean_html, texts):.3f} сек")
+    print(get_clean_html.cache_info())
+
+    print(f"Несовпадений: {mismatches}")
+    if mismatches:
+        sys.exit(1)
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "ipetrash"
+
+
+# Замер N одновременных запросов через транспорт requests (HTTP/1.1) против httpx (HTTP/2)
+# к локальному TLS-серверу, который отвечает с задержкой и считает TLS-соединения.
+# Сервер требует клиентский сертификат, как джира. Нужны openssl, httpx и h2.
+#
+# Запуск: python -m benchmarks.http2_transport [<количество запросов>] [<задержка ответа, мс>]
+
+
+import asyncio
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+from api import CustomAdapter, Http2Adapter, IS_INSTALLED_HTTPX
+
+if IS_INSTALLED_HTTPX:
+    import h2.config
+    import h2.connection
+    import h2.events
+
+
+BODY: bytes = b"x" * 512
+
+
+def create_cert(path: Path) -> None:
+    """Самоподписанный сертификат с ключом в одном PEM: и для сервера, и для клиента"""
+
+    path_key: Path = path.with_suffix(".key")
+    path_crt: Path = path.with_suffix(".crt")
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+            "-keyout", str(path_key), "-out", str(path_crt),
+            "-days", "1", "-subj", "/CN=127.0.0.1",
+            "-addext", "subjectAltName=IP:127.0.0.1",
+        ],
+        check=True,
+        capture_output=True,
+    )
+    path.write_bytes(path_crt.read_bytes() + path_key.read_bytes())
+
+
+class MockServer:
+    def __init__(self, path_cert: Path, delay: float) -> None:
+        self.path_cert: Path = path_cert
+        self.delay: float = delay
+        self.connections: Counter = Counter()
+        self.requests: int = 0
+        self.port: int = 0
+
+        self._loop = asyncio.new_event_loop()
+
+    def start(self) -> None:
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+
+    async def _start(self) -> None:
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context.load_cert_chain(self.path_cert)
+        context.load_verify_locations(self.path_cert)
+        context.verify_mode = ssl.CERT_REQUIRED
+        context.set_alpn_protocols(["h2", "http/1.1"])
+
+        server = await asyncio.start_server(self._handle, "127.0.0.1", 0, ssl=context)
+        self.port = server.sockets[0].getsockname()[1]
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        protocol: str = writer.get_extra_info("ssl_object").selected_alpn_protocol() or "http/1.1"
+        self.connections[protocol] += 1
+        try:
+            if protocol == "h2":
+                await self._handle_h2(reader, writer)
+            else:
+                await self._handle_http1(reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_http1(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        while True:
+            headers: bytes = await reader.readuntil(b"\r\n\r\n")
+            if not headers:
+                return
+
+            self.requests += 1
+            await asyncio.sleep(self.delay)
+
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\n"
+                b"Content-Length: %d\r\n\r\n%s" % (len(BODY), BODY)
+            )
+            await writer.drain()
+
+    async def _handle_h2(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        conn = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False)
+        )
+        conn.initiate_connection()
+        writer.write(conn.data_to_send())
+
+        async def _respond(stream_id: int) -> None:
+            await asyncio.sleep(self.delay)
+            conn.send_headers(
+                stream_id,
+                [
+                    (":status", "200"),
+                    ("content-type", "text/plain"),
+                    ("content-length", str(len(BODY))),
+                ],
+            )
+            conn.send_data(stream_id, BODY, end_stream=True)
+            writer.write(conn.data_to_send())
+
+        while data := await reader.read(65536):
+            for event in conn.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    self.requests += 1
+                    asyncio.ensure_future(_respond(event.stream_id))
+
+            writer.write(conn.data_to_send())
+            await writer.drain()
+
+
+def run(adapter: CustomAdapter, url: str, path_cert: Path, number: int) -> float:
+    session = requests.session()
+    session.mount("https://", adapter)
+
+    def _get(_) -> requests.Response:
+        # NOTE: verify передается в запрос, т.к. REQUESTS_CA_BUNDLE перекрывает session.verify
+        return session.get(url, cert=str(path_cert), verify=str(path_cert))
+
+    try:
+        t = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=number) as executor:
+            for rs in executor.map(_get, range(number)):
+                assert rs.status_code == 200 and rs.content == BODY, rs
+        return time.perf_counter() - t
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    if not IS_INSTALLED_HTTPX:
+        print('Нужны модули httpx и h2: pip install "httpx[http2]"')
+        sys.exit(1)
+
+    number: int = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    delay_ms: int = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    with tempfile.TemporaryDirectory() as dir_name:
+        path_cert: Path = Path(dir_name) / "cert.pem"
+        create_cert(path_cert)
+
+        print(f"Запросов: {number}, задержка ответа: {delay_ms} мс")
+        for name, create_adapter in [
+            ("requests (HTTP/1.1)", CustomAdapter),
+            ("httpx (HTTP/2)", Http2Adapter),
+        ]:
+            # На каждый транспорт свой сервер, чтобы соединения считались отдельно
+            server = MockServer(path_cert, delay=delay_ms / 1000)
+            server.start()
+
+            url: str = f"https://127.0.0.1:{server.port}/rest/api/latest/myself"
+
+            # NOTE: Как в api.session, пул соединений requests по-умолчанию - 10 на хост
+            elapsed: float = run(create_adapter(), url, path_cert, number)
+            print(
+                f"{name}: {elapsed:.3f} secs, запросов: {server.requests}, "
+                f"TLS-соединений: {dict(server.connections)}"
+            )
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "ipetrash"
+
+
+# Замер параллельного разбора RSS в пуле процессов против разбора в одном процессе.
+# Результаты должны совпадать полностью.
+#
+# Запуск: python -m benchmarks.parse_parallel <путь к XML с RSS> [<путь к XML с RSS> ...]
+
+
+import os
+import sys
+import time
+
+from datetime import date
+from multiprocessing.pool import Pool
+from pathlib import Path
+
+from api.jira_rss import Activity, parse_date_by_activities
+from api.jira_rss_parallel import parse_date_by_activities_parallel
+
+
+def get_rows(date_by_activities: dict[date, list[Activity]]) -> list[tuple[date, str]]:
+    return [
+        (entry_date, repr(activity))
+        for entry_date, activities in date_by_activities.items()
+        for activity in activities
+    ]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(f"Использование: {sys.argv[0]} <путь к XML с RSS> [<путь к XML с RSS> ...]")
+        sys.exit(1)
+
+    items: list[bytes] = [Path(arg).read_bytes() for arg in sys.argv[1:]]
+    print(
+        f"RSS: {len(items)}, байт: {sum(map(len, items))}, ядер: {os.cpu_count()}"
+    )
+
+    t = time.perf_counter()
+    expected: dict[date, list[Activity]] = dict()
+    for xml_data in items:
+        for entry_date, activities in parse_date_by_activities(xml_data).items():
+            expected.setdefault(entry_date, []).extend(activities)
+    serial: float = time.perf_counter() - t
+    print(f"Один процесс: {serial:.3f} сек")
+
+    mismatches: int = 0
+    for processes in sorted({1, 2, 4, os.cpu_count() or 1}):
+        with Pool(processes=processes) as pool:
+            # Прогрев: запуск процессов и импорт модулей
+            pool.map(abs, range(processes))
+
+            t = time.perf_counter()
+            actual = parse_date_by_activities_parallel(
+                items, pool=pool, processes=processes, min_bytes=0
+            )
+            elapsed: float = time.perf_counter() - t
+
+        is_equal: bool = get_rows(actual) == get_rows(expected)
+        mismatches += not is_equal
+        print(
+            f"Процессов: {processes}: {elapsed:.3f} сек, "
+            f"ускорение x{serial / elapsed:.2f}{'' if is_equal else ', НЕ СОВПАДАЕТ'}"
+        )
+
+    if mismatches:
+        sys.exit(1)
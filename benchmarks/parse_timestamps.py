@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "ipetrash"
+
+
+# Замер разбора времени записей RSS: прежний вариант (datetime.strptime и utc_to_local
+# на каждую запись) против текущего (разбор срезами и часовой пояс, найденный один раз).
+# Также проверяется, что локальные даты совпадают, в том числе у переходов на летнее время.
+#
+# Запуск: python -m benchmarks.parse_timestamps [<количество записей>]
+# Для проверки другого часового пояса: TZ=Europe/Berlin python -m benchmarks.parse_timestamps
+
+
+import sys
+import time
+
+from datetime import datetime, date, timedelta, timezone, tzinfo
+from typing import Callable
+
+from api.jira_rss import (
+    utc_to_local,
+    parse_utc_timestamp,
+    update_local_timezone,
+)
+
+
+def get_published_items(number: int) -> list[str]:
+    # Шаг некратный часу, чтобы попасть в разные минуты около переходов времени
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    step = timedelta(days=2 * 365) / number
+    return [
+        (start + step * i).strftime("%Y-%m-%dT%H:%M:%S.") + f"{i % 1000:03}Z"
+        for i in range(number)
+    ]
+
+
+def get_dates_old(items: list[str]) -> list[date]:
+    result: list[date] = []
+    for text in items:
+        entry_dt = datetime.strptime(text, "%Y-%m-%dT%H:%M:%S.%fZ")
+        entry_dt = utc_to_local(entry_dt)
+        result.append(entry_dt.date())
+
+    return result
+
+
+def get_dates_new(items: list[str]) -> list[date]:
+    local_timezone: tzinfo = update_local_timezone()
+
+    result: list[date] = []
+    for text in items:
+        entry_ts: int = parse_utc_timestamp(text)
+        result.append(datetime.fromtimestamp(entry_ts, tz=local_timezone).date())
+
+    return result
+
+
+def measure(
+    func: Callable[[list[str]], list[date]],
+    items: list[str],
+) -> tuple[float, list[date]]:
+    t = time.perf_counter()
+    result = func(items)
+    return time.perf_counter() - t, result
+
+
+if __name__ == "__main__":
+    number: int = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    items: list[str] = get_published_items(number)
+    print(f"Записей: {number}, часовой пояс: {update_local_timezone()!r}")
+
+    elapsed_old, dates_old = measure(get_dates_old, items)
+    elapsed_new, dates_new = measure(get_dates_new, items)
+
+    print(f"strptime + utc_to_local: {elapsed_old:.3f} сек")
+    print(f"parse_utc_timestamp + кэш часового пояса: {elapsed_new:.3f} сек")
+    print(f"Ускорение: x{elapsed_old / elapsed_new:.1f}")
+
+    mismatches: int = sum(1 for d1, d2 in zip(dates_old, dates_new) if d1 != d2)
+    print(f"Несовпадений дат: {mismatches}")
+    if mismatches:
+        sys.exit(1)
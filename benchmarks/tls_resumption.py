@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "ipetrash"
+
+
+# Замер первого запроса обновления без возобновления сессий TLS и с ним. Между обновлениями
+# соединения закрываются, как после таймаута keep-alive, поэтому каждое обновление
+# начинается с рукопожатия. Сервер требует клиентский сертификат, как джира. Нужен openssl.
+#
+# Запуск: python -m benchmarks.tls_resumption [<количество обновлений>] [<запросов в обновлении>]
+
+
+import statistics
+import sys
+import tempfile
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+from api import CustomAdapter, connections
+from benchmarks.http2_transport import MockServer, create_cert
+
+
+def run(
+    is_reuse: bool,
+    url: str,
+    path_cert: Path,
+    refreshes: int,
+    number: int,
+) -> tuple[list[float], connections.HandshakeStats]:
+    adapter = CustomAdapter()
+    adapter.is_reuse_tls_sessions = is_reuse
+
+    session = requests.session()
+    session.mount("https://", adapter)
+
+    def _get(_=None) -> requests.Response:
+        # NOTE: verify передается в запрос, т.к. REQUESTS_CA_BUNDLE перекрывает session.verify
+        rs = session.get(url, cert=str(path_cert), verify=str(path_cert))
+        rs.raise_for_status()
+        return rs
+
+    stats_before: connections.HandshakeStats = connections.get_stats()
+    first_times: list[float] = []
+    try:
+        with ThreadPoolExecutor(max_workers=number) as executor:
+            for _ in range(refreshes):
+                # Соединения закрыты сервером по таймауту keep-alive
+                adapter.poolmanager.clear()
+
+                t = time.perf_counter()
+                _get()
+                first_times.append(time.perf_counter() - t)
+
+                list(executor.map(_get, range(number - 1)))
+    finally:
+        session.close()
+
+    return first_times, connections.get_stats() - stats_before
+
+
+if __name__ == "__main__":
+    refreshes: int = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    number: int = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with tempfile.TemporaryDirectory() as dir_name:
+        path_cert: Path = Path(dir_name) / "cert.pem"
+        create_cert(path_cert)
+
+        server = MockServer(path_cert, delay=0)
+        server.start()
+
+        url: str = f"https://127.0.0.1:{server.port}/rest/api/latest/myself"
+
+        print(f"Обновлений: {refreshes}, запросов в обновлении: {number}")
+        for name, is_reuse in [
+            ("Без возобновления сессий", False),
+            ("С возобновлением сессий", True),
+        ]:
+            connections_before: int = sum(server.connections.values())
+            first_times, stats = run(is_reuse, url, path_cert, refreshes, number)
+
+            text: str = (
+                f"{name}: первый запрос обновления (медиана) "
+                f"{statistics.median(first_times) * 1000:.1f} мс, "
+                f"TLS-соединений {sum(server.connections.values()) - connections_before}"
+            )
+            # NOTE: Без возобновления сессий используется контекст requests и рукопожатия не учитываются
+            if is_reuse:
+                text += f", рукопожатий TLS {stats}"
+            print(text)
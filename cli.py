@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "ipetrash"
+
+
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+import traceback
+
+from dataclasses import asdict, fields, is_dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable
+
+import api
+
+from api import gateway, get_human_datetime
+from api.aggregation import (
+    get_logged_by_day,
+    get_logged_by_week,
+    get_logged_by_month,
+    get_logged_by_jira,
+)
+from api.jira import get_username
+from api.jira_rss import (
+    Activity,
+    FeedChangeProbe,
+    get_rss_jira_log,
+    parse_date_by_activities,
+)
+from api.jira_rss_parallel import replay_date_by_activities
+from api.jira_worklog import get_worklog_activities
+from config import PROGRAM_NAME, USERNAME, LOGGED_SOURCE, GATEWAY_SOCKET, PREWARM_SECONDS
+from third_party.seconds_to_str import seconds_to_str
+
+
+AGGREGATION_BY_NAME: dict[str, Callable[[dict[date, list[Activity]]], list[Any]]] = {
+    "day": get_logged_by_day,
+    "week": get_logged_by_week,
+    "month": get_logged_by_month,
+    "jira": get_logged_by_jira,
+}
+
+FORMATS: list[str] = ["table", "json", "csv"]
+
+
+def get_date_by_activities(
+    username: str | None,
+    path_xml: Path | None = None,
+    probe: FeedChangeProbe | None = None,
+    source: str = LOGGED_SOURCE,
+    replay: bool = False,
+) -> dict[date, list[Activity]]:
+    if replay:
+        return replay_date_by_activities(username, with_descriptions=False)
+
+    if source == "worklog" and not path_xml:
+        return get_worklog_activities(username)
+
+    if path_xml:
+        xml_data: bytes = path_xml.read_bytes()
+    else:
+        xml_data: bytes = get_rss_jira_log(username)
+        if probe and username:
+            probe.update(username, xml_data)
+
+    # Описания залогированного в отчетах не используются
+    return parse_date_by_activities(xml_data, with_descriptions=False)
+
+
+def get_rows(items: list[Any]) -> tuple[list[str], list[dict[str, Any]]]:
+    if not items:
+        return [], []
+
+    assert is_dataclass(items[0])
+
+    header: list[str] = [f.name for f in fields(items[0])]
+    rows: list[dict[str, Any]] = []
+    for obj in items:
+        row: dict[str, Any] = asdict(obj)
+        row["logged"] = seconds_to_str(row["logged_seconds"])
+        rows.append(row)
+
+    header.append("logged")
+    return header, rows
+
+
+def format_table(header: list[str], rows: list[dict[str, Any]]) -> str:
+    lines: list[list[str]] = [[name.upper() for name in header]]
+    for row in rows:
+        lines.append([str(row[name]) for name in header])
+
+    # Список строк станет списком столбцов, у каждого столбца подсчитается максимальная длина
+    max_len_columns = [max(map(len, col)) for col in zip(*lines)]
+
+    # Создание строки форматирования: [30, 14, 5] -> "{:<30} | {:<14} | {:<5}"
+    my_table_format = " | ".join("{:<%s}" % max_len for max_len in max_len_columns)
+
+    return "\n".join(my_table_format.format(*line) for line in lines)
+
+
+def format_json(header: list[str], rows: list[dict[str, Any]]) -> str:
+    return json.dumps(rows, indent=4, ensure_ascii=False, default=str)
+
+
+def format_csv(header: list[str], rows: list[dict[str, Any]]) -> str:
+    buffer_io = io.StringIO()
+
+    writer = csv.DictWriter(buffer_io, fieldnames=header, lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(rows)
+
+    return buffer_io.getvalue()
+
+
+FORMAT_FUNC_BY_NAME: dict[str, Callable[[list[str], list[dict[str, Any]]], str]] = {
+    "table": format_table,
+    "json": format_json,
+    "csv": format_csv,
+}
+
+
+def get_report(
+    by: str,
+    fmt: str,
+    username: str | None,
+    path_xml: Path | None = None,
+    probe: FeedChangeProbe | None = None,
+    source: str = LOGGED_SOURCE,
+    replay: bool = False,
+) -> str:
+    date_by_activities = get_date_by_activities(
+        username, path_xml, probe, source, replay
+    )
+    items: list[Any] = AGGREGATION_BY_NAME[by](date_by_activities)
+
+    header, rows = get_rows(items)
+    return FORMAT_FUNC_BY_NAME[fmt](header, rows)
+
+
+def write_report(text: str, output: Path | None) -> None:
+    if not output:
+        print(text)
+        return
+
+    # Запись через временный файл, чтобы читатели не увидели недописанный файл
+    path_tmp: Path = output.with_name(f"{output.name}.tmp")
+    path_tmp.write_text(text, encoding="utf-8")
+    path_tmp.replace(output)
+
+
+def run_logged(
+    args: argparse.Namespace,
+    probe: FeedChangeProbe | None = None,
+) -> None:
+    text: str = get_report(
+        by=args.by,
+        fmt=args.format,
+        username=args.username,
+        path_xml=args.from_file,
+        probe=probe,
+        source=args.source,
+        replay=args.replay,
+    )
+    write_report(text, args.output)
+
+
+def sleep_with_prewarm(interval: float) -> None:
+    """Ожидание следующего обновления. Соединения открываются заранее, чтобы
+    обновление не ждало рукопожатий TLS"""
+
+    if not PREWARM_SECONDS or interval <= PREWARM_SECONDS:
+        time.sleep(interval)
+        return
+
+    time.sleep(interval - PREWARM_SECONDS)
+    api.prewarm()
+    time.sleep(PREWARM_SECONDS)
+
+
+def run_daemon(args: argparse.Namespace) -> None:
+    print(f"[{get_human_datetime()}] Запуск с интервалом {args.interval} секунд")
+
+    # Если новых записей в RSS нет, то отчет не пересчитывается
+    probe = FeedChangeProbe()
+
+    while True:
+        try:
+            if not args.from_file and not args.replay and args.source == "rss":
+                if not args.username:
+                    args.username = get_username()
+
+                if not probe.is_changed(args.username):
+                    print(f"[{get_human_datetime()}] Без изменений")
+                    sleep_with_prewarm(args.interval)
+                    continue
+
+            run_logged(args, probe)
+            print(f"[{get_human_datetime()}] Обновлено")
+        except KeyboardInterrupt:
+            raise
+        except Exception:
+            print(f"[{get_human_datetime()}] Ошибка при обновлении:")
+            traceback.print_exc()
+
+        sleep_with_prewarm(args.interval)
+
+
+def run_gateway(args: argparse.Namespace) -> None:
+    gateway.run(args.socket)
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog=PROGRAM_NAME,
+        description="Консольная версия: получение залогированного времени без GUI",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def _add_common_arguments(p: argparse.ArgumentParser) -> None:
+        p.add_argument(
+            "--by",
+            choices=list(AGGREGATION_BY_NAME),
+            default="day",
+            help="Группировка (по-умолчанию: %(default)s)",
+        )
+        p.add_argument(
+            "--format",
+            choices=FORMATS,
+            default="table",
+            help="Формат вывода (по-умолчанию: %(default)s)",
+        )
+        p.add_argument(
+            "--username",
+            default=USERNAME,
+            help="Имя пользователя. По-умолчанию, из конфига или текущий пользователь в джире",
+        )
+        p.add_argument(
+            "--output",
+            type=Path,
+            help="Путь к файлу для сохранения. По-умолчанию, вывод в консоль",
+        )
+        p.add_argument(
+            "--source",
+            choices=["rss", "worklog"],
+            default=LOGGED_SOURCE,
+            help=(
+                "Источник: RSS активностей или ворклоги задач через REST API "
+                "(по-умолчанию, из конфига: %(default)s)"
+            ),
+        )
+        p.add_argument(
+            "--from-file",
+            type=Path,
+            help="Путь к сохраненному XML с RSS, вместо запроса",
+        )
+        p.add_argument(
+            "--replay",
+            action="store_true",
+            help="Разбор RSS из архива ответов, без запросов (нужно имя пользователя)",
+        )
+
+    parser_logged = subparsers.add_parser(
+        "logged",
+        help="Получение и вывод залогированного времени",
+    )
+    _add_common_arguments(parser_logged)
+    parser_logged.set_defaults(func=run_logged)
+
+    parser_daemon = subparsers.add_parser(
+        "daemon",
+        help="Периодическое получение и сохранение залогированного времени",
+    )
+    _add_common_arguments(parser_daemon)
+    parser_daemon.add_argument(
+        "--interval",
+        type=int,
+        default=60 * 60,
+        help="Интервал обновления в секундах (по-умолчанию: %(default)s)",
+    )
+    parser_daemon.set_defaults(func=run_daemon)
+
+    parser_gateway = subparsers.add_parser(
+        "gateway",
+        help="Общий шлюз запросов к джире для экземпляров приложения на этом хосте",
+    )
+    parser_gateway.add_argument(
+        "--socket",
+        type=Path,
+        default=Path(GATEWAY_SOCKET) if GATEWAY_SOCKET else gateway.DEFAULT_SOCKET_PATH,
+        help="Путь к Unix-сокету (по-умолчанию: %(default)s)",
+    )
+    parser_gateway.set_defaults(func=run_gateway)
+
+    return parser
+
+
+if __name__ == "__main__":
+    args = get_parser().parse_args()
+
+    # Сам шлюз выполняет запросы напрямую
+    if args.command != "gateway":
+        api.GATEWAY_SOCKET = GATEWAY_SOCKET
+
+    try:
+        args.func(args)
+    except KeyboardInterrupt:
+        sys.exit()
@@ -53,7 +53,70 @@ USERNAME: str | None = CONFIG["username"]
 MAX_RESULTS: int = CONFIG["max_results"]
 JIRA_HOST: str = CONFIG["jira_host"]
 NAME_CERT: str = CONFIG["name_cert"]  # NOTE: Получение описано в README.md
+METRICS_PORT: int | None = CONFIG["metrics_port"]
+TEAM_MAX_WORKERS: int = CONFIG["team_max_workers"]
+TEAM_REQUESTS_PER_SECOND: float = CONFIG["team_requests_per_second"]
+
+# Коэффициенты перевода из настроек джиры: 1d = 8h, 1w = 5d
+JIRA_HOURS_PER_DAY: float = CONFIG["jira_hours_per_day"]
+JIRA_DAYS_PER_WEEK: float = CONFIG["jira_days_per_week"]
+
+# Адаптивное авто-обновление
+POLLING_MIN_INTERVAL_MINUTES: float = CONFIG["polling_min_interval_minutes"]
+POLLING_MAX_INTERVAL_MINUTES: float = CONFIG["polling_max_interval_minutes"]
+POLLING_OFF_HOURS_INTERVAL_MINUTES: float = CONFIG["polling_off_hours_interval_minutes"]
+POLLING_WORKING_HOURS: list[int] = CONFIG["polling_working_hours"]
+POLLING_WORKING_DAYS: list[int] = CONFIG["polling_working_days"]
+POLLING_IDLE_MINUTES: float | None = CONFIG["polling_idle_minutes"]
+POLLING_DAILY_BUDGET: int | None = CONFIG["polling_daily_budget"]
+
+# Фильтры RSS на стороне сервера
+RSS_PROVIDERS: list[str] = CONFIG["rss_providers"]
+RSS_PROJECTS: list[str] = CONFIG["rss_projects"]
+RSS_ACTIVITIES: list[str] = CONFIG["rss_activities"]
+RSS_WITH_DESCRIPTIONS: bool = CONFIG["rss_with_descriptions"]
+
+# Источник залогированного времени: "rss" - RSS активностей, "worklog" - ворклоги через REST API
+LOGGED_SOURCE: str = CONFIG["logged_source"]
+WORKLOG_DAYS: int = CONFIG["worklog_days"]
+WORKLOG_MAX_WORKERS: int = CONFIG["worklog_max_workers"]
+
+# Архив сырых ответов RSS
+PATH_ARCHIVE: Path = DIR / "archive"
+ARCHIVE_MAX_MB: int = CONFIG["archive_max_mb"]
+ARCHIVE_MAX_RESPONSES: int = CONFIG["archive_max_responses"]
+ARCHIVE_COMPRESSION: str = CONFIG["archive_compression"]
+
+# Дополнительные колонки таблиц с полями задач, например, ["status", "issuetype"]
+ISSUE_COLUMNS: list[str] = CONFIG["issue_columns"]
+ISSUE_CACHE_TTL_MINUTES: float = CONFIG["issue_cache_ttl_minutes"]
+
+# История результатов аддонов: сырые точки, затем по часам, затем по дням
+PATH_HISTORY: Path = DIR / "history.sqlite"
+HISTORY_RAW_DAYS: float = CONFIG["history_raw_days"]
+HISTORY_HOURLY_DAYS: float = CONFIG["history_hourly_days"]
+HISTORY_RETENTION_DAYS: float = CONFIG["history_retention_days"]
+
+# Снимки последних результатов для показа при запуске, до первого обновления
+PATH_SNAPSHOTS: Path = DIR / "snapshots"
+WARM_START: bool = CONFIG["warm_start"]
+
+# Общий шлюз запросов для экземпляров приложения на одном хосте (python cli.py gateway)
+GATEWAY_SOCKET: str | None = CONFIG["gateway_socket"]
+GATEWAY_CACHE_SECONDS: float = CONFIG["gateway_cache_seconds"]
+GATEWAY_CACHE_MAX_MB: int = CONFIG["gateway_cache_max_mb"]
+GATEWAY_REQUESTS_PER_SECOND: float = CONFIG["gateway_requests_per_second"]
+
+# Транспорт запросов: "http1" (requests) или "http2" (httpx, нужны httpx и h2)
+HTTP_TRANSPORT: str = CONFIG["http_transport"]
+
+# Возобновление сессий TLS в новых соединениях и прогрев соединений перед авто-обновлением
+TLS_SESSION_REUSE: bool = CONFIG["tls_session_reuse"]
+PREWARM_SECONDS: int = CONFIG["prewarm_seconds"]
 
 PATH_CERT = DIR / NAME_CERT
 if not PATH_CERT.exists():
     raise Exception(f"Файл {PATH_CERT} не найден!")
+
+# Имена пользователей, полученные из API, по отпечатку сертификата
+PATH_USERNAMES: Path = DIR / "usernames.json"
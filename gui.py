@@ -4,16 +4,20 @@
 __author__ = "ipetrash"
 
 
+# NOTE: Должен импортироваться первым, чтобы учесть время импорта остальных модулей
+import startup_profiler
+
 import io
 import json
-import multiprocessing as mp
 import sys
+import time
 import traceback
 import textwrap
 
-from contextlib import redirect_stdout
+from contextlib import nullcontext, redirect_stdout
+from dataclasses import dataclass
 from datetime import datetime, date
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
 from PyQt6.QtCore import (
     QEvent,
@@ -22,7 +26,7 @@ from PyQt6.QtCore import (
     Qt,
     QTranslator,
     QLibraryInfo,
-    QEventLoop,
+    pyqtSignal,
 )
 from PyQt6.QtGui import QIcon, QCloseEvent
 from PyQt6.QtWidgets import (
@@ -39,22 +43,30 @@ from PyQt6.QtWidgets import (
     QTabWidget,
     QDockWidget,
     QMenu,
+    QFileDialog,
 )
 
 import api
 from api import (
-    RunFuncThread,
     get_human_datetime,
     get_human_date,
     get_ago,
 )
-from api.jira import get_jira_current_username
+from api import cancellation, connections, jira_rss_parallel, metrics
+from api.jira import USERNAME_CACHE
+from api.jira_issues import ISSUE_INFO_CACHE
+from api.jira_worklog import get_worklog_activities
+from api.polling import PollingPolicy
+from api.history import HISTORY
+from api.snapshots import SNAPSHOTS, Snapshot
+from api.tracing import TRACER, traced
+from api.aggregation import LoggedByDay, get_logged_by_day
 from api.jira_rss import (
     Activity,
+    FeedChangeProbe,
+    get_last_logged_activity,
     get_rss_jira_log,
     seconds_to_str,
-    parse_date_by_activities,
-    get_logged_total_seconds,
 )
 from config import (
     PROGRAM_NAME,
@@ -63,14 +75,23 @@ from config import (
     PATH_CONFIG,
     CONFIG,
     USERNAME,
+    METRICS_PORT,
+    LOGGED_SOURCE,
+    ISSUE_COLUMNS,
+    WARM_START,
+    GATEWAY_SOCKET,
+    PREWARM_SECONDS,
 )
 from version import VERSION
+from widgets import RunFuncThread, RefreshCoordinator
 from widgets.addons import Defaults, AddonDockWidget, import_all_addons
 from widgets.about import About
 from widgets.activities_widget import ActivitiesWidget
 from widgets.logged_widget import LoggedWidget
 from widgets.logs_widget import LogsWidget
 
+startup_profiler.mark("imports")
+
 MAIN_WINDOW: Optional["MainWindow"] = None
 
 
@@ -86,6 +107,8 @@ def log_uncaught_exceptions(ex_cls, ex, tb) -> None:
     if isinstance(ex, KeyboardInterrupt):
         if MAIN_WINDOW:
             MAIN_WINDOW.write_settings()
+            SNAPSHOTS.flush()
+            HISTORY.flush()
             QApplication.instance().quit()
 
         sys.exit()
@@ -113,6 +136,19 @@ TEMPLATE_WINDOW_TITLE_WITH_REFRESH: str = (
     f"{TEMPLATE_WINDOW_TITLE_WITH_USERNAME}. Последнее обновление: {{dt}} ({{ago}})"
 )
 
+SNAPSHOT_NAME_TABLES: str = "tables"
+
+# Результат _get_data, когда в RSS нет новых записей и таблицы не меняются
+UNCHANGED: object = object()
+
+
+@dataclass(frozen=True, slots=True)
+class FeedData:
+    """RSS, разобранный в потоке обновления"""
+
+    xml_data: bytes
+    date_by_activities: dict[date, list[Activity]]
+
 
 def from_base64(state: str) -> QByteArray:
     return QByteArray.fromBase64(state.encode("utf-8"))
@@ -154,6 +190,9 @@ def write_settings_children(widget, config: dict[str, Any]) -> None:
 
 
 class MainWindow(QMainWindow):
+    # NOTE: Сигнал отправляется из потока обновления, когда имя пользователя определено
+    about_username = pyqtSignal(str)
+
     def __init__(self) -> None:
         super().__init__()
 
@@ -196,28 +235,85 @@ class MainWindow(QMainWindow):
         self.progress_refresh.setTextVisible(False)
         self.progress_refresh.hide()
 
+        # Интервал авто-обновления выбирается после каждого обновления
+        self.polling_policy = PollingPolicy()
+        self._last_logged_activity_id: str | None = None
+        self._has_new_logged: bool = False
+
         self.timer_auto_refresh = QTimer()
-        self.timer_auto_refresh.setInterval(60 * 60 * 1000)  # 1 hour
-        self.timer_auto_refresh.timeout.connect(self.refresh)
+        self.timer_auto_refresh.setSingleShot(True)
+        self.timer_auto_refresh.timeout.connect(self._on_auto_refresh)
+
+        # Соединения открываются заранее, чтобы авто-обновление не ждало рукопожатий TLS
+        self.timer_prewarm = QTimer()
+        self.timer_prewarm.setSingleShot(True)
+        self.timer_prewarm.timeout.connect(self._on_prewarm)
+
+        self.thread_prewarm = RunFuncThread(func=api.prewarm)
+        self.thread_prewarm.about_error.connect(self._set_error_log)
+        self.thread_prewarm.run_finished.connect(self._prewarm_finished)
+
+        # Пока пользователь отошел или сессия заблокирована, авто-обновление ждет его возвращения
+        self.timer_check_user_away = QTimer()
+        self.timer_check_user_away.setInterval(60 * 1000)  # 1 minute
+        self.timer_check_user_away.timeout.connect(self._check_user_away)
+
+        # NOTE: Проверка активности запускает xprintidle и loginctl, поэтому выполняется
+        #       в отдельном потоке, а результат передается в функцию, которая ее запросила
+        self.thread_user_away = RunFuncThread(func=self.polling_policy.is_user_away)
+        self.thread_user_away.run_finished.connect(self._on_user_away_checked)
+        self._on_user_away: Callable[[bool], None] | None = None
 
         self.timer_update_states = QTimer()
         self.timer_update_states.setInterval(5 * 1000)  # 5 seconds
         self.timer_update_states.timeout.connect(self._update_states)
 
-        self.username: str | None = USERNAME
+        # Без имени в конфиге используется имя, ранее полученное для этого сертификата.
+        # Иначе оно будет получено из API в потоке обновления, перед запросом RSS
+        self.username: str | None = USERNAME or USERNAME_CACHE.get_cached()
+        self.about_username.connect(self._set_username)
         self._last_refresh_is_forced: bool = False
         self._skip_get_data: bool = False
 
-        self.thread_get_data = RunFuncThread(func=self._get_data)
+        # Перед полным запросом RSS проверяется, появились ли новые записи
+        self.feed_change_probe = FeedChangeProbe()
+
+        self._refresh_started: float | None = None
+        self._refresh_handshake_stats: connections.HandshakeStats | None = None
+        self._prewarm_handshake_stats = connections.HandshakeStats()
+        self._refresh_is_failed: bool = False
+
+        # Время снимка, если в таблицах данные из него, а не полученные при обновлении
+        self._snapshot_datetime: datetime | None = None
+
+        # Повторное обновление во время выполнения присоединяется к нему или
+        # (при ручном обновлении) отменяет его и запускается заново
+        self.thread_get_data = RefreshCoordinator(func=self._get_data)
         self.thread_get_data.started.connect(self._before_refresh)
         self.thread_get_data.about_error.connect(self._set_error_log)
+        self.thread_get_data.about_error.connect(self._set_refresh_is_failed)
         self.thread_get_data.run_finished.connect(self._fill_tables)
         self.thread_get_data.finished.connect(self._after_refresh)
 
+        # Поля задач для дополнительных колонок запрашиваются после заполнения таблиц
+        self._issue_keys: list[str] = []
+        self.thread_issue_infos = RunFuncThread(func=self._get_issue_infos)
+        self.thread_issue_infos.about_error.connect(self._set_error_log)
+        self.thread_issue_infos.run_finished.connect(self._update_issue_columns)
+        self.thread_issue_infos.finished.connect(self._start_pending_issue_infos)
+
+        # Ключи задач последнего обновления, пока выполняется запрос полей предыдущего
+        self._pending_issue_keys: list[str] | None = None
+
         self.logged_widget = LoggedWidget()
         self.activities_widget = ActivitiesWidget()
 
         self.menu_file = self.menuBar().addMenu("&Файл")
+        self.menu_file.addAction(
+            "Экспорт &трассировки (Chrome trace)...",
+            self._export_trace,
+        )
+        self.menu_file.addSeparator()
         action_exit = self.menu_file.addAction("&Выйти")
         action_exit.triggered.connect(self.close)
 
@@ -230,14 +326,19 @@ class MainWindow(QMainWindow):
 
         menu_addons = menu_view.addMenu("&Аддоны")
         self.addons: list[AddonDockWidget] = import_all_addons()
+        startup_profiler.mark("import_all_addons")
         for addon_dock in self.addons:
-            addon_dock.addon.set_context(self)
+            addon_dock.set_context(self)
 
-            defaults: Defaults = addon_dock.addon.defaults()
+            defaults: Defaults = addon_dock.defaults()
 
             self.addDockWidget(defaults.area, addon_dock)
             menu_addons.addAction(addon_dock.toggleViewAction())
 
+            # NOTE: Не загруженные аддоны загрузятся при первом показе, поэтому
+            #       до чтения настроек видимыми будут только видимые по-умолчанию
+            addon_dock.setVisible(defaults.is_visible)
+
         self.menu_help = self.menuBar().addMenu("&Помощь")
 
         self.about = About(self)
@@ -281,12 +382,85 @@ class MainWindow(QMainWindow):
         # Запуск таймера обновления состояния после инициализации GUI
         self.timer_update_states.start()
 
-    # Функция вызывается в отдельном потоке RunFuncThread
-    def _get_data(self) -> bytes | None:
+    # Функция вызывается в отдельном потоке RefreshCoordinator
+    def _get_data(self) -> FeedData | dict[date, list[Activity]] | object | None:
         if self._skip_get_data:
             return
 
-        return get_rss_jira_log(self.username)
+        username: str | None = self.username
+        if not username:
+            # NOTE: Аддоны к этому моменту уже обновляются, имя им не нужно
+            username = USERNAME_CACHE.resolve()
+            cancellation.check()
+            self.about_username.emit(username)
+
+        # Ворклоги не требуют проверки RSS: повторно запрашиваются только измененные задачи
+        if LOGGED_SOURCE == "worklog":
+            return get_worklog_activities(username)
+
+        # Ручное обновление всегда запрашивает RSS полностью
+        if not self._last_refresh_is_forced and not self.feed_change_probe.is_changed(
+            username
+        ):
+            # Отмененное обновление не должно менять состояние нового
+            cancellation.check()
+            return UNCHANGED
+
+        xml_data: bytes = get_rss_jira_log(username)
+        cancellation.check()
+
+        # NOTE: Большой RSS разбирается в пуле процессов jira_rss_parallel.PARSE_POOL
+        date_by_activities: dict[date, list[Activity]] = (
+            jira_rss_parallel.parse_date_by_activities_parallel([xml_data])
+        )
+        cancellation.check()
+
+        self.feed_change_probe.update(username, xml_data)
+        return FeedData(xml_data=xml_data, date_by_activities=date_by_activities)
+
+    # Функция вызывается в отдельном потоке RunFuncThread
+    def _get_issue_infos(self) -> int:
+        return ISSUE_INFO_CACHE.update(self._issue_keys, ISSUE_COLUMNS)
+
+    def _update_issue_columns(self, requests: int) -> None:
+        if requests:
+            self.logs.append(
+                f"Поля {len(self._issue_keys)} задач получены за {requests} запрос(а/ов)"
+            )
+
+        self.logged_widget.update_issue_columns()
+        self.activities_widget.update_issue_columns()
+
+    def _start_get_issue_infos(
+        self, date_by_activities: dict[date, list[Activity]]
+    ) -> None:
+        if not ISSUE_COLUMNS:
+            return
+
+        issue_keys: list[str] = sorted(
+            {
+                activity.jira_id
+                for activities in date_by_activities.values()
+                for activity in activities
+                if activity.jira_id
+            }
+        )
+
+        # Запрос будет выполнен после текущего, только для последних ключей
+        if self.thread_issue_infos.isRunning():
+            self._pending_issue_keys = issue_keys
+            return
+
+        self._issue_keys = issue_keys
+        self.thread_issue_infos.start()
+
+    def _start_pending_issue_infos(self) -> None:
+        if self._pending_issue_keys is None:
+            return
+
+        self._issue_keys = self._pending_issue_keys
+        self._pending_issue_keys = None
+        self.thread_issue_infos.start()
 
     def _tray_set_tool_tip(self, text: str) -> None:
         self.tray.setToolTip(textwrap.fill(text))
@@ -307,31 +481,97 @@ class MainWindow(QMainWindow):
                 username=username,
             )
 
+        if self._snapshot_datetime:
+            title += " [данные из снимка]"
+
         self.setWindowTitle(title)
 
+    def _set_username(self, username: str) -> None:
+        if username == self.username:
+            return
+
+        self.username = username
+        self.logs.append(f"Имя пользователя получено из API: {username}")
+        self._update_window_title()
+
     def _set_error_log(self, e: Exception) -> None:
         self.logs.append_exception(e)
 
-    def _fill_tables(self, xml_data: bytes | None) -> None:
-        if not xml_data:
+    def _set_refresh_is_failed(self) -> None:
+        self._refresh_is_failed = True
+
+    def _export_trace(self) -> None:
+        file_name, _ = QFileDialog.getSaveFileName(
+            self,
+            "Экспорт трассировки",
+            f"trace_{datetime.now():%Y-%m-%d_%H%M%S}.json",
+            "Chrome trace (*.json)",
+        )
+        if not file_name:
+            return
+
+        try:
+            number: int = TRACER.export_chrome_trace(file_name)
+            self.logs.append(
+                f"Трассировка ({number} событий) сохранена в {file_name}. "
+                "Ее можно открыть в chrome://tracing или https://ui.perfetto.dev"
+            )
+        except Exception as e:
+            self.logs.append_error(f"Ошибка при сохранении трассировки: {e}")
+
+    @traced()
+    def _fill_tables(
+        self, data: FeedData | dict[date, list[Activity]] | object | None
+    ) -> None:
+        if data is UNCHANGED:
+            self.logs.append("Новых записей в RSS нет, таблицы не изменились")
+            return
+
+        if not data:
             return
 
         buffer_io = io.StringIO()
         try:
             with redirect_stdout(buffer_io):
-                print(
-                    f"Xml data ({len(xml_data)} bytes):\n"
-                    f"{xml_data[:150] + b'...' if len(xml_data) > 150 else xml_data!r}"
-                )
-
-                date_by_activities: dict[date, list[Activity]] = (
-                    parse_date_by_activities(xml_data)
-                )
+                if isinstance(data, dict):
+                    print(
+                        f"Worklogs ({sum(map(len, data.values()))} activities)"
+                    )
+                    date_by_activities: dict[date, list[Activity]] = data
+                else:
+                    xml_data: bytes = data.xml_data
+                    print(
+                        f"Xml data ({len(xml_data)} bytes):\n"
+                        f"{xml_data[:150] + b'...' if len(xml_data) > 150 else xml_data!r}"
+                    )
+                    date_by_activities: dict[date, list[Activity]] = (
+                        data.date_by_activities
+                    )
                 if not date_by_activities:
                     return
 
-                self.logged_widget.set_date_by_activities(date_by_activities)
-                self.activities_widget.set_date_by_activities(date_by_activities)
+                last_logged_id: str | None = self._get_last_logged_activity_id(
+                    date_by_activities
+                )
+                self._has_new_logged = (
+                    self._last_logged_activity_id is not None
+                    and last_logged_id != self._last_logged_activity_id
+                )
+                self._last_logged_activity_id = last_logged_id
+
+                logged_by_day: list[LoggedByDay] = self._set_date_by_activities(
+                    date_by_activities
+                )
+                self._start_get_issue_infos(date_by_activities)
+
+                self._snapshot_datetime = None
+                SNAPSHOTS.put(
+                    SNAPSHOT_NAME_TABLES,
+                    {
+                        "username": self.username,
+                        "date_by_activities": dict(date_by_activities),
+                    },
+                )
 
                 # Для красоты выводим результат в табличном виде
                 table_header: tuple = (
@@ -342,21 +582,13 @@ class MainWindow(QMainWindow):
                 )
                 table_lines: list[tuple[str, str, int, int]] = []
 
-                for entry_date, activities in sorted(
-                    date_by_activities.items(), key=lambda x: x[0], reverse=True
-                ):
-                    activities_number = len(activities)
-
-                    activities: list[Activity] = [
-                        obj for obj in reversed(activities) if obj.logged
-                    ]
-
-                    total_seconds: int = get_logged_total_seconds(activities)
+                for obj in logged_by_day:
+                    total_seconds: int = obj.logged_seconds
                     total_seconds_str: str = seconds_to_str(total_seconds)
 
-                    date_str: str = get_human_date(entry_date)
+                    date_str: str = get_human_date(obj.date)
                     table_lines.append(
-                        (date_str, total_seconds_str, total_seconds, activities_number)
+                        (date_str, total_seconds_str, total_seconds, obj.activities)
                     )
 
                 print()
@@ -378,15 +610,81 @@ class MainWindow(QMainWindow):
 
             print(text)
 
+    @staticmethod
+    def _get_last_logged_activity_id(
+        date_by_activities: dict[date, list[Activity]],
+    ) -> str | None:
+        last_logged: Activity | None = get_last_logged_activity(date_by_activities)
+        return last_logged.id if last_logged else None
+
+    def _set_date_by_activities(
+        self, date_by_activities: dict[date, list[Activity]]
+    ) -> list[LoggedByDay]:
+        # Суммы по дням считаются один раз и используются всеми таблицами
+        logged_by_day: list[LoggedByDay] = get_logged_by_day(date_by_activities)
+
+        self.logged_widget.set_date_by_activities(date_by_activities, logged_by_day)
+        self.activities_widget.set_date_by_activities(
+            date_by_activities, logged_by_day
+        )
+
+        return logged_by_day
+
+    def load_snapshots(self) -> None:
+        """Показ последних полученных данных таблиц и аддонов из снимков, без запросов"""
+
+        if not WARM_START:
+            return
+
+        snapshot: Snapshot | None = SNAPSHOTS.get(SNAPSHOT_NAME_TABLES)
+        if (
+            snapshot
+            and self.username
+            and snapshot.data.get("username") == self.username
+        ):
+            date_by_activities: dict[date, list[Activity]] = snapshot.data[
+                "date_by_activities"
+            ]
+            self._last_logged_activity_id = self._get_last_logged_activity_id(
+                date_by_activities
+            )
+            self._set_date_by_activities(date_by_activities)
+
+            self._snapshot_datetime = snapshot.dt
+            self._last_refresh_datetime = snapshot.dt
+            self.logs.append(
+                f"Показаны данные из снимка от {get_human_datetime(snapshot.dt)} "
+                f"({get_ago(snapshot.dt)})"
+            )
+
+        for addon_dock in self.addons:
+            if addon_dock.is_active() and (
+                addon_dock.is_auto_refresh() or addon_dock.isVisible()
+            ):
+                addon_dock.load_snapshot()
+
+        self._update_states()
+
     def _block_ui(self, block: bool) -> None:
-        self.button_refresh.setEnabled(not block)
+        # NOTE: Кнопка не блокируется: повторное нажатие перезапускает обновление
+        self.button_refresh.setToolTip(
+            "Обновить заново (текущее обновление будет отменено)" if block else "Обновить"
+        )
         self.progress_refresh.setVisible(block)
 
     def _before_refresh(self) -> None:
         self._block_ui(True)
 
+        self._refresh_started = time.perf_counter()
+        self._refresh_handshake_stats = connections.get_stats()
+        self._refresh_is_failed = False
+        self._has_new_logged = False
+
+        if not self._skip_get_data:
+            self.polling_policy.register_request()
+
         for addon_dock in self.addons:
-            if addon_dock.addon.is_active and addon_dock.is_auto_refresh():
+            if addon_dock.is_active() and addon_dock.is_auto_refresh():
                 addon_dock.refresh()
 
     def _update_states(self) -> None:
@@ -401,64 +699,148 @@ class MainWindow(QMainWindow):
     def _after_refresh(self) -> None:
         self._block_ui(False)
 
-        self._last_refresh_datetime = datetime.now()
+        if self._refresh_started is not None:
+            metrics.REFRESH_DURATION.observe(
+                time.perf_counter() - self._refresh_started,
+                status="error" if self._refresh_is_failed else "ok",
+            )
+            self._refresh_started = None
+
+        # NOTE: Замер запуска завершается после первого обновления
+        startup_profiler.mark("first_refresh")
+        startup_profiler.finish()
+
+        # Если данные не были получены, то в таблицах остаются данные из снимка
+        self._last_refresh_datetime = self._snapshot_datetime or datetime.now()
+
+        if self._refresh_handshake_stats is not None:
+            handshake_stats: connections.HandshakeStats = (
+                connections.get_stats() - self._refresh_handshake_stats
+            )
+            if handshake_stats.number:
+                self.logs.append(f"Рукопожатий TLS при обновлении: {handshake_stats}")
+            self._refresh_handshake_stats = None
 
         self._update_states()
+        self._schedule_auto_refresh()
 
         try:
             self.write_settings()
         except Exception as e:
             self.logs.append_error(f"Ошибка при сохранении конфига: {e}")
 
-    def refresh(self) -> None:
-        if not self.timer_auto_refresh.isActive():
-            self.timer_auto_refresh.start()
+    def _schedule_auto_refresh(self) -> None:
+        interval: int = self.polling_policy.next_interval(changed=self._has_new_logged)
+        self.timer_auto_refresh.start(interval * 1000)
 
-        # У пустого blockCount = 1
-        if self.logs.logs.blockCount() > 1:
-            self.logs.append("")
+        if PREWARM_SECONDS and interval > PREWARM_SECONDS:
+            self.timer_prewarm.start((interval - PREWARM_SECONDS) * 1000)
 
-        self.logs.append(f"Обновление в {get_human_datetime()}")
+        text: str = f"Следующее авто-обновление через {seconds_to_str(interval)}"
+        if self._has_new_logged:
+            text += " (есть новое залогированное время)"
+        self.logs.append(text)
 
-        if not self.username:
-            loop = QEventLoop()
+    def _start_check_user_away(self, on_result: Callable[[bool], None]) -> None:
+        # Если проверка уже выполняется, ее результат получит последний запросивший
+        self._on_user_away = on_result
+        if not self.thread_user_away.isRunning():
+            self.thread_user_away.start()
 
-            def _on_started() -> None:
-                self._block_ui(True)
-                self.logs.append("Имя пользователя не задано. Выполнение запроса к API")
+    def _on_user_away_checked(self, is_away: bool) -> None:
+        on_result: Callable[[bool], None] | None = self._on_user_away
+        self._on_user_away = None
+        if on_result:
+            on_result(is_away)
 
-            def _on_finished() -> None:
-                self._block_ui(False)
-                loop.quit()
+    def _on_prewarm(self) -> None:
+        self._start_check_user_away(self._do_prewarm)
 
-            def _set_username(value: str) -> None:
-                self.username = value
+    def _do_prewarm(self, is_user_away: bool) -> None:
+        # Обновление при неактивном пользователе не выполняется
+        if is_user_away or self.thread_prewarm.isRunning():
+            return
 
-                # Сохранение в конфиге, чтобы при следующем запуске не запрашивать его
-                CONFIG["username"] = self.username
+        self._prewarm_handshake_stats = connections.get_stats()
+        self.thread_prewarm.start()
 
-            thread = RunFuncThread(func=get_jira_current_username)
-            thread.started.connect(_on_started)
-            thread.run_finished.connect(_set_username)
-            thread.about_error.connect(self._set_error_log)
-            thread.finished.connect(_on_finished)
-            thread.start()
+    def _prewarm_finished(self, number: int) -> None:
+        handshake_stats: connections.HandshakeStats = (
+            connections.get_stats() - self._prewarm_handshake_stats
+        )
+        self.logs.append(
+            f"Прогрев соединений перед авто-обновлением: запросов {number}, "
+            f"рукопожатий TLS {handshake_stats}"
+        )
 
-            loop.exec()
+    def _on_auto_refresh(self) -> None:
+        self._start_check_user_away(self._do_auto_refresh)
 
-        self._update_window_title()
+    def _do_auto_refresh(self, is_user_away: bool) -> None:
+        if is_user_away:
+            self.logs.append(
+                "Пользователь неактивен или сессия заблокирована. "
+                "Авто-обновление приостановлено"
+            )
+            self.timer_check_user_away.start()
+            return
+
+        self.refresh()
 
-        self._last_refresh_is_forced = (
+    def _check_user_away(self) -> None:
+        self._start_check_user_away(self._do_check_user_away)
+
+    def _do_check_user_away(self, is_user_away: bool) -> None:
+        if is_user_away:
+            return
+
+        self.timer_check_user_away.stop()
+        self.logs.append("Пользователь вернулся. Авто-обновление возобновлено")
+        self.refresh()
+
+    def refresh(self) -> None:
+        is_forced: bool = (
             # Не ручной вызов метода
             self.sender() is not None
-            and self.sender() != self.timer_auto_refresh
+            and self.sender()
+            not in (
+                self.timer_auto_refresh,
+                self.timer_check_user_away,
+                self.thread_user_away,
+            )
         )
 
+        self.timer_auto_refresh.stop()
+        self.timer_prewarm.stop()
+        self.timer_check_user_away.stop()
+
+        # Результат выполняющейся проверки активности больше не нужен
+        self._on_user_away = None
+
+        # Авто-обновление присоединяется к выполняющемуся обновлению, после
+        # его завершения будет запланировано следующее
+        if self.thread_get_data.isRunning() and not is_forced:
+            self.logs.append("Обновление уже выполняется")
+            return
+
+        # У пустого blockCount = 1
+        if self.logs.logs.blockCount() > 1:
+            self.logs.append("")
+
+        self.logs.append(f"Обновление в {get_human_datetime()}")
+
+        self._update_window_title()
+
+        # Результат отмененного обновления будет отброшен, даже если он уже получен
+        if self.thread_get_data.isRunning():
+            self.logs.append("Предыдущее обновление отменено, запуск заново")
+
+        self._last_refresh_is_forced = is_forced
+
         self._skip_get_data = False
 
         if not self.username:
-            self.logs.append("Имя пользователя не задано. Запрос RSS не будет выполнен")
-            self._skip_get_data = True
+            self.logs.append("Имя пользователя не задано. Оно будет получено из API")
 
         # Если обновление не было вызвано напрямую и не стоит флаг авто-обновления
         if (
@@ -470,7 +852,7 @@ class MainWindow(QMainWindow):
             )
             self._skip_get_data = True
 
-        self.thread_get_data.start()
+        self.thread_get_data.start(restart=True)
 
     def read_settings(self) -> None:
         config_gui: dict[str, Any] = CONFIG.get("gui")
@@ -504,7 +886,7 @@ class MainWindow(QMainWindow):
             config_addons = dict()
 
         for addon_dock in self.addons:
-            name: str = addon_dock.addon.name
+            name: str = addon_dock.name
             settings: dict[str, Any] | None = config_addons.get(name)
             addon_dock.read_settings(settings)
 
@@ -532,7 +914,7 @@ class MainWindow(QMainWindow):
             for addon_dock in self.addons:
                 settings: dict[str, Any] = dict()
                 addon_dock.write_settings(settings)
-                addons[addon_dock.addon.name] = settings
+                addons[addon_dock.name] = settings
 
             config_gui["Addons"] = addons
 
@@ -584,13 +966,26 @@ class MainWindow(QMainWindow):
             self._quit_dont_ask_again = cb_dont_ask_again.isChecked()
 
         self.write_settings()
+        SNAPSHOTS.flush()
+        HISTORY.flush()
 
         QApplication.instance().quit()
 
 
 if __name__ == "__main__":
-    with mp.Pool(processes=5) as pool:
+    # NOTE: Со шлюзом запросы выполняет он, поэтому свой пул процессов не нужен
+    with (
+        nullcontext() if GATEWAY_SOCKET else api.create_pool() as pool,
+        jira_rss_parallel.create_parse_pool() as parse_pool,
+    ):
         api.POOL = pool
+        jira_rss_parallel.PARSE_POOL = parse_pool
+        api.GATEWAY_SOCKET = GATEWAY_SOCKET
+        startup_profiler.mark("pool")
+
+        if METRICS_PORT:
+            metrics.start_http_server(METRICS_PORT)
+            print(f"Метрики доступны по адресу http://127.0.0.1:{METRICS_PORT}/metrics")
 
         app = QApplication(sys.argv)
         app.setQuitOnLastWindowClosed(False)
@@ -605,8 +1000,11 @@ if __name__ == "__main__":
         if not app.styleSheet():
             app.setStyleSheet(f"file:///{PATH_STYLE_SHEET}")
 
+        startup_profiler.mark("app")
+
         mw = MainWindow()
         MAIN_WINDOW = mw
+        startup_profiler.mark("main_window")
 
         # NOTE: Аддоны могут переписать sys.excepthook, например, как тетрис
         #       при импорте, поэтому лучше снова свою функцию записать
@@ -616,8 +1014,14 @@ if __name__ == "__main__":
 
         mw.resize(1200, 800)
         mw.show()
+        startup_profiler.mark("show")
 
         mw.read_settings()
+        startup_profiler.mark("read_settings")
+
+        mw.load_snapshots()
+        startup_profiler.mark("load_snapshots")
+
         mw.refresh()
 
         sys.exit(app.exec())
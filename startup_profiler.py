@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "ipetrash"
+
+
+# Замер времени запуска приложения: время импорта каждого модуля (аналог "-X importtime")
+# и время этапов до показа окна и завершения первого обновления.
+#
+# Включается переменной окружения PARSE_JIRA_PROFILE_STARTUP (значение - путь к файлу отчета)
+# или аргументом запуска --profile-startup[=<путь к файлу отчета>].
+#
+# NOTE: Модуль должен импортироваться первым, поэтому не зависит от остальных модулей проекта
+
+
+import importlib.abc
+import json
+import multiprocessing as mp
+import os
+import sys
+import time
+
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+
+ENV_NAME: str = "PARSE_JIRA_PROFILE_STARTUP"
+ARG_NAME: str = "--profile-startup"
+
+DEFAULT_PATH_REPORT: Path = Path(__file__).resolve().parent / "startup_report.json"
+
+
+@dataclass
+class ImportRecord:
+    name: str
+    depth: int
+    self_ms: float
+    cumulative_ms: float
+
+
+@dataclass
+class PhaseRecord:
+    name: str
+    # Время от начала замера
+    at_ms: float
+    # Время от предыдущего этапа
+    duration_ms: float
+
+
+@dataclass
+class StartupReport:
+    imports: list[ImportRecord] = field(default_factory=list)
+    phases: list[PhaseRecord] = field(default_factory=list)
+
+    @property
+    def total_import_ms(self) -> float:
+        return sum(obj.cumulative_ms for obj in self.imports if obj.depth == 0)
+
+    def get_phase(self, name: str) -> PhaseRecord | None:
+        for phase in self.phases:
+            if phase.name == name:
+                return phase
+
+    def get_top_imports(self, number: int = 20) -> list[ImportRecord]:
+        return sorted(self.imports, key=lambda x: x.cumulative_ms, reverse=True)[
+            :number
+        ]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "total_import_ms": self.total_import_ms,
+            "phases": [asdict(obj) for obj in self.phases],
+            "imports": [asdict(obj) for obj in self.imports],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "StartupReport":
+        return cls(
+            imports=[ImportRecord(**obj) for obj in data["imports"]],
+            phases=[PhaseRecord(**obj) for obj in data["phases"]],
+        )
+
+
+class _TimedLoader:
+    def __init__(self, loader, profiler: "StartupProfiler") -> None:
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._loader, name)
+
+    def create_module(self, spec) -> ModuleType | None:
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module: ModuleType) -> None:
+        self._profiler._import_started()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._import_finished(module.__name__)
+
+
+class _ImportTimeFinder(importlib.abc.MetaPathFinder):
+    def __init__(self, profiler: "StartupProfiler") -> None:
+        self._profiler = profiler
+
+    def find_spec(self, fullname: str, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self:
+                continue
+
+            find_spec = getattr(finder, "find_spec", None)
+            if not find_spec:
+                continue
+
+            spec = find_spec(fullname, path, target)
+            if spec is None:
+                continue
+
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(spec.loader, self._profiler)
+
+            return spec
+
+        return None
+
+
+class StartupProfiler:
+    def __init__(self, path_report: Path) -> None:
+        self.path_report = path_report
+        self.report = StartupReport()
+
+        self._started: float = time.perf_counter()
+        self._last_phase: float = self._started
+
+        # Стек вложенных импортов: [время начала, суммарное время дочерних]
+        self._import_stack: list[list[float]] = []
+        self._finder = _ImportTimeFinder(self)
+
+    def install(self) -> None:
+        sys.meta_path.insert(0, self._finder)
+
+    def uninstall(self) -> None:
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+
+    def _import_started(self) -> None:
+        self._import_stack.append([time.perf_counter(), 0.0])
+
+    def _import_finished(self, name: str) -> None:
+        started, children = self._import_stack.pop()
+        cumulative: float = time.perf_counter() - started
+        if self._import_stack:
+            self._import_stack[-1][1] += cumulative
+
+        self.report.imports.append(
+            ImportRecord(
+                name=name,
+                depth=len(self._import_stack),
+                self_ms=(cumulative - children) * 1000,
+                cumulative_ms=cumulative * 1000,
+            )
+        )
+
+    def mark(self, name: str) -> None:
+        now: float = time.perf_counter()
+        self.report.phases.append(
+            PhaseRecord(
+                name=name,
+                at_ms=(now - self._started) * 1000,
+                duration_ms=(now - self._last_phase) * 1000,
+            )
+        )
+        self._last_phase = now
+
+    def finish(self) -> None:
+        self.uninstall()
+
+        self.path_report.write_text(
+            json.dumps(self.report.to_dict(), indent=4, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        print(get_report_as_str(self.report))
+        print(f"Отчет о запуске сохранен в {self.path_report}")
+
+
+def get_report_as_str(report: StartupReport, top_imports: int = 20) -> str:
+    lines: list[str] = ["ЭТАП | С НАЧАЛА, МС | ДЛИТЕЛЬНОСТЬ, МС"]
+    for phase in report.phases:
+        lines.append(f"{phase.name} | {phase.at_ms:.1f} | {phase.duration_ms:.1f}")
+
+    lines.append("")
+    lines.append(f"Импорт модулей, всего: {report.total_import_ms:.1f} мс")
+    lines.append("МОДУЛЬ | СВОЕ, МС | ОБЩЕЕ, МС")
+    for obj in report.get_top_imports(top_imports):
+        lines.append(f"{obj.name} | {obj.self_ms:.1f} | {obj.cumulative_ms:.1f}")
+
+    return "\n".join(lines)
+
+
+def check_budget(report: StartupReport, budget: dict[str, float]) -> list[str]:
+    """Проверка отчета на превышение бюджета.
+
+    Ключи бюджета - имена этапов (время с начала замера) или "total_import_ms",
+    значения - максимальное время в миллисекундах.
+    Возвращает список описаний превышений.
+    """
+
+    errors: list[str] = []
+    for name, max_ms in budget.items():
+        if name == "total_import_ms":
+            actual_ms: float | None = report.total_import_ms
+        else:
+            phase: PhaseRecord | None = report.get_phase(name)
+            actual_ms = phase.at_ms if phase else None
+
+        if actual_ms is None:
+            errors.append(f"{name}: этап отсутствует в отчете")
+        elif actual_ms > max_ms:
+            errors.append(f"{name}: {actual_ms:.1f} мс > {max_ms:.1f} мс")
+
+    return errors
+
+
+def _get_path_report() -> Path | None:
+    for arg in list(sys.argv[1:]):
+        if arg == ARG_NAME or arg.startswith(f"{ARG_NAME}="):
+            # Чтобы аргумент не попал в QApplication
+            sys.argv.remove(arg)
+
+            _, _, value = arg.partition("=")
+            return Path(value) if value else DEFAULT_PATH_REPORT
+
+    if value := os.environ.get(ENV_NAME):
+        return Path(value)
+
+
+PROFILER: StartupProfiler | None = None
+
+
+def start() -> None:
+    global PROFILER
+
+    # NOTE: Дочерние процессы пула тоже импортируют модули приложения
+    if PROFILER or __name__ == "__main__" or mp.parent_process() is not None:
+        return
+
+    path_report: Path | None = _get_path_report()
+    if not path_report:
+        return
+
+    PROFILER = StartupProfiler(path_report)
+    PROFILER.install()
+
+
+def mark(name: str) -> None:
+    if PROFILER:
+        PROFILER.mark(name)
+
+
+def finish() -> None:
+    global PROFILER
+
+    if not PROFILER:
+        return
+
+    PROFILER.finish()
+    PROFILER = None
+
+
+# NOTE: Замер начинается при импорте, чтобы учесть импорты остальных модулей
+start()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Вывод отчета о запуске и проверка бюджета времени"
+    )
+    parser.add_argument("report", type=Path, help="Путь к файлу отчета")
+    parser.add_argument(
+        "--budget",
+        type=Path,
+        help='Путь к JSON с бюджетом, например: {"show": 3000, "first_refresh": 10000}',
+    )
+    args = parser.parse_args()
+
+    report = StartupReport.from_dict(json.loads(args.report.read_text("utf-8")))
+    print(get_report_as_str(report))
+
+    if args.budget:
+        errors: list[str] = check_budget(
+            report,
+            budget=json.loads(args.budget.read_text("utf-8")),
+        )
+        if errors:
+            print()
+            print("Превышение бюджета:")
+            for error in errors:
+                print(f"    {error}")
+            sys.exit(1)
+
+        print()
+        print("Бюджет не превышен")
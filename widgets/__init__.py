@@ -5,13 +5,22 @@ __author__ = "ipetrash"
 
 
 import re
+import sys
 import textwrap
 import webbrowser
 
 from contextlib import contextmanager
 from typing import Any, Callable
 
-from PyQt6.QtCore import Qt, QObject, QPoint, QModelIndex, QAbstractItemModel
+from PyQt6.QtCore import (
+    Qt,
+    QObject,
+    QPoint,
+    QModelIndex,
+    QAbstractItemModel,
+    QThread,
+    pyqtSignal,
+)
 from PyQt6.QtGui import QPalette, QAction
 from PyQt6.QtWidgets import (
     QApplication,
@@ -21,10 +30,148 @@ from PyQt6.QtWidgets import (
     QWidget,
     QTableView,
     QMenu,
+    QTextBrowser,
 )
 
+from api.cancellation import CancelToken, use_token
+from api.jira_issues import ISSUE_INFO_CACHE, IssueInfo, get_field_label
 from api.jira_rss import Activity
-from config import JIRA_HOST
+from api.requirements import get_module_from_requirements
+from api.tracing import span
+from config import JIRA_HOST, ISSUE_COLUMNS
+
+
+class RunFuncThread(QThread):
+    run_finished = pyqtSignal(object)
+    about_error = pyqtSignal(Exception)
+
+    def __init__(self, func) -> None:
+        super().__init__()
+
+        self.func = func
+
+    def run(self) -> None:
+        with span(
+            "RunFuncThread.run",
+            cat="thread",
+            func=getattr(self.func, "__qualname__", repr(self.func)),
+        ):
+            try:
+                self.run_finished.emit(self.func())
+            except Exception as e:
+                self.about_error.emit(e)
+
+
+class GenerationThread(QThread):
+    run_finished = pyqtSignal(int, object)
+    about_error = pyqtSignal(int, Exception)
+
+    def __init__(self, func, token: CancelToken) -> None:
+        super().__init__()
+
+        self.func = func
+        self.token: CancelToken = token
+
+    def run(self) -> None:
+        generation: int = self.token.generation
+        with span(
+            "GenerationThread.run",
+            cat="thread",
+            func=getattr(self.func, "__qualname__", repr(self.func)),
+            generation=generation,
+        ) as span_args:
+            try:
+                with use_token(self.token):
+                    result = self.func()
+                self.run_finished.emit(generation, result)
+            except Exception as e:
+                self.about_error.emit(generation, e)
+            finally:
+                span_args["cancelled"] = self.token.is_cancelled
+
+
+class RefreshCoordinator(QObject):
+    """Выполнение func в потоке, но не больше одного выполнения за раз.
+
+    Повторный запуск во время выполнения присоединяется к нему или, с restart=True,
+    отменяет его и запускается заново. Запросы отмененного выполнения прерываются
+    (см. api.cancellation), а его результат и ошибки отбрасываются по номеру поколения.
+    Сигналы совпадают с RunFuncThread, started отправляется синхронно из start.
+    """
+
+    started = pyqtSignal()
+    run_finished = pyqtSignal(object)
+    about_error = pyqtSignal(Exception)
+    finished = pyqtSignal()
+
+    def __init__(self, func) -> None:
+        super().__init__()
+
+        self.func = func
+        self.generation: int = 0
+
+        self._token: CancelToken | None = None
+        self._thread: GenerationThread | None = None
+
+        # Потоки отмененных поколений хранятся до завершения
+        self._threads: set[GenerationThread] = set()
+
+    def isRunning(self) -> bool:
+        return self._thread is not None
+
+    def start(self, restart: bool = False) -> bool:
+        """Возвращает False, если запуск присоединился к текущему выполнению"""
+
+        if self.isRunning():
+            if not restart:
+                return False
+
+            self._cancel()
+
+        self.generation += 1
+        self._token = CancelToken(generation=self.generation)
+
+        thread = GenerationThread(self.func, self._token)
+        thread.run_finished.connect(self._on_run_finished)
+        thread.about_error.connect(self._on_about_error)
+        thread.finished.connect(lambda thread=thread: self._on_thread_finished(thread))
+        self._threads.add(thread)
+        self._thread = thread
+
+        self.started.emit()
+        thread.start()
+        return True
+
+    def _cancel(self) -> None:
+        if self._token:
+            self._token.cancel()
+            self._token = None
+
+        self._thread = None
+
+    def cancel(self) -> None:
+        if not self.isRunning():
+            return
+
+        self._cancel()
+        self.finished.emit()
+
+    def _on_run_finished(self, generation: int, result: Any) -> None:
+        if generation == self.generation and self._thread:
+            self.run_finished.emit(result)
+
+    def _on_about_error(self, generation: int, e: Exception) -> None:
+        if generation == self.generation and self._thread:
+            self.about_error.emit(e)
+
+    def _on_thread_finished(self, thread: GenerationThread) -> None:
+        self._threads.discard(thread)
+        thread.deleteLater()
+
+        if thread is self._thread:
+            self._thread = None
+            self._token = None
+            self.finished.emit()
 
 
 @contextmanager
@@ -202,6 +349,28 @@ def add_table_row(table: QTableWidget, items: list[QTableWidgetItem]) -> None:
         table.setItem(row, j, item)
 
 
+def get_issue_column_labels() -> list[str]:
+    return [get_field_label(field) for field in ISSUE_COLUMNS]
+
+
+def fill_issue_columns(
+    table: QTableWidget,
+    jira_id_column: int,
+    first_column: int,
+) -> None:
+    """Заполнение дополнительных колонок с полями задач из кэша"""
+
+    for row in range(table.rowCount()):
+        item_jira_id = table.item(row, jira_id_column)
+        if not item_jira_id:
+            continue
+
+        info: IssueInfo | None = ISSUE_INFO_CACHE.get(item_jira_id.text())
+        for j, field in enumerate(ISSUE_COLUMNS):
+            text: str = info.fields.get(field, "") if info else ""
+            table.setItem(row, first_column + j, create_table_item(text, tool_tip=text))
+
+
 def clear_table(table_widget: QTableWidget) -> None:
     # Удаление строк таблицы
     while table_widget.rowCount():
@@ -229,3 +398,27 @@ def get_scroll_area(widget: QWidget) -> QScrollArea:
 
 def get_class_name(obj: Any) -> str:
     return obj.__class__.__name__
+
+
+def get_not_module_widget(
+    module_name: str,
+    text_template: str = "Для работы аддона нужно установить {name} и перезапустить приложение",
+) -> QTextBrowser:
+    name: str | None = get_module_from_requirements(module_name)
+    if not name:
+        name = module_name
+
+    html_text = f"""
+        <p>
+            <b><font color="red">
+            {text_template.format(name=name)}
+            </font></b>
+        </p>
+        <p>Команда:</p>
+        <p>{sys.executable} -m pip install {name}</p>
+    """
+
+    text_browser = QTextBrowser()
+    text_browser.setHtml(html_text)
+
+    return text_browser
@@ -31,7 +31,7 @@ from PyQt6.QtWidgets import (
 )
 
 from api import get_human_datetime, get_ago
-from api import requirements
+from api import metrics
 from config import (
     PROGRAM_NAME,
     DIR,
@@ -43,7 +43,7 @@ from config import (
 from version import VERSION
 from third_party.column_resizer_pyqt6 import ColumnResizer
 from third_party.human_byte_size import sizeof_fmt
-from widgets import get_scroll_area
+from widgets import get_scroll_area, get_not_module_widget
 from widgets.markdown_viewer import MarkdownViewer
 
 
@@ -200,6 +200,12 @@ class About(QDialog):
                 get_ext_label("<br/>".join(links)),
             )
 
+        self._label_metrics = get_ext_label("")
+        fields_layout.addRow(
+            "Метрики:",
+            self._label_metrics,
+        )
+
         if SHOW_USED_MEMORY:
             if psutil:
                 fields_layout.addRow(
@@ -213,7 +219,7 @@ class About(QDialog):
                     self._label_memory,
                 )
             else:
-                not_module_widget = requirements.get_not_module_widget(
+                not_module_widget = get_not_module_widget(
                     module_name="psutil",
                     text_template=(
                         "Для отображения используемой памяти нужно установить {name} и перезапустить приложение"
@@ -243,6 +249,12 @@ class About(QDialog):
             f"{get_human_datetime(self._started)} ({get_ago(self._started)})"
         )
 
+        self._label_metrics.setText(
+            "<br/>".join(
+                f"{name}: {value}" for name, value in metrics.get_summary().items()
+            )
+        )
+
         if SHOW_USED_MEMORY and psutil:
 
             def _get_tr(pid: int, value: int) -> str:
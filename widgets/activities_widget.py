@@ -17,6 +17,9 @@ from PyQt6.QtWidgets import (
 )
 
 from api import get_human_date, get_human_time
+from api.metrics import RENDER_DURATION
+from api.tracing import traced
+from api.aggregation import LoggedByDay, get_logged_by_day
 from api.jira_rss import ActivityActionEnum, Activity, get_logged_total_seconds
 from widgets import (
     create_table,
@@ -25,6 +28,8 @@ from widgets import (
     clear_table,
     open_jira,
     block_signals,
+    get_issue_column_labels,
+    fill_issue_columns,
 )
 from third_party.seconds_to_str import seconds_to_str
 
@@ -41,7 +46,13 @@ class ActivitiesWidget(QWidget):
         )
 
         self.table_date_by_jira = create_table(
-            header_labels=["ЗАЛОГИРОВАНО", "АКТИВНОСТИ", "ЗАДАЧА", "НАЗВАНИЕ"],
+            header_labels=[
+                "ЗАЛОГИРОВАНО",
+                "АКТИВНОСТИ",
+                "ЗАДАЧА",
+                "НАЗВАНИЕ",
+                *get_issue_column_labels(),
+            ],
         )
         self.table_date_by_jira.itemSelectionChanged.connect(
             lambda: self._on_table_date_by_jira_item_clicked(
@@ -81,16 +92,25 @@ class ActivitiesWidget(QWidget):
 
         self.setLayout(layout)
 
-    def set_date_by_activities(self, date_by_activities: dict[date, list[Activity]]) -> None:
+    @traced()
+    @RENDER_DURATION.timed(widget="ActivitiesWidget")
+    def set_date_by_activities(
+        self,
+        date_by_activities: dict[date, list[Activity]],
+        logged_by_day: list[LoggedByDay] | None = None,
+    ) -> None:
+        if logged_by_day is None:
+            logged_by_day = get_logged_by_day(date_by_activities)
+
         with block_signals(self.table_date):
             clear_table(self.table_date)
 
-            for entry_date, activities in sorted(
-                date_by_activities.items(), key=lambda x: x[0], reverse=True
-            ):
-                activities_number = len(activities)
+            for obj in logged_by_day:
+                entry_date: date = obj.date
+                activities: list[Activity] = date_by_activities[entry_date]
+                activities_number: int = obj.activities
 
-                total_seconds: int = get_logged_total_seconds(activities)
+                total_seconds: int = obj.logged_seconds
                 total_seconds_str: str = seconds_to_str(total_seconds)
 
                 date_str: str = get_human_date(entry_date)
@@ -157,9 +177,15 @@ class ActivitiesWidget(QWidget):
 
                 add_table_row(self.table_date_by_jira, items)
 
+            fill_issue_columns(self.table_date_by_jira, jira_id_column=2, first_column=4)
+
         self.table_date_by_jira.setCurrentCell(0, 0)
         self._on_table_date_by_jira_item_clicked(self.table_date_by_jira.currentItem())
 
+    def update_issue_columns(self) -> None:
+        with block_signals(self.table_date_by_jira):
+            fill_issue_columns(self.table_date_by_jira, jira_id_column=2, first_column=4)
+
     def _on_table_date_by_jira_item_clicked(self, item: QTableWidgetItem | None) -> None:
         with block_signals(self.table_jira_by_activities):
             clear_table(self.table_jira_by_activities)
@@ -174,7 +200,7 @@ class ActivitiesWidget(QWidget):
             if not activities:
                 return
 
-            activities.sort(key=lambda x: x.entry_dt)
+            activities.sort(key=lambda x: x.entry_ts)
 
             for activity in activities:
                 if activity.logged:
@@ -9,7 +9,6 @@ import traceback
 import pkgutil
 import sys
 
-from dataclasses import dataclass
 from datetime import datetime
 from inspect import isclass
 from typing import Type, Any
@@ -31,8 +30,17 @@ from PyQt6.QtWidgets import (
     QMessageBox,
 )
 
-from api import RunFuncThread, get_human_datetime, get_ago
-from widgets import get_class_name, get_scroll_area, web_browser_open
+from api import get_human_datetime, get_ago
+from api.history import HISTORY
+from api.snapshots import SNAPSHOTS, Snapshot
+from api.tracing import span
+from widgets import RefreshCoordinator, get_class_name, get_scroll_area, web_browser_open
+from widgets.addons.manifest import (
+    Defaults,
+    AddonManifest,
+    MANIFESTS,
+    get_manifest,
+)
 from widgets.logs_widget import LogsWidget
 
 
@@ -40,13 +48,6 @@ FILE: Path = Path(__file__).resolve()
 DIR: Path = FILE.parent
 
 
-@dataclass
-class Defaults:
-    is_active: bool
-    is_visible: bool
-    area: Qt.DockWidgetArea
-
-
 class AddonWidget(QWidget):
     def __init__(self, addon_dock_widget: "AddonDockWidget") -> None:
         super().__init__()
@@ -56,13 +57,22 @@ class AddonWidget(QWidget):
         self.__is_active: bool = True
         self.context: Any = None
 
-        self.thread_process = RunFuncThread(func=self.get_data)
+        self.manifest: AddonManifest | None = get_manifest(self.name)
+        if self.manifest:
+            self.setWindowTitle(self.manifest.title)
+
+        # Повторное обновление во время выполнения присоединяется к нему
+        # или, при restart, отменяет его и запускается заново
+        self.thread_process = RefreshCoordinator(func=self.get_data)
         self.thread_process.run_finished.connect(self.do_process)
 
     def set_context(self, context: Any) -> None:
         self.context = context
 
     def defaults(self) -> Defaults:
+        if self.manifest:
+            return self.manifest.defaults
+
         return Defaults(
             is_active=True,
             is_visible=True,
@@ -70,6 +80,9 @@ class AddonWidget(QWidget):
         )
 
     def is_supported_refresh(self) -> bool:
+        if self.manifest:
+            return self.manifest.is_supported_refresh
+
         return True
 
     def is_supported_logs(self) -> bool:
@@ -98,27 +111,45 @@ class AddonWidget(QWidget):
     def url(self) -> str:
         return ""
 
+    @property
+    def snapshot_name(self) -> str:
+        return f"addon_{self.name}"
+
     def get_data(self) -> Any:
         raise NotImplementedError()
 
     def process(self, data: Any):
         raise NotImplementedError()
 
+    def get_history_value(self, data: Any) -> Any:
+        """Значение результата для истории. Если None, то результат не сохраняется"""
+        return data
+
     def do_process(self, data: Any) -> None:
-        try:
-            self.process(data)
-        except Exception as e:
-            self.thread_process.about_error.emit(e)
+        with span(f"{self.name}.process", cat="addon"):
+            try:
+                self.process(data)
+            except Exception as e:
+                self.thread_process.about_error.emit(e)
+                return
 
-    def refresh(self) -> None:
-        if (
-            not self.isEnabled()
-            or not self.__is_active
-            or not self.is_supported_refresh()
-        ):
+            # NOTE: Результат уже показан, поэтому ошибка сохранения - не ошибка аддона
+            try:
+                value: Any = self.get_history_value(data)
+                if value is not None:
+                    HISTORY.append_async(self.name, value)
+
+                SNAPSHOTS.put(self.snapshot_name, data)
+            except Exception as e:
+                self.addon_dock_widget.logs.append(
+                    f"Не удалось сохранить результат в историю или снимок: {e}"
+                )
+
+    def refresh(self, restart: bool = False) -> None:
+        if not self.__is_active or not self.is_supported_refresh():
             return
 
-        self.thread_process.start()
+        self.thread_process.start(restart=restart)
 
     def init_settings(self, settings_layout: QFormLayout) -> None:
         pass
@@ -131,9 +162,24 @@ class AddonWidget(QWidget):
 
 
 class AddonDockWidget(QDockWidget):
-    def __init__(self, addon_cls: Type[AddonWidget]) -> None:
+    def __init__(
+        self,
+        addon_cls: Type[AddonWidget] | None = None,
+        manifest: AddonManifest | None = None,
+    ) -> None:
         super().__init__()
 
+        if not addon_cls and not manifest:
+            raise ValueError("Нужно задать addon_cls или manifest")
+
+        self.manifest: AddonManifest | None = manifest
+        self.addon: AddonWidget | None = None
+        self.context: Any = None
+
+        # Настройки аддона, прочитанные до его загрузки
+        self._settings: dict[str, Any] | None = None
+        self._is_failed_load: bool = False
+
         self.progress_refresh = QProgressBar()
         self.progress_refresh.setObjectName("progress_refresh")
         self.progress_refresh.setRange(0, 0)
@@ -144,15 +190,6 @@ class AddonDockWidget(QDockWidget):
 
         self._last_error: Exception | None = None
 
-        self.addon: AddonWidget = addon_cls(self)
-        self.addon.thread_process.started.connect(self._process_started)
-        self.addon.thread_process.run_finished.connect(self._process_run_finished)
-        self.addon.thread_process.about_error.connect(self._process_set_error_log)
-        self.addon.thread_process.finished.connect(self._process_finished)
-
-        # Для работы saveState/restoreState
-        self.setObjectName(f"{self.addon.name}_DockWidget")
-
         self.logs = LogsWidget()
 
         self.cb_is_active = QCheckBox()
@@ -171,7 +208,6 @@ class AddonDockWidget(QDockWidget):
         self.button_refresh.setObjectName("button_refresh")
         self.button_refresh.setAutoRaise(True)
         self.button_refresh.setText("🔄")
-        self.button_refresh.clicked.connect(self.addon.refresh)
 
         self.button_url = QToolButton()
         self.button_url.setObjectName("button_url")
@@ -182,11 +218,109 @@ class AddonDockWidget(QDockWidget):
 
         self._last_refresh_datetime: datetime | None = None
 
+        # Время снимка, если показан результат из него, а не полученный при обновлении
+        self._snapshot_datetime: datetime | None = None
+
         self.stacked_ago_progress = QStackedWidget()
         self.stacked_ago_progress.setObjectName("ago_progress")
         self.stacked_ago_progress.addWidget(self.label_ago)
         self.stacked_ago_progress.addWidget(self.progress_refresh)
 
+        self.tab_widget = QTabWidget()
+        self.tab_widget.setTabBarAutoHide(True)
+        self.tab_widget.setObjectName("tabs")
+
+        self._idx_tab_addon: int = -1
+        self._idx_tab_logs: int = -1
+
+        if addon_cls:
+            self._init_addon(addon_cls)
+        else:
+            # Для работы saveState/restoreState
+            self.setObjectName(f"{self.name}_DockWidget")
+
+            # NOTE: Аддон будет загружен при первом показе док-виджета
+            self.setWidget(QWidget())
+            self.visibilityChanged.connect(self._on_visibility_changed)
+            self._update_window_title()
+
+    @property
+    def name(self) -> str:
+        if self.addon:
+            return self.addon.name
+        return self.manifest.name
+
+    @property
+    def title(self) -> str:
+        if self.addon:
+            return self.addon.title
+        return self.manifest.title
+
+    def defaults(self) -> Defaults:
+        if self.addon:
+            return self.addon.defaults()
+        return self.manifest.defaults
+
+    def is_supported_refresh(self) -> bool:
+        if self.addon:
+            return self.addon.is_supported_refresh()
+        return self.manifest.is_supported_refresh
+
+    def is_loaded(self) -> bool:
+        return self.addon is not None
+
+    def is_active(self) -> bool:
+        return self.cb_is_active.isChecked()
+
+    def set_context(self, context: Any) -> None:
+        self.context = context
+        if self.addon:
+            self.addon.set_context(context)
+
+    def load(self) -> bool:
+        if self.addon:
+            return True
+
+        if self._is_failed_load:
+            return False
+
+        # NOTE: Аддоны могут переписать sys.excepthook при импорте, например, как тетрис
+        excepthook = sys.excepthook
+        try:
+            module = importlib.import_module(self.manifest.module)
+            addon_cls: Type[AddonWidget] = getattr(module, self.manifest.name)
+            self._init_addon(addon_cls)
+        except Exception as e:
+            self._is_failed_load = True
+            show_error_load_addon(self.manifest.name, e)
+            return False
+        finally:
+            sys.excepthook = excepthook
+
+        self.addon.set_context(self.context)
+        self.addon.is_active = self.is_active()
+        self.button_refresh.setEnabled(self.is_active())
+        self.addon.read_settings(self._settings)
+        self._settings = None
+
+        return True
+
+    def _on_visibility_changed(self, visible: bool) -> None:
+        if visible and not self.addon:
+            self.load()
+
+    def _init_addon(self, addon_cls: Type[AddonWidget]) -> None:
+        self.addon = addon_cls(self)
+        self.addon.thread_process.started.connect(self._process_started)
+        self.addon.thread_process.run_finished.connect(self._process_run_finished)
+        self.addon.thread_process.about_error.connect(self._process_set_error_log)
+        self.addon.thread_process.finished.connect(self._process_finished)
+
+        # Для работы saveState/restoreState
+        self.setObjectName(f"{self.addon.name}_DockWidget")
+
+        self.button_refresh.clicked.connect(self._on_button_refresh_clicked)
+
         right_corner_widget = QWidget()
         right_corner_widget_layout = QHBoxLayout(right_corner_widget)
         right_corner_widget_layout.setContentsMargins(0, 0, 0, 0)
@@ -197,10 +331,6 @@ class AddonDockWidget(QDockWidget):
         if self.addon.is_supported_refresh():
             right_corner_widget_layout.addWidget(self.stacked_ago_progress)
 
-        self.tab_widget = QTabWidget()
-        self.tab_widget.setTabBarAutoHide(True)
-        self.tab_widget.setObjectName("tabs")
-
         self._idx_tab_addon = self.tab_widget.addTab(
             get_scroll_area(self.addon),
             "🏛️",
@@ -245,8 +375,8 @@ class AddonDockWidget(QDockWidget):
         self.addon.init_settings(settings_layout)
 
     def _update_window_title(self) -> None:
-        title = self.addon.title
-        if not self.addon.is_active:
+        title = self.title
+        if not self.is_active():
             title = f"{title} (отключено)"
 
         if not self.is_auto_refresh():
@@ -261,20 +391,68 @@ class AddonDockWidget(QDockWidget):
         font.setStrikeOut(not is_active)
         action.setFont(font)
 
-        self.addon.is_active = is_active
+        if self.addon:
+            self.addon.is_active = is_active
+
         self.button_refresh.setEnabled(is_active)
         self._update_window_title()
 
     def update_last_refresh_datetime(self) -> None:
-        self.label_ago.setText(
+        text: str = (
             get_ago(self._last_refresh_datetime) if self._last_refresh_datetime else ""
         )
+        if text and self._snapshot_datetime:
+            text = f"📦 {text}"
+
+        self.label_ago.setText(text)
+
+    def load_snapshot(self) -> bool:
+        """Показ последнего успешного результата аддона из снимка, без запросов"""
+
+        if not self.is_supported_refresh() or not self.load():
+            return False
+
+        snapshot: Snapshot | None = SNAPSHOTS.get(self.addon.snapshot_name)
+        if not snapshot:
+            return False
+
+        try:
+            self.addon.process(snapshot.data)
+        except Exception as e:
+            self.logs.append_error(f"Ошибка при показе снимка: {e}")
+            return False
+
+        self._snapshot_datetime = snapshot.dt
+        self._last_refresh_datetime = snapshot.dt
+        self.label_ago.setToolTip(
+            f"Результат из снимка от {get_human_datetime(snapshot.dt)}, "
+            "будет заменен после обновления"
+        )
+        self.update_last_refresh_datetime()
+
+        self.logs.append(f"Показан результат из снимка от {get_human_datetime(snapshot.dt)}")
+        return True
 
     def is_auto_refresh(self) -> bool:
         return self.cb_is_auto_refresh.isChecked()
 
+    def _on_button_refresh_clicked(self) -> None:
+        if self.addon.thread_process.isRunning():
+            self.logs.append("Предыдущее обновление отменено, запуск заново")
+
+        self.logs.append(f"Обновление в {get_human_datetime()}")
+        self.addon.refresh(restart=True)
+
     def refresh(self) -> None:
-        if not self.addon.is_supported_refresh():
+        if not self.is_supported_refresh():
+            return
+
+        # Аддон, который участвует в общем обновлении, загружается при первом обновлении
+        if not self.load():
+            return
+
+        # Общее обновление присоединяется к выполняющемуся обновлению аддона
+        if self.addon.thread_process.isRunning():
             return
 
         self.logs.append(f"Обновление в {get_human_datetime()}")
@@ -284,7 +462,7 @@ class AddonDockWidget(QDockWidget):
         self._last_error = None
         self._last_refresh_datetime = None
 
-        self.button_refresh.setEnabled(False)
+        # NOTE: Кнопка не блокируется: повторное нажатие перезапускает обновление
         self.addon.setEnabled(False)
         self.stacked_ago_progress.setCurrentWidget(self.progress_refresh)
 
@@ -305,15 +483,21 @@ class AddonDockWidget(QDockWidget):
             self.tab_widget.setCurrentIndex(self._idx_tab_logs)
 
     def _process_finished(self) -> None:
-        self.button_refresh.setEnabled(True)
         self.addon.setEnabled(True)
         self.stacked_ago_progress.setCurrentWidget(self.label_ago)
 
-        self._last_refresh_datetime = datetime.now()
+        # Если обновление завершилось ошибкой, то результат из снимка остается
+        if self._last_error and self._snapshot_datetime:
+            self._last_refresh_datetime = self._snapshot_datetime
+        else:
+            self._last_refresh_datetime = datetime.now()
+            self._snapshot_datetime = None
+            self.label_ago.setToolTip("")
+
         self.update_last_refresh_datetime()
 
     def read_settings(self, settings: dict[str, Any] | None) -> None:
-        defaults: Defaults = self.addon.defaults()
+        defaults: Defaults = self.defaults()
 
         if not settings:
             settings: dict[str, Any] = dict()
@@ -332,55 +516,102 @@ class AddonDockWidget(QDockWidget):
         )
         self.cb_is_auto_refresh.setChecked(is_auto_refresh)
 
-        self.addon.read_settings(settings)
+        if self.addon:
+            self.addon.read_settings(settings)
+        else:
+            self._settings = settings
 
     def write_settings(self, settings: dict[str, Any]) -> None:
+        # Не загруженный аддон сохраняет ранее прочитанные настройки как есть
+        if not self.addon and self._settings:
+            settings.update(self._settings)
+
         is_active = self.cb_is_active.objectName()
         settings[is_active] = self.cb_is_active.isChecked()
 
         is_auto_refresh = self.cb_is_auto_refresh.objectName()
         settings[is_auto_refresh] = self.cb_is_auto_refresh.isChecked()
 
-        self.addon.write_settings(settings)
+        if self.addon:
+            self.addon.write_settings(settings)
+
+
+def show_error_load_addon(name: str, e: Exception) -> None:
+    msg_box = QMessageBox(
+        QMessageBox.Icon.Warning,
+        "Ошибка при загрузке аддона",
+        f"Ошибка при загрузке аддона {name}: {e}",
+    )
+    msg_box.setDetailedText(traceback.format_exc())
+    msg_box.setStandardButtons(QMessageBox.StandardButton.Ok)
+    msg_box.exec()
 
 
 # SOURCE: https://stackoverflow.com/a/25083161/5909792
-def import_submodules(package_name: str) -> dict[str, ModuleType]:
+def import_submodules(
+    package_name: str,
+    exclude: set[str] | None = None,
+) -> dict[str, ModuleType]:
     """
     Import all submodules of a module, recursively
     """
 
+    if exclude is None:
+        exclude = set()
+
+    # NOTE: Не используется pkgutil.walk_packages, т.к. он импортирует все пакеты,
+    #       включая исключенные
     package = sys.modules[package_name]
-    return {
-        name: importlib.import_module(package_name + "." + name)
-        for _, name, _ in pkgutil.walk_packages(package.__path__)
-    }
+
+    items: dict[str, ModuleType] = dict()
+    for _, name, is_pkg in pkgutil.iter_modules(package.__path__):
+        if name in exclude:
+            continue
+
+        full_name: str = f"{package_name}.{name}"
+        items[name] = importlib.import_module(full_name)
+
+        if is_pkg:
+            for sub_name, module in import_submodules(full_name).items():
+                items[f"{name}.{sub_name}"] = module
+
+    return items
+
+
+def get_addon_docks_from_module(module: ModuleType) -> list[AddonDockWidget]:
+    items = []
+
+    # Перебираем список объектов в модуле
+    for name in dir(module):
+        obj = getattr(module, name)
+        if (
+            not isclass(obj)
+            or obj is AddonWidget
+            or not issubclass(obj, AddonWidget)
+        ):
+            continue
+
+        try:
+            items.append(AddonDockWidget(addon_cls=obj))
+        except Exception as e:
+            show_error_load_addon(name, e)
+
+    return items
 
 
 def import_all_addons(package: str = __name__) -> list[AddonDockWidget]:
     items = []
 
-    for module in import_submodules(package).values():
-        # Перебираем список объектов в модуле
-        for name in dir(module):
-            obj = getattr(module, name)
-            if (
-                not isclass(obj)
-                or obj is AddonWidget
-                or not issubclass(obj, AddonWidget)
-            ):
-                continue
+    # Аддоны из манифеста загружаются отложенно, при первом показе или обновлении
+    for manifest in MANIFESTS:
+        items.append(AddonDockWidget(manifest=manifest))
 
-            try:
-                items.append(AddonDockWidget(addon_cls=obj))
-            except Exception as e:
-                msg_box = QMessageBox(
-                    QMessageBox.Icon.Warning,
-                    "Ошибка при загрузке аддона",
-                    f"Ошибка при загрузке аддона {name}: {e}",
-                )
-                msg_box.setDetailedText(traceback.format_exc())
-                msg_box.setStandardButtons(QMessageBox.StandardButton.Ok)
-                msg_box.exec()
+    # Модули, которые не описаны в манифесте, импортируются сразу
+    exclude: set[str] = {"manifest"} | {
+        manifest.module.removeprefix(f"{package}.").split(".")[0]
+        for manifest in MANIFESTS
+    }
+    for module in import_submodules(package, exclude=exclude).values():
+        items += get_addon_docks_from_module(module)
 
     return items
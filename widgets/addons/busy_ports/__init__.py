@@ -18,8 +18,9 @@ from PyQt6.QtWidgets import (
     QSizePolicy,
 )
 
-from api import RunFuncThread, requirements
-from widgets.addons import AddonWidget, AddonDockWidget, Defaults
+from api import requirements
+from widgets import RunFuncThread, get_not_module_widget
+from widgets.addons import AddonWidget, AddonDockWidget
 
 from third_party.is_user_admin import is_user_admin, is_windows
 
@@ -96,8 +97,6 @@ class AddonBusyPortsWidget(AddonWidget):
     def __init__(self, addon_dock_widget: AddonDockWidget) -> None:
         super().__init__(addon_dock_widget)
 
-        self.setWindowTitle("Занятые порты")
-
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(0, 0, 0, 0)
 
@@ -131,19 +130,9 @@ class AddonBusyPortsWidget(AddonWidget):
 
             return
 
-        not_module_widget = requirements.get_not_module_widget(REQUIRED_MODULE_NAME)
+        not_module_widget = get_not_module_widget(REQUIRED_MODULE_NAME)
         main_layout.addWidget(not_module_widget)
 
-    def defaults(self) -> Defaults:
-        return Defaults(
-            is_visible=False,
-            is_active=True,
-            area=Qt.DockWidgetArea.LeftDockWidgetArea,
-        )
-
-    def is_supported_refresh(self) -> bool:
-        return False
-
     def is_supported_logs(self) -> bool:
         return False
 
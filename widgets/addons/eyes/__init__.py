@@ -4,10 +4,9 @@
 __author__ = "ipetrash"
 
 
-from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import QVBoxLayout
 
-from widgets.addons import AddonWidget, AddonDockWidget, Defaults
+from widgets.addons import AddonWidget, AddonDockWidget
 from widgets.addons.eyes.eyes.eyes_widget import EyesWidget
 
 
@@ -15,22 +14,10 @@ class AddonEyesWidget(AddonWidget):
     def __init__(self, addon_dock_widget: AddonDockWidget) -> None:
         super().__init__(addon_dock_widget)
 
-        self.setWindowTitle("Глаза 👀")
-
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(0, 0, 0, 0)
         main_layout.addWidget(EyesWidget())
 
-    def defaults(self) -> Defaults:
-        return Defaults(
-            is_visible=False,
-            is_active=True,
-            area=Qt.DockWidgetArea.LeftDockWidgetArea,
-        )
-
-    def is_supported_refresh(self) -> bool:
-        return False
-
     def is_supported_logs(self) -> bool:
         return False
 
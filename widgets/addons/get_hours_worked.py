@@ -4,6 +4,7 @@
 __author__ = "ipetrash"
 
 
+from dataclasses import dataclass
 from typing import Any
 
 from PyQt6.QtWidgets import QVBoxLayout, QPlainTextEdit, QFormLayout, QCheckBox
@@ -18,12 +19,18 @@ from third_party.get_quarter import get_quarter_roman
 from widgets.addons import AddonWidget, AddonDockWidget
 
 
+@dataclass
+class HoursWorked:
+    ok: bool
+    text: str
+    deviation_hours: str | None = None
+    quarter_deviation_hours: str | None = None
+
+
 class AddonGetHoursWorkedWidget(AddonWidget):
     def __init__(self, addon_dock_widget: AddonDockWidget) -> None:
         super().__init__(addon_dock_widget)
 
-        self.setWindowTitle("Рабочие часы")
-
         self.info = QPlainTextEdit()
         self.info.setReadOnly(True)
 
@@ -42,7 +49,7 @@ class AddonGetHoursWorkedWidget(AddonWidget):
     def url(self) -> str:
         return URL
 
-    def get_data(self) -> tuple[bool, str]:
+    def get_data(self) -> HoursWorked:
         def _get_title(deviation_hours: str):
             ok = deviation_hours[0] != "-"
             return "Переработка" if ok else "Недоработка"
@@ -70,15 +77,18 @@ class AddonGetHoursWorkedWidget(AddonWidget):
         if not deviation_hours and quarter_deviation_hours:
             ok = True
 
-        return ok, text.strip()
-
-    def process(self, data: tuple[bool, str]) -> None:
-        ok, text = data
+        return HoursWorked(
+            ok=ok,
+            text=text.strip(),
+            deviation_hours=deviation_hours,
+            quarter_deviation_hours=quarter_deviation_hours,
+        )
 
-        self.color = "#29AB87" if ok else "#80ff0000"
+    def process(self, data: HoursWorked) -> None:
+        self.color = "#29AB87" if data.ok else "#80ff0000"
         self._update_is_colorized()
 
-        self.info.setPlainText(text)
+        self.info.setPlainText(data.text)
 
     def _update_is_colorized(self) -> None:
         self.info.setStyleSheet(
@@ -19,8 +19,6 @@ class AddonGetTimeSpentInOfficeWidget(AddonWidget):
     def __init__(self, addon_dock_widget: AddonDockWidget) -> None:
         super().__init__(addon_dock_widget)
 
-        self.setWindowTitle("Проведенное время в офисе")
-
         self.info = QPlainTextEdit()
         self.info.setReadOnly(True)
 
@@ -15,8 +15,6 @@ class AddonGetWorklogWidget(AddonWidget):
     def __init__(self, addon_dock_widget: AddonDockWidget) -> None:
         super().__init__(addon_dock_widget)
 
-        self.setWindowTitle("Рабочий журнал")
-
         self.info = QPlainTextEdit()
         self.info.setReadOnly(True)
 
@@ -4,7 +4,6 @@
 __author__ = "ipetrash"
 
 
-from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import (
     QTextBrowser,
     QVBoxLayout,
@@ -19,15 +18,13 @@ from api.jira_get_total_resolved import (
     get_stats,
 )
 from config import JIRA_HOST
-from widgets.addons import AddonWidget, AddonDockWidget, Defaults
+from widgets.addons import AddonWidget, AddonDockWidget
 
 
 class AddonGetTotalResolvedWidget(AddonWidget):
     def __init__(self, addon_dock_widget: AddonDockWidget) -> None:
         super().__init__(addon_dock_widget)
 
-        self.setWindowTitle("Jira. Статистика закрытых задач")
-
         self.html_viewer = QTextBrowser()
         self.html_viewer.setOpenExternalLinks(True)
 
@@ -35,13 +32,6 @@ class AddonGetTotalResolvedWidget(AddonWidget):
         main_layout.setContentsMargins(0, 0, 0, 0)
         main_layout.addWidget(self.html_viewer)
 
-    def defaults(self) -> Defaults:
-        return Defaults(
-            is_visible=False,
-            is_active=False,
-            area=Qt.DockWidgetArea.LeftDockWidgetArea,
-        )
-
     def get_data(self) -> Stats:
         return get_stats()
 
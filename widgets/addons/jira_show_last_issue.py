@@ -7,7 +7,7 @@ __author__ = "ipetrash"
 import time
 from typing import Any
 
-from PyQt6.QtCore import QUrl, Qt
+from PyQt6.QtCore import QUrl
 from PyQt6.QtWidgets import (
     QFormLayout,
     QTextBrowser,
@@ -17,7 +17,7 @@ from PyQt6.QtWidgets import (
 from api.jira_show_last_issue import get_last_issue_key
 from third_party.advanced_list_widget_pyqt6 import AdvancedListWidget
 from widgets import open_jira, open_jira_project
-from widgets.addons import AddonWidget, AddonDockWidget, Defaults
+from widgets.addons import AddonWidget, AddonDockWidget
 
 
 SAMPLE_DATA: list[str] = ["RADIX", "FLORA"]
@@ -27,8 +27,6 @@ class AddonGetLastIssueKeyWidget(AddonWidget):
     def __init__(self, addon_dock_widget: AddonDockWidget) -> None:
         super().__init__(addon_dock_widget)
 
-        self.setWindowTitle("Jira. Последние задачи в проектах")
-
         self.html_viewer = QTextBrowser()
         self.html_viewer.setOpenLinks(False)
         self.html_viewer.anchorClicked.connect(self._anchor_clicked)
@@ -41,13 +39,6 @@ class AddonGetLastIssueKeyWidget(AddonWidget):
         main_layout.setContentsMargins(0, 0, 0, 0)
         main_layout.addWidget(self.html_viewer)
 
-    def defaults(self) -> Defaults:
-        return Defaults(
-            is_visible=False,
-            is_active=False,
-            area=Qt.DockWidgetArea.LeftDockWidgetArea,
-        )
-
     def _anchor_clicked(self, url: QUrl) -> None:
         url: str = url.toString()
         if "-" in url:
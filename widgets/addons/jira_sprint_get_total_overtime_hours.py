@@ -29,15 +29,13 @@ from widgets import (
     add_table_row,
     clear_table,
 )
-from widgets.addons import AddonWidget, AddonDockWidget, Defaults
+from widgets.addons import AddonWidget, AddonDockWidget
 
 
 class AddonSprintsWidget(AddonWidget):
     def __init__(self, addon_dock_widget: AddonDockWidget) -> None:
         super().__init__(addon_dock_widget)
 
-        self.setWindowTitle("Спринты. Сверхурочные часы")
-
         self.not_found = QPlainTextEdit("Спринты не найдены")
         self.not_found.setReadOnly(True)
 
@@ -64,13 +62,6 @@ class AddonSprintsWidget(AddonWidget):
         self.main_layout.addWidget(self.not_found)
         self.main_layout.addWidget(self.main_widget)
 
-    def defaults(self) -> Defaults:
-        return Defaults(
-            is_visible=False,
-            is_active=False,
-            area=Qt.DockWidgetArea.RightDockWidgetArea,
-        )
-
     @property
     def url(self) -> str:
         return f"{JIRA_HOST}/issues/?jql={QUERY['jql']}"
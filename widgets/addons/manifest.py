@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "ipetrash"
+
+
+from dataclasses import dataclass
+
+from PyQt6.QtCore import Qt
+
+
+@dataclass
+class Defaults:
+    is_active: bool
+    is_visible: bool
+    area: Qt.DockWidgetArea
+
+
+@dataclass
+class AddonManifest:
+    # Имя класса аддона, используется как ключ настроек и в objectName док-виджета
+    name: str
+    title: str
+    # Путь к модулю, в котором объявлен класс аддона
+    module: str
+    defaults: Defaults
+    is_supported_refresh: bool = True
+
+
+# NOTE: Описание аддонов, которое можно прочитать без импорта их модулей.
+#       Аддоны, которых тут нет, загружаются при запуске, как и раньше
+MANIFESTS: list[AddonManifest] = [
+    AddonManifest(
+        name="AddonBusyPortsWidget",
+        title="Занятые порты",
+        module="widgets.addons.busy_ports",
+        defaults=Defaults(
+            is_visible=False,
+            is_active=True,
+            area=Qt.DockWidgetArea.LeftDockWidgetArea,
+        ),
+        is_supported_refresh=False,
+    ),
+    AddonManifest(
+        name="AddonEyesWidget",
+        title="Глаза 👀",
+        module="widgets.addons.eyes",
+        defaults=Defaults(
+            is_visible=False,
+            is_active=True,
+            area=Qt.DockWidgetArea.LeftDockWidgetArea,
+        ),
+        is_supported_refresh=False,
+    ),
+    AddonManifest(
+        name="AddonGetHoursWorkedWidget",
+        title="Рабочие часы",
+        module="widgets.addons.get_hours_worked",
+        defaults=Defaults(
+            is_visible=True,
+            is_active=True,
+            area=Qt.DockWidgetArea.RightDockWidgetArea,
+        ),
+    ),
+    AddonManifest(
+        name="AddonGetTimeSpentInOfficeWidget",
+        title="Проведенное время в офисе",
+        module="widgets.addons.get_time_spent_in_office",
+        defaults=Defaults(
+            is_visible=True,
+            is_active=True,
+            area=Qt.DockWidgetArea.RightDockWidgetArea,
+        ),
+    ),
+    AddonManifest(
+        name="AddonGetWorklogWidget",
+        title="Рабочий журнал",
+        module="widgets.addons.get_worklog",
+        defaults=Defaults(
+            is_visible=True,
+            is_active=True,
+            area=Qt.DockWidgetArea.RightDockWidgetArea,
+        ),
+    ),
+    AddonManifest(
+        name="AddonGetTotalResolvedWidget",
+        title="Jira. Статистика закрытых задач",
+        module="widgets.addons.jira_get_total_resolved",
+        defaults=Defaults(
+            is_visible=False,
+            is_active=False,
+            area=Qt.DockWidgetArea.LeftDockWidgetArea,
+        ),
+    ),
+    AddonManifest(
+        name="AddonGetLastIssueKeyWidget",
+        title="Jira. Последние задачи в проектах",
+        module="widgets.addons.jira_show_last_issue",
+        defaults=Defaults(
+            is_visible=False,
+            is_active=False,
+            area=Qt.DockWidgetArea.LeftDockWidgetArea,
+        ),
+    ),
+    AddonManifest(
+        name="AddonSprintsWidget",
+        title="Спринты. Сверхурочные часы",
+        module="widgets.addons.jira_sprint_get_total_overtime_hours",
+        defaults=Defaults(
+            is_visible=False,
+            is_active=False,
+            area=Qt.DockWidgetArea.RightDockWidgetArea,
+        ),
+    ),
+    AddonManifest(
+        name="AddonTeamLoggedWidget",
+        title="Команда",
+        module="widgets.addons.team_logged",
+        defaults=Defaults(
+            is_visible=False,
+            is_active=True,
+            area=Qt.DockWidgetArea.BottomDockWidgetArea,
+        ),
+    ),
+    AddonManifest(
+        name="AddonTetrisWidget",
+        title="Тетрис",
+        module="widgets.addons.tetris",
+        defaults=Defaults(
+            is_visible=False,
+            is_active=True,
+            area=Qt.DockWidgetArea.LeftDockWidgetArea,
+        ),
+        is_supported_refresh=False,
+    ),
+    AddonManifest(
+        name="AddonTimeCalcWidget",
+        title="Калькулятор времени",
+        module="widgets.addons.time_calc",
+        defaults=Defaults(
+            is_visible=False,
+            is_active=True,
+            area=Qt.DockWidgetArea.RightDockWidgetArea,
+        ),
+        is_supported_refresh=False,
+    ),
+    AddonManifest(
+        name="AddonTotalEffortsCalcWidget",
+        title="Калькулятор итоговой трудоемкости",
+        module="widgets.addons.total_efforts_calc",
+        defaults=Defaults(
+            is_visible=False,
+            is_active=True,
+            area=Qt.DockWidgetArea.RightDockWidgetArea,
+        ),
+        is_supported_refresh=False,
+    ),
+]
+
+MANIFEST_BY_NAME: dict[str, AddonManifest] = {
+    manifest.name: manifest for manifest in MANIFESTS
+}
+
+
+def get_manifest(name: str) -> AddonManifest | None:
+    return MANIFEST_BY_NAME.get(name)
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+__author__ = "ipetrash"
+
+
+from datetime import date, timedelta
+from typing import Any
+
+from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtWidgets import (
+    QFormLayout,
+    QHeaderView,
+    QLabel,
+    QSpinBox,
+    QVBoxLayout,
+)
+
+from api import get_human_date
+from api.jira_rss_team import UserLogged, get_team_logged
+from third_party.advanced_list_widget_pyqt6 import AdvancedListWidget
+from third_party.seconds_to_str import seconds_to_str
+from widgets import (
+    create_table,
+    create_table_item,
+    add_table_row,
+    clear_table,
+)
+from widgets.addons import AddonWidget, AddonDockWidget
+
+
+COLUMN_TOTAL: int = 1
+COLUMN_FIRST_DATE: int = 2
+
+
+class AddonTeamLoggedWidget(AddonWidget):
+    # NOTE: Сигнал отправляется из потока обновления, по мере получения результатов.
+    #       Результаты помечаются поколением обновления, чтобы отбросить результаты отмененного
+    about_user_logged = pyqtSignal(int, object)
+
+    def __init__(self, addon_dock_widget: AddonDockWidget) -> None:
+        super().__init__(addon_dock_widget)
+
+        self.label_result = QLabel()
+
+        self.table = create_table(header_labels=["ПОЛЬЗОВАТЕЛЬ", "ВСЕГО"])
+        self.table.horizontalHeader().setStretchLastSection(False)
+        self.table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.ResizeToContents
+        )
+
+        self.list_widget_usernames = AdvancedListWidget()
+        self.list_widget_usernames.setObjectName("usernames")
+
+        self.spin_box_days = QSpinBox()
+        self.spin_box_days.setObjectName("days")
+        self.spin_box_days.setRange(1, 90)
+        self.spin_box_days.setValue(14)
+
+        self._usernames: list[str] = []
+        self._dates: list[date] = []
+        self._done_number: int = 0
+
+        self.thread_process.started.connect(self._on_started)
+        self.about_user_logged.connect(self._on_user_logged)
+
+        main_layout = QVBoxLayout(self)
+        main_layout.setContentsMargins(0, 0, 0, 0)
+        main_layout.addWidget(self.label_result)
+        main_layout.addWidget(self.table)
+
+    def refresh(self, restart: bool = False) -> None:
+        if self.thread_process.isRunning() and not restart:
+            return
+
+        # Список фиксируется до запуска потока, чтобы не читать виджеты из другого потока
+        self._usernames = list(dict.fromkeys(self.list_widget_usernames.items()))
+        self._dates = self._get_dates()
+        super().refresh(restart=restart)
+
+    def _get_dates(self) -> list[date]:
+        return [
+            date.today() - timedelta(days=i) for i in range(self.spin_box_days.value())
+        ]
+
+    def _update_label_result(self) -> None:
+        self.label_result.setText(
+            f"Получено <b>{self._done_number}</b> из <b>{len(self._usernames)}</b>"
+        )
+
+    def _on_started(self) -> None:
+        self._done_number = 0
+        self._init_table()
+        self._update_label_result()
+
+    def _init_table(self) -> None:
+        clear_table(self.table)
+
+        header_labels: list[str] = ["ПОЛЬЗОВАТЕЛЬ", "ВСЕГО"] + [
+            get_human_date(d) for d in self._dates
+        ]
+        self.table.setColumnCount(len(header_labels))
+        self.table.setHorizontalHeaderLabels(header_labels)
+
+        # Строки создаются сразу, а заполняются по мере получения результатов
+        for username in self._usernames:
+            add_table_row(
+                self.table,
+                [
+                    create_table_item(username),
+                    create_table_item("..."),
+                ],
+            )
+
+    def _on_user_logged(self, generation: int, user_logged: UserLogged) -> None:
+        if generation != self.thread_process.generation:
+            return
+
+        try:
+            row: int = self._usernames.index(user_logged.username)
+        except ValueError:
+            return
+
+        self._done_number += 1
+        self._update_label_result()
+
+        self._fill_row(row, user_logged)
+
+    def _fill_row(self, row: int, user_logged: UserLogged) -> None:
+        if user_logged.error:
+            error: str = str(user_logged.error)
+            item = create_table_item("Ошибка", tool_tip=error)
+            item.setForeground(Qt.GlobalColor.red)
+            self.table.setItem(row, COLUMN_TOTAL, item)
+            return
+
+        total_seconds: int = 0
+        for j, d in enumerate(self._dates, start=COLUMN_FIRST_DATE):
+            seconds: int = user_logged.date_by_seconds.get(d, 0)
+            total_seconds += seconds
+
+            self.table.setItem(
+                row,
+                j,
+                create_table_item(
+                    seconds_to_str(seconds) if seconds else "",
+                    tool_tip=f"Всего секунд: {seconds}" if seconds else None,
+                ),
+            )
+
+        self.table.setItem(
+            row,
+            COLUMN_TOTAL,
+            create_table_item(
+                seconds_to_str(total_seconds),
+                tool_tip=f"Всего секунд: {total_seconds}",
+            ),
+        )
+
+    def get_data(self) -> list[UserLogged]:
+        generation: int = self.thread_process.generation
+        return get_team_logged(
+            self._usernames,
+            on_result=lambda user_logged: self.about_user_logged.emit(
+                generation, user_logged
+            ),
+        )
+
+    def process(self, data: list[UserLogged]) -> None:
+        if not data:
+            self.label_result.setText("<b>Пользователи не заданы</b>")
+            return
+
+        # NOTE: Для снимка строк еще нет, поэтому таблица заполняется заново по данным
+        if not self._dates:
+            self._dates = self._get_dates()
+        self._usernames = [obj.username for obj in data]
+        self._init_table()
+        for row, user_logged in enumerate(data):
+            self._fill_row(row, user_logged)
+
+        errors: int = sum(1 for obj in data if obj.error)
+        text: str = f"Пользователей <b>{len(data)}</b>"
+        if errors:
+            text += f', ошибок <b><font color="red">{errors}</font></b>'
+        self.label_result.setText(text)
+
+    def init_settings(self, settings_layout: QFormLayout) -> None:
+        settings_layout.addRow("Дней:", self.spin_box_days)
+        settings_layout.addRow("Пользователи:", None)
+        settings_layout.addRow(self.list_widget_usernames)
+
+    def read_settings(self, settings: dict[str, Any] | None) -> None:
+        if settings is None:
+            settings: dict[str, Any] = dict()
+
+        key: str = self.list_widget_usernames.objectName()
+        items: list[str] = settings.get(key, [])
+        self.list_widget_usernames.set_items(items)
+
+        key: str = self.spin_box_days.objectName()
+        self.spin_box_days.setValue(settings.get(key, self.spin_box_days.value()))
+
+    def write_settings(self, settings: dict[str, Any]) -> None:
+        key: str = self.list_widget_usernames.objectName()
+        settings[key] = self.list_widget_usernames.items()
+
+        key: str = self.spin_box_days.objectName()
+        settings[key] = self.spin_box_days.value()
+
+
+if __name__ == "__main__":
+    from PyQt6.QtWidgets import QApplication
+
+    app = QApplication([])
+
+    w = AddonDockWidget(AddonTeamLoggedWidget)
+    w.show()
+    w.refresh()
+
+    app.exec()
@@ -8,11 +8,11 @@ import sys
 from pathlib import Path
 from typing import Any
 
-from PyQt6.QtCore import Qt, QObject, QEvent
+from PyQt6.QtCore import QObject, QEvent
 from PyQt6.QtGui import QKeyEvent
 from PyQt6.QtWidgets import QVBoxLayout
 
-from widgets.addons import AddonWidget, AddonDockWidget, Defaults
+from widgets.addons import AddonWidget, AddonDockWidget
 
 # NOTE: Обход проблемы импорта из-за "from src ..."
 DIR: Path = Path(__file__).resolve().parent
@@ -35,8 +35,6 @@ class AddonTetrisWidget(AddonWidget):
     def __init__(self, addon_dock_widget: AddonDockWidget) -> None:
         super().__init__(addon_dock_widget)
 
-        self.setWindowTitle("Тетрис")
-
         self.tetris_window = TetrisWindow()
 
         main_layout = QVBoxLayout(self)
@@ -56,16 +54,6 @@ class AddonTetrisWidget(AddonWidget):
     def write_settings(self, settings: dict[str, Any]) -> None:
         settings["scores"] = self.tetris_window.get_raw_high_scores()
 
-    def defaults(self) -> Defaults:
-        return Defaults(
-            is_visible=False,
-            is_active=True,
-            area=Qt.DockWidgetArea.LeftDockWidgetArea,
-        )
-
-    def is_supported_refresh(self) -> bool:
-        return False
-
     def is_supported_logs(self) -> bool:
         return False
 
@@ -9,10 +9,9 @@ import sys
 from pathlib import Path
 from typing import Any
 
-from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import QVBoxLayout, QTextEdit
 
-from widgets.addons import AddonWidget, AddonDockWidget, Defaults
+from widgets.addons import AddonWidget, AddonDockWidget
 from widgets import block_signals
 
 # NOTE: Обход проблемы импорта "from seconds_to_str import seconds_to_str"
@@ -36,8 +35,6 @@ class AddonTimeCalcWidget(AddonWidget):
     def __init__(self, addon_dock_widget: AddonDockWidget) -> None:
         super().__init__(addon_dock_widget)
 
-        self.setWindowTitle("Калькулятор времени")
-
         self.text_edit = QTextEdit()
         self.text_edit.textChanged.connect(self._on_text_changed)
         self.text_edit.setPlainText(SAMPLE_DATA)
@@ -46,16 +43,6 @@ class AddonTimeCalcWidget(AddonWidget):
         main_layout.setContentsMargins(0, 0, 0, 0)
         main_layout.addWidget(self.text_edit)
 
-    def defaults(self) -> Defaults:
-        return Defaults(
-            is_visible=False,
-            is_active=True,
-            area=Qt.DockWidgetArea.RightDockWidgetArea,
-        )
-
-    def is_supported_refresh(self) -> bool:
-        return False
-
     def is_supported_logs(self) -> bool:
         return False
 
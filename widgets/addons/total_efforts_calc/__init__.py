@@ -24,7 +24,7 @@ from PyQt6.QtWidgets import (
 )
 
 from widgets import get_scroll_area
-from widgets.addons import AddonWidget, AddonDockWidget, Defaults
+from widgets.addons import AddonWidget, AddonDockWidget
 from widgets.addons.total_efforts_calc.parse_total_efforts import (
     PATTERN_ARG,
     PATTERN_RESULT,
@@ -133,8 +133,6 @@ class AddonTotalEffortsCalcWidget(AddonWidget):
     def __init__(self, addon_dock_widget: AddonDockWidget) -> None:
         super().__init__(addon_dock_widget)
 
-        self.setWindowTitle("Калькулятор итоговой трудоемкости")
-
         self.template_edit = QPlainTextEdit()
         self.template_edit.setPlainText(SAMPLE_TEMPLATE)
         self.template_edit.textChanged.connect(self._refill_args)
@@ -208,16 +206,6 @@ class AddonTotalEffortsCalcWidget(AddonWidget):
 
         self._process()
 
-    def defaults(self) -> Defaults:
-        return Defaults(
-            is_visible=False,
-            is_active=True,
-            area=Qt.DockWidgetArea.RightDockWidgetArea,
-        )
-
-    def is_supported_refresh(self) -> bool:
-        return False
-
     def is_supported_logs(self) -> bool:
         return False
 
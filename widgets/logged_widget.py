@@ -16,7 +16,10 @@ from PyQt6.QtWidgets import (
 )
 
 from api import get_human_date, get_human_time
-from api.jira_rss import Activity, get_logged_total_seconds
+from api.metrics import RENDER_DURATION
+from api.tracing import traced
+from api.aggregation import LoggedByDay, get_logged_by_day
+from api.jira_rss import Activity
 from widgets import (
     create_table,
     create_table_item,
@@ -24,6 +27,8 @@ from widgets import (
     clear_table,
     open_jira,
     block_signals,
+    get_issue_column_labels,
+    fill_issue_columns,
 )
 from third_party.seconds_to_str import seconds_to_str
 
@@ -40,7 +45,14 @@ class LoggedWidget(QWidget):
         )
 
         self.table_logged_info = create_table(
-            header_labels=["ВРЕМЯ", "ЗАЛОГИРОВАНО", "ЗАДАЧА", "НАЗВАНИЕ", "ОПИСАНИЕ"],
+            header_labels=[
+                "ВРЕМЯ",
+                "ЗАЛОГИРОВАНО",
+                "ЗАДАЧА",
+                "НАЗВАНИЕ",
+                "ОПИСАНИЕ",
+                *get_issue_column_labels(),
+            ],
         )
 
         # Первые 3 колонки (кроме названия) имеют размер под содержимое
@@ -64,27 +76,37 @@ class LoggedWidget(QWidget):
 
         self.setLayout(layout)
 
-    def set_date_by_activities(self, date_by_activities: dict[date, list[Activity]]) -> None:
+    @traced()
+    @RENDER_DURATION.timed(widget="LoggedWidget")
+    def set_date_by_activities(
+        self,
+        date_by_activities: dict[date, list[Activity]],
+        logged_by_day: list[LoggedByDay] | None = None,
+    ) -> None:
+        if logged_by_day is None:
+            logged_by_day = get_logged_by_day(date_by_activities)
+
         with block_signals(self.table_logged):
             clear_table(self.table_logged)
 
-            for entry_date, activities in sorted(
-                date_by_activities.items(), key=lambda x: x[0], reverse=True
-            ):
+            for obj in logged_by_day:
+                # Не показывать даты, в которых не было залогировано
+                if not obj.logged_seconds:
+                    continue
+
+                entry_date: date = obj.date
                 activities: list[Activity] = [
-                    obj for obj in reversed(activities) if obj.logged
+                    activity
+                    for activity in reversed(date_by_activities[entry_date])
+                    if activity.logged
                 ]
 
-                total_seconds: int = get_logged_total_seconds(activities)
+                total_seconds: int = obj.logged_seconds
                 total_seconds_str: str = seconds_to_str(total_seconds)
 
                 date_str: str = get_human_date(entry_date)
                 is_odd_week: int = entry_date.isocalendar().week % 2 == 1
 
-                # Не показывать даты, в которых не было залогировано
-                if not total_seconds:
-                    continue
-
                 items = [
                     create_table_item(date_str, data=activities),
                     create_table_item(
@@ -137,6 +159,12 @@ class LoggedWidget(QWidget):
                 ]
                 add_table_row(self.table_logged_info, items)
 
+            fill_issue_columns(self.table_logged_info, jira_id_column=2, first_column=5)
+
+    def update_issue_columns(self) -> None:
+        with block_signals(self.table_logged_info):
+            fill_issue_columns(self.table_logged_info, jira_id_column=2, first_column=5)
+
     def _on_table_logged_info_item_double_clicked(self, item: QTableWidgetItem) -> None:
         row = item.row()
         jira_id = item.tableWidget().item(row, 2).text()